@@ -0,0 +1,102 @@
+"""Micro-benchmark del paso 4 (orden por Rubro numérico y Marca).
+
+Compara el orden original (``apply`` con ``re.match`` por fila + ``sort_values``
+sobre texto) con las claves precalculadas al cargar (categóricas + ``np.lexsort``)
+sobre un catálogo sintético, repitiendo el procesamiento varias veces como cuando
+se generan varias zonas/líneas del mismo catálogo.
+
+Uso::
+
+    python benchmarks/bench_orden.py --filas 200000 --repeticiones 5
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from procesador import ProcesadorCatalogo  # noqa: E402
+from procesador.motor import COLUMNAS_CLAVES_ORDEN, COLUMNA_MARCA_ORDEN, COLUMNA_RUBRO_NUMERO  # noqa: E402
+
+
+def catalogo_sintetico(filas, semilla=0):
+    rng = np.random.default_rng(semilla)
+    rubros = [f"{n} Rubro {n}" for n in rng.choice(400, 120, replace=False)] + ["Sin numero", ""]
+    marcas = [f"Marca {i:04d}" for i in range(1500)]
+    rubro = np.array(rubros, dtype=object)[rng.integers(0, len(rubros), filas)]
+    marca = np.array(marcas, dtype=object)[rng.integers(0, len(marcas), filas)]
+    marca[rng.random(filas) < 0.02] = np.nan
+    return pd.DataFrame({
+        'Linea': rng.choice([1, 2, 8, 31, 32], filas),
+        'Rubro': pd.array(rubro, dtype='str'),
+        'Marca': pd.array(marca, dtype='str'),
+        'Codigo': pd.array(rng.integers(0, filas, filas).astype(str), dtype='str'),
+        'l1 5': rng.uniform(10, 5000, filas),
+    })
+
+
+def extraer_numero_rubro(rubro):
+    if pd.isna(rubro) or rubro == "":
+        return 999
+    match = re.match(r'^(\d+)', str(rubro))
+    return int(match.group(1)) if match else 999
+
+
+def orden_original(df):
+    df = df.copy()
+    df['rubro_numero'] = df['Rubro'].apply(extraer_numero_rubro)
+    df = df.sort_values(['rubro_numero', 'Marca'], ascending=[True, True])
+    return df.drop('rubro_numero', axis=1)
+
+
+def orden_precalculado(df):
+    orden = np.lexsort((df[COLUMNA_MARCA_ORDEN].to_numpy(), df[COLUMNA_RUBRO_NUMERO].to_numpy()))
+    return df.take(orden).drop(columns=COLUMNAS_CLAVES_ORDEN)
+
+
+def medir(funcion, *args):
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    return time.perf_counter() - inicio, resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filas", type=int, default=200_000)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    df = catalogo_sintetico(args.filas)
+    print(f"Catálogo sintético: {len(df)} filas, {df['Rubro'].nunique()} rubros, {df['Marca'].nunique()} marcas")
+
+    tiempo_indexar, df_indexado = medir(ProcesadorCatalogo().indexar_catalogo, df.copy())
+
+    tiempos_original = []
+    tiempos_nuevo = []
+    for _ in range(args.repeticiones):
+        t, esperado = medir(orden_original, df)
+        tiempos_original.append(t)
+        t, obtenido = medir(orden_precalculado, df_indexado)
+        tiempos_nuevo.append(t)
+
+    # Mismo orden de filas en ambos caminos
+    assert (esperado.index == obtenido.index).all()
+
+    original = np.median(tiempos_original)
+    nuevo = np.median(tiempos_nuevo)
+    print(f"Orden original (apply + sort_values):     {original * 1000:8.1f} ms por corrida")
+    print(f"Claves precalculadas (lexsort):           {nuevo * 1000:8.1f} ms por corrida")
+    print(f"Indexado al cargar (una vez por catálogo): {tiempo_indexar * 1000:8.1f} ms")
+    print(f"Aceleración por corrida: {original / nuevo:.1f}x")
+    total_original = original * args.repeticiones
+    total_nuevo = tiempo_indexar + nuevo * args.repeticiones
+    print(f"Total {args.repeticiones} corridas: {total_original:.2f} s -> {total_nuevo:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
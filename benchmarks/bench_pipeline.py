@@ -0,0 +1,240 @@
+"""Benchmark del pipeline completo sobre catálogos sintéticos.
+
+Para cada tamaño genera (o reutiliza) un catálogo con ``generador.py``, lo carga y
+procesa/exporta cada zona con todas las líneas fijas, tomando el tiempo de cada
+etapa de ``Metricas`` (carga, indexado, filtro, reglas, orden, duplicados,
+relleno, formato y escritura). El resultado se guarda en JSON junto con las
+versiones del código y de las dependencias (por defecto en el directorio
+temporal, fuera del repositorio), para comparar corridas::
+
+    python benchmarks/bench_pipeline.py --filas 10000 100000 500000
+    python benchmarks/bench_pipeline.py --comparar resultados/antes.json resultados/despues.json
+
+Los catálogos generados se guardan en ``--datos`` (por defecto en el directorio
+temporal) y se reutilizan entre corridas con el mismo tamaño y semilla. Con
+``--memoria-max`` se mide el procesamiento por particiones con ese presupuesto.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+DIRECTORIO_REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DIRECTORIO_BENCH = os.path.join(tempfile.gettempdir(), "procesador_bench")
+sys.path.insert(0, DIRECTORIO_REPO)
+
+from generador import generar_catalogo  # noqa: E402
+from procesador import LINEAS_FIJAS, ZONAS, ProcesadorCatalogo  # noqa: E402
+from procesador.cargador import CARGADORES, LECTORES, lector_disponible  # noqa: E402
+from procesador.metricas import Metricas  # noqa: E402
+from procesador.motor import FORMATOS_SALIDA, MOTORES_EXCEL  # noqa: E402
+from procesador.particiones import procesar_por_particiones  # noqa: E402
+
+TAMANOS = [10000, 100000, 500000]
+
+# Agrupación de las etapas de Metricas para los totales
+GRUPOS_ETAPAS = {
+    'carga': ['carga', 'indexado'],
+    'proceso': ['filtro_lineas', 'reglas_columnas', 'reglas_precio', 'orden', 'duplicados', 'particiones',
+                'relleno'],
+    'exportacion': ['formato_numeros', 'escritura_excel', 'escritura_texto'],
+}
+
+
+def version_codigo():
+    try:
+        salida = subprocess.run(['git', 'describe', '--always', '--dirty'], cwd=DIRECTORIO_REPO,
+                                capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return salida.stdout.strip()
+
+
+def entorno():
+    return {
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'openpyxl': openpyxl.__version__,
+        'lectores': [lector for lector in LECTORES if lector_disponible(lector)],
+        'plataforma': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def catalogo(directorio, filas, semilla):
+    """Catálogo sintético de ``filas`` productos, generándolo si no existe"""
+    os.makedirs(directorio, exist_ok=True)
+    path = os.path.join(directorio, f"catalogo_{filas}_s{semilla}.xlsx")
+    if not os.path.exists(path):
+        inicio = time.perf_counter()
+        # Se escribe con otro nombre para no dejar un catálogo a medias si se interrumpe
+        temporal = path + ".tmp"
+        generar_catalogo(temporal, filas, semilla)
+        os.replace(temporal, path)
+        print(f"  generado {path} en {time.perf_counter() - inicio:.1f} s", flush=True)
+    return path
+
+
+def correr_pipeline(path, directorio_salida, cargador, motor_excel, medir_memoria=False, formatos=None,
+                    lector=None, memoria_max=None):
+    """Una corrida completa: carga y, por zona, procesamiento y exportación"""
+    metricas = Metricas(medir_memoria=medir_memoria)
+    procesador = ProcesadorCatalogo(cargador=cargador, motor_excel=motor_excel, metricas=metricas,
+                                    formatos=formatos, lector=lector)
+    if memoria_max is not None:
+        procesar_por_particiones(procesador, path, [(zona, LINEAS_FIJAS) for zona in ZONAS], directorio_salida,
+                                 memoria_mb=memoria_max)
+    else:
+        df = procesador.cargar_archivo(path)
+        for zona in ZONAS:
+            df_final = procesador.procesar(df, zona, LINEAS_FIJAS)
+            salida = os.path.join(directorio_salida, f"bench_{zona}.xlsx")
+            procesador.exportar(df_final, salida, zona, LINEAS_FIJAS)
+    return [{'zona': r.get('zona'), 'etapa': r['etapa'], 'segundos': r['segundos'],
+             'filas_entrada': r['filas_entrada'], 'filas_salida': r['filas_salida'],
+             'pico_memoria_mb': r['pico_memoria_mb']}
+            for r in metricas.registros]
+
+
+def medir_tamano(filas, args):
+    path = catalogo(args.datos, filas, args.semilla)
+    corridas = []
+    with tempfile.TemporaryDirectory() as directorio_salida:
+        for _ in range(args.repeticiones):
+            corridas.append(correr_pipeline(path, directorio_salida, args.cargador, args.motor_excel,
+                                            args.medir_memoria, args.formatos, args.lector, args.memoria_max))
+
+    # De cada etapa se toma la mejor repetición (la menos afectada por ruido externo)
+    etapas = []
+    for registros in zip(*corridas):
+        mejor = min(registros, key=lambda r: r['segundos'])
+        etapas.append(dict(mejor, repeticiones=[r['segundos'] for r in registros]))
+
+    totales = {grupo: sum(e['segundos'] for e in etapas if e['etapa'] in nombres)
+               for grupo, nombres in GRUPOS_ETAPAS.items()}
+    totales['total'] = sum(e['segundos'] for e in etapas)
+    return {
+        'filas': filas,
+        'archivo_mb': round(os.path.getsize(path) / 1024 ** 2, 2),
+        'etapas': etapas,
+        'totales': totales,
+    }
+
+
+def formatear_resultado(resultado):
+    lineas = [f"{resultado['filas']} filas ({resultado['archivo_mb']} MB)"]
+    for etapa in resultado['etapas']:
+        zona = etapa['zona'] or '-'
+        texto = f"  {zona:<9} {etapa['etapa']:<16} {etapa['segundos']:9.3f} s"
+        if etapa['pico_memoria_mb'] is not None:
+            texto += f" {etapa['pico_memoria_mb']:9.1f} MB"
+        lineas.append(texto)
+    lineas.append("  " + ", ".join(f"{grupo}: {segundos:.3f} s" for grupo, segundos in resultado['totales'].items()))
+    return "\n".join(lineas)
+
+
+def _clave(etapa):
+    return (etapa['zona'], etapa['etapa'])
+
+
+def comparar(path_antes, path_despues):
+    """Tabla etapa por etapa entre dos archivos de resultados"""
+    with open(path_antes, encoding='utf-8') as f:
+        antes = json.load(f)
+    with open(path_despues, encoding='utf-8') as f:
+        despues = json.load(f)
+    print(f"Antes:   {antes.get('version')} ({antes['fecha']})")
+    print(f"Después: {despues.get('version')} ({despues['fecha']})")
+
+    previos = {r['filas']: r for r in antes['resultados']}
+    for resultado in despues['resultados']:
+        previo = previos.get(resultado['filas'])
+        if previo is None:
+            continue
+        print(f"\n{resultado['filas']} filas")
+        print(f"  {'zona':<9} {'etapa':<16} {'antes':>9} {'después':>9} {'relación':>9} "
+              f"{'MB antes':>9} {'MB desp.':>9}")
+        previas = {_clave(e): e for e in previo['etapas']}
+        for etapa in resultado['etapas']:
+            anterior = previas.get(_clave(etapa), {})
+            print(_fila_comparacion(etapa['zona'] or '-', etapa['etapa'], anterior.get('segundos'), etapa['segundos'],
+                                    anterior.get('pico_memoria_mb'), etapa['pico_memoria_mb']))
+        for grupo, segundos in resultado['totales'].items():
+            print(_fila_comparacion('', grupo, previo['totales'].get(grupo), segundos))
+
+
+def _fila_comparacion(zona, etapa, t_antes, t_despues, mb_antes=None, mb_despues=None):
+    def numero(valor, formato):
+        return f"{valor:{formato}}" if valor is not None else f"{'-':>9}"
+
+    relacion = f"{t_antes / t_despues:8.2f}x" if t_antes is not None and t_despues else "-"
+    return (f"  {zona:<9} {etapa:<16} {numero(t_antes, '9.3f')} {numero(t_despues, '9.3f')} {relacion:>9} "
+            f"{numero(mb_antes, '9.1f')} {numero(mb_despues, '9.1f')}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark del pipeline completo sobre catálogos sintéticos.")
+    parser.add_argument("--filas", type=int, nargs="+", default=TAMANOS,
+                        help=f"Tamaños de catálogo (default: {' '.join(map(str, TAMANOS))})")
+    parser.add_argument("--repeticiones", type=int, default=1)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--cargador", choices=sorted(CARGADORES), default="streaming")
+    parser.add_argument("--lector", choices=sorted(LECTORES),
+                        help="Lector de hojas del cargador streaming (default: el más rápido instalado)")
+    parser.add_argument("--motor-excel", choices=MOTORES_EXCEL, default="rapido")
+    parser.add_argument("--formato", action="append", choices=FORMATOS_SALIDA, dest="formatos",
+                        help="Formato de salida; puede repetirse (default: xlsx)")
+    parser.add_argument("--memoria-max", type=float, metavar="MB",
+                        help="Procesa por particiones con ese presupuesto de memoria (default: todo en memoria)")
+    parser.add_argument("--medir-memoria", action="store_true",
+                        help="Pico de memoria de cada etapa con tracemalloc (más lento); si no, pico RSS")
+    parser.add_argument("--datos", default=DIRECTORIO_BENCH,
+                        help="Directorio de los catálogos generados (se reutilizan entre corridas)")
+    parser.add_argument("-o", "--salida",
+                        help="Archivo JSON de resultados (default: resultados/<fecha>.json en el directorio "
+                             "temporal de procesador_bench)")
+    parser.add_argument("--comparar", nargs=2, metavar=("ANTES", "DESPUES"),
+                        help="Compara dos archivos de resultados en lugar de correr el benchmark")
+    args = parser.parse_args(argv)
+
+    if args.comparar:
+        comparar(*args.comparar)
+        return
+
+    fecha = datetime.now()
+    informe = {
+        'fecha': fecha.isoformat(timespec='seconds'),
+        'version': version_codigo(),
+        'entorno': entorno(),
+        'parametros': {'cargador': args.cargador, 'lector': args.lector, 'motor_excel': args.motor_excel,
+                       'semilla': args.semilla, 'memoria_max': args.memoria_max,
+                       'repeticiones': args.repeticiones, 'medir_memoria': args.medir_memoria,
+                       'formatos': args.formatos or ['xlsx'],
+                       'zonas': ZONAS, 'lineas': LINEAS_FIJAS},
+        'resultados': [],
+    }
+    for filas in args.filas:
+        print(f"Midiendo {filas} filas...", flush=True)
+        resultado = medir_tamano(filas, args)
+        informe['resultados'].append(resultado)
+        print(formatear_resultado(resultado), flush=True)
+
+    salida = args.salida or os.path.join(DIRECTORIO_BENCH, "resultados", f"{fecha:%Y%m%dT%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(salida)), exist_ok=True)
+    with open(salida, 'w', encoding='utf-8') as f:
+        json.dump(informe, f, ensure_ascii=False, indent=2)
+    print(f"\nResultados guardados en {salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Generador de catálogos sintéticos con la estructura de la hoja 'principal'.
+
+Arma libros con el mismo formato que espera ``subir_archivo``: 11 filas de
+preámbulo, el encabezado en la fila 12 y las columnas Linea/ord/condicion/Rubro/
+Marca/Codigo con los bloques de precios l1 a l4 (más el bloque l2 repetido que
+pandas renombra a 'l2 5.1', ...). Incluye códigos duplicados, filas de líneas no
+fijas, rubros sin número o vacíos, precios no numéricos y ofertas con imagen
+"aNN.eps", para que cada paso del pipeline tenga trabajo real.
+
+Uso::
+
+    python benchmarks/generador.py catalogo_100k.xlsx --filas 100000
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+from openpyxl import Workbook
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from procesador import LINEAS_FIJAS  # noqa: E402
+from procesador.cargador import FILA_ENCABEZADO, HOJA_PRINCIPAL  # noqa: E402
+
+PRECIOS = ['l1 5', 'l1 7', 'l1 9', 'l1 11',
+           'l2 5', 'l2 7', 'l2 9', 'l2 11',
+           'l3 5', 'l3 7', 'l3 9', 'l3 11',
+           'l4 5', 'l4 7', 'l4 9', 'l4 11']
+# Factor de cada columna de precio sobre el precio base (las columnas '9' son las de oferta)
+FACTORES_PRECIO = [1.00, 0.97, 0.90, 0.88,
+                   1.08, 1.05, 0.97, 0.95,
+                   1.15, 1.12, 1.03, 1.01,
+                   1.22, 1.19, 1.10, 1.08]
+
+# 'lista1' a 'ad 3' es el rango que se elimina para INTERIOR
+ENCABEZADO = (['orden', 'Linea', 'ord', 'condicion', 'Rubro', 'Marca', 'Codigo', 'Descripcion', 'peso',
+               'lista1', 'lista 2', 'lista 3', 'lista 4', 'lista 5', 'ad 1', 'ad 2', 'ad 3']
+              + PRECIOS
+              + ['l2 5', 'l2 7', 'l2 9', 'l2 11', '0.05', '0.07', '9/especial', '0.11'])
+
+LINEAS_EXTRA = [5, 40]
+CONDICIONES = [None, 'normal', 'NUEVO', 'Oferta especial']
+PESOS = ['1kg', '500g', '250g', '1.5L', '2L', '6x1L']
+
+
+def preambulo(filas):
+    """Las 11 filas previas al encabezado, como en los catálogos reales"""
+    textos = [
+        "CATÁLOGO MADRE",
+        "Distribuidora de ejemplo S.A.",
+        "Lista de precios vigente",
+        f"Productos: {filas}",
+        None,
+        "Precios expresados en pesos, IVA incluido",
+        None,
+        "l1: lista 1 - l2: lista 2 - l3: lista 3 - l4: lista 4",
+        None,
+        "Las ofertas se indican con imagen aNN.eps",
+        None,
+    ]
+    return textos[:FILA_ENCABEZADO - 1]
+
+
+def columnas_sinteticas(filas, semilla=0, proporcion_duplicados=0.1, proporcion_ofertas=0.15):
+    """Valores de cada columna del encabezado (listas de Python listas para escribir)"""
+    rng = np.random.default_rng(semilla)
+
+    lineas = np.array(LINEAS_FIJAS + LINEAS_EXTRA)[rng.integers(0, len(LINEAS_FIJAS) + len(LINEAS_EXTRA), filas)]
+
+    # Códigos únicos con una fracción repetida (copias de códigos anteriores)
+    codigos = rng.permutation(filas * 3)[:filas] + 100000
+    duplicados = rng.random(filas) < proporcion_duplicados
+    duplicados[0] = False
+    origen = (rng.random(filas) * np.arange(filas)).astype(np.int64)
+    codigos[duplicados] = codigos[origen[duplicados]]
+
+    ofertas = rng.random(filas) < proporcion_ofertas
+    imagenes = np.char.add(np.char.add('a', np.char.zfill(rng.integers(0, 100, filas).astype(str), 2)), '.eps')
+    ord_ = np.where(ofertas, imagenes, np.char.add(codigos.astype(str), '.eps'))
+    condiciones = np.array(CONDICIONES, dtype=object)[rng.integers(0, len(CONDICIONES), filas)]
+    # La mayoría de las filas con imagen de oferta están marcadas como oferta
+    condiciones[ofertas & (rng.random(filas) < 0.8)] = 'OFERTA'
+
+    nombres_rubro = [f"{n} Rubro {n}" for n in rng.choice(90, 40, replace=False) + 1]
+    rubros = np.array(nombres_rubro + ["Sin numero", None], dtype=object)
+    rubro = rubros[rng.integers(0, len(rubros), filas)]
+    marcas = np.array([f"Marca {i:03d}" for i in range(300)] + [None], dtype=object)
+    marca = marcas[rng.integers(0, len(marcas), filas)]
+
+    base = np.round(rng.uniform(50, 20000, filas), 2)
+    precios = {col: np.round(base * factor, 2).astype(object) for col, factor in zip(PRECIOS, FACTORES_PRECIO)}
+    # Algunos precios de oferta cargados como texto, como pasa en las planillas reales
+    for col in ('l1 9', 'l2 9'):
+        precios[col][rng.random(filas) < 0.01] = 'N/A'
+
+    valores = {
+        'orden': np.arange(1, filas + 1).tolist(),
+        'Linea': lineas.tolist(),
+        'ord': ord_.tolist(),
+        'condicion': condiciones.tolist(),
+        'Rubro': rubro.tolist(),
+        'Marca': marca.tolist(),
+        'Codigo': codigos.astype(str).tolist(),
+        'Descripcion': [f"Producto sintético {i}" for i in range(filas)],
+        'peso': np.array(PESOS)[rng.integers(0, len(PESOS), filas)].tolist(),
+        'lista1': base.tolist(),
+        'lista 2': np.round(base * 1.1, 2).tolist(),
+        'lista 3': np.round(base * 1.2, 2).tolist(),
+        'lista 4': np.round(base * 1.3, 2).tolist(),
+        'lista 5': np.round(base * 1.4, 2).tolist(),
+        'ad 1': [None] * filas,
+        'ad 2': [None] * filas,
+        'ad 3': rng.integers(0, 2, filas).tolist(),
+        '0.05': [0.05] * filas,
+        '0.07': [0.07] * filas,
+        '9/especial': [9] * filas,
+        '0.11': [0.11] * filas,
+    }
+    valores.update({col: serie.tolist() for col, serie in precios.items()})
+    return [valores[col] for col in ENCABEZADO]
+
+
+def generar_catalogo(path, filas, semilla=0, proporcion_duplicados=0.1, proporcion_ofertas=0.15):
+    """Escribe un catálogo sintético de ``filas`` productos en ``path``"""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(HOJA_PRINCIPAL)
+    for texto in preambulo(filas):
+        ws.append([texto])
+    ws.append(ENCABEZADO)
+    for fila in zip(*columnas_sinteticas(filas, semilla, proporcion_duplicados, proporcion_ofertas)):
+        ws.append(fila)
+    wb.save(path)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera un catálogo sintético con la hoja 'principal'.")
+    parser.add_argument("salida", help="Archivo .xlsx a generar")
+    parser.add_argument("--filas", type=int, default=10000)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--duplicados", type=float, default=0.1, help="Fracción de códigos repetidos")
+    parser.add_argument("--ofertas", type=float, default=0.15, help="Fracción de filas con imagen aNN.eps")
+    args = parser.parse_args(argv)
+    generar_catalogo(args.salida, args.filas, args.semilla, args.duplicados, args.ofertas)
+    print(f"Catálogo generado: {args.salida} ({args.filas} filas)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+from .cache import CacheCatalogos
+from .diseno import PERFIL_MULTIPLO_8, PerfilDiseno, cargar_perfiles_diseno
+from .fusion import cargar_fusion
+from .incremental import exportar_incremental
+from .particiones import procesar_por_particiones
+from .perfiles import PERFIL_ESTANDAR, PerfilProceso, cargar_perfil_proceso
+from .motor import (
+    COLUMNAS_NUMERICAS,
+    LINEAS_FIJAS,
+    ZONAS,
+    ProcesadorCatalogo,
+    ProcesoCancelado,
+    nombre_salida,
+    procesar_archivo,
+)
+from .variantes import combinaciones_variantes, formatear_resumen, generar_variantes
+
+__all__ = [
+    "CacheCatalogos",
+    "COLUMNAS_NUMERICAS",
+    "LINEAS_FIJAS",
+    "PERFIL_ESTANDAR",
+    "PERFIL_MULTIPLO_8",
+    "PerfilDiseno",
+    "PerfilProceso",
+    "ZONAS",
+    "ProcesadorCatalogo",
+    "ProcesoCancelado",
+    "cargar_fusion",
+    "cargar_perfil_proceso",
+    "cargar_perfiles_diseno",
+    "combinaciones_variantes",
+    "exportar_incremental",
+    "formatear_resumen",
+    "generar_variantes",
+    "nombre_salida",
+    "procesar_archivo",
+    "procesar_por_particiones",
+]
@@ -0,0 +1,305 @@
+"""Cache en disco de catálogos ya parseados.
+
+Cada entrada es un directorio con un ``.npy`` por columna (los textos se guardan
+como un bloque UTF-8 más los desplazamientos de cada valor; las columnas mixtas,
+como texto más el tipo de cada valor) y un ``meta.json`` con nombres y tipos, de
+modo que reabrir un catálogo sin cambios no vuelve a leer el .xlsx. Nada se
+guarda con pickle, así que leer una entrada no puede ejecutar código. Las
+entradas se identifican por el hash del contenido del archivo y los parámetros
+de carga; el hash de cada ruta se recuerda junto con su tamaño y fecha de
+modificación para no recalcularlo si el archivo no cambió. Cuando el cache
+supera ``max_bytes`` se eliminan las entradas usadas hace más tiempo.
+"""
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, datetime, time as hora, timedelta
+
+import numpy as np
+import pandas as pd
+
+FORMATO_VERSION = 2
+MAX_BYTES_DEFAULT = 2 * 1024 ** 3
+
+
+def directorio_cache_default():
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'procesador_catalogos')
+
+
+def hash_archivo(file_path):
+    h = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for bloque in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def _nombre_a_json(nombre):
+    return [type(nombre).__name__, nombre] if isinstance(nombre, (int, float)) else ['str', str(nombre)]
+
+
+def _nombre_desde_json(dato):
+    tipo, valor = dato
+    return {'int': int, 'float': float}.get(tipo, str)(valor)
+
+
+def _guardar_textos(base, textos, nulos):
+    # Un solo bloque UTF-8 y los desplazamientos (en caracteres) de cada valor
+    largos = np.fromiter((len(t) for t in textos), dtype=np.int64, count=len(textos))
+    with open(base + '.txt', 'wb') as f:
+        f.write("".join(textos).encode('utf-8'))
+    np.save(base + '.off.npy', np.concatenate(([0], np.cumsum(largos))))
+    np.save(base + '.nul.npy', nulos)
+
+
+def _leer_textos(base):
+    with open(base + '.txt', 'rb') as f:
+        bloque = f.read().decode('utf-8')
+    desplazamientos = np.load(base + '.off.npy').tolist()
+    nulos = np.load(base + '.nul.npy')
+    valores = np.empty(len(nulos), dtype=object)
+    valores[:] = [bloque[a:b] for a, b in zip(desplazamientos[:-1], desplazamientos[1:])]
+    return valores, nulos
+
+
+def _valor_a_texto(valor):
+    """(tipo, texto) de un valor de una columna mixta; el orden de los casos importa (bool es int)"""
+    if valor is None:
+        return 'none', ''
+    if valor is pd.NaT:
+        return 'nat', ''
+    if isinstance(valor, np.generic) and valor.dtype.kind in 'biuf':
+        tipo, texto = _valor_a_texto(valor.item())
+        return f"numpy:{valor.dtype.str}:{tipo}", texto
+    if isinstance(valor, str):
+        return 'str', valor
+    if isinstance(valor, bool):
+        return 'bool', str(int(valor))
+    if isinstance(valor, int):
+        return 'int', str(valor)
+    if isinstance(valor, float):
+        return 'float', repr(valor)
+    if isinstance(valor, pd.Timestamp):
+        return 'timestamp', valor.isoformat()
+    if isinstance(valor, datetime):
+        return 'datetime', valor.isoformat()
+    if isinstance(valor, date):
+        return 'date', valor.isoformat()
+    if isinstance(valor, hora):
+        return 'time', valor.isoformat()
+    if isinstance(valor, timedelta):
+        return 'timedelta', f"{valor.days} {valor.seconds} {valor.microseconds}"
+    raise TypeError(f"Valor de tipo {type(valor).__name__} no admitido en el cache")
+
+
+def _valor_desde_texto(tipo, texto):
+    if tipo.startswith('numpy:'):
+        _, dtype, tipo_python = tipo.split(':')
+        return np.dtype(dtype).type(_valor_desde_texto(tipo_python, texto))
+    if tipo == 'none':
+        return None
+    if tipo == 'nat':
+        return pd.NaT
+    if tipo == 'str':
+        return texto
+    if tipo == 'bool':
+        return texto == '1'
+    if tipo == 'int':
+        return int(texto)
+    if tipo == 'float':
+        return float(texto)
+    if tipo == 'timestamp':
+        return pd.Timestamp(texto)
+    if tipo == 'datetime':
+        return datetime.fromisoformat(texto)
+    if tipo == 'date':
+        return date.fromisoformat(texto)
+    if tipo == 'time':
+        return hora.fromisoformat(texto)
+    if tipo == 'timedelta':
+        dias, segundos, microsegundos = map(int, texto.split())
+        return timedelta(days=dias, seconds=segundos, microseconds=microsegundos)
+    raise ValueError(f"Tipo desconocido en el cache: {tipo}")
+
+
+def _guardar_columna(directorio, i, serie):
+    """Guarda una columna y devuelve su descripción para meta.json"""
+    base = os.path.join(directorio, f"c{i}")
+    dtype = serie.dtype
+    if dtype.kind in 'biufcmM':
+        np.save(base + '.npy', serie.to_numpy())
+        return {'tipo': 'numpy'}
+
+    valores = serie.to_numpy(dtype=object)
+    nulos = pd.isna(valores)
+    no_nulos = valores[~nulos]
+    if all(isinstance(v, str) for v in no_nulos):
+        _guardar_textos(base, ["" if nulo else v for v, nulo in zip(valores, nulos)], nulos)
+        return {'tipo': 'texto', 'dtype': str(dtype)}
+
+    # Columnas mixtas (texto, números, fechas): cada valor como texto más el índice de su tipo
+    pares = [_valor_a_texto(v) for v in valores]
+    tipos = sorted({tipo for tipo, _ in pares})
+    indices = {tipo: j for j, tipo in enumerate(tipos)}
+    _guardar_textos(base, [texto for _, texto in pares], np.zeros(len(pares), dtype=bool))
+    np.save(base + '.tip.npy', np.fromiter((indices[tipo] for tipo, _ in pares), dtype=np.int32, count=len(pares)))
+    return {'tipo': 'mixta', 'tipos': tipos}
+
+
+def _leer_columna(directorio, i, desc):
+    base = os.path.join(directorio, f"c{i}")
+    if desc['tipo'] == 'numpy':
+        return np.load(base + '.npy', allow_pickle=False)
+
+    valores, nulos = _leer_textos(base)
+    if desc['tipo'] == 'mixta':
+        tipos = desc['tipos']
+        indices = np.load(base + '.tip.npy', allow_pickle=False)
+        valores[:] = [_valor_desde_texto(tipos[j], texto) for j, texto in zip(indices.tolist(), valores)]
+        return pd.Series(valores, dtype=object)
+    if desc['tipo'] != 'texto':
+        raise ValueError(f"Columna de tipo desconocido en el cache: {desc['tipo']}")
+    valores[nulos] = np.nan
+    return pd.Series(valores, dtype=object).astype(desc['dtype'])
+
+
+def guardar_dataframe(directorio, df):
+    """Guarda ``df`` en ``directorio``: un archivo por columna más meta.json"""
+    meta = {
+        'nombres': [_nombre_a_json(nombre) for nombre in df.columns],
+        'columnas': [_guardar_columna(directorio, i, df.iloc[:, i]) for i in range(df.shape[1])],
+        'filas': len(df),
+    }
+    with open(os.path.join(directorio, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+
+
+def leer_dataframe(directorio):
+    """Lee un DataFrame guardado con ``guardar_dataframe``"""
+    with open(os.path.join(directorio, 'meta.json'), encoding='utf-8') as f:
+        meta = json.load(f)
+    columnas = {
+        _nombre_desde_json(nombre): _leer_columna(directorio, i, desc)
+        for i, (nombre, desc) in enumerate(zip(meta['nombres'], meta['columnas']))
+    }
+    return pd.DataFrame(columnas, index=pd.RangeIndex(meta['filas']))
+
+
+def _tamano_directorio(directorio):
+    total = 0
+    for raiz, _, archivos in os.walk(directorio):
+        for nombre in archivos:
+            try:
+                total += os.path.getsize(os.path.join(raiz, nombre))
+            except OSError:
+                pass
+    return total
+
+
+class CacheCatalogos:
+    """Cache LRU de DataFrames cargados, limitado en tamaño total"""
+
+    def __init__(self, directorio=None, max_bytes=MAX_BYTES_DEFAULT, log=None):
+        self.directorio = directorio or directorio_cache_default()
+        self.max_bytes = max_bytes
+        self.log = log or (lambda message: None)
+        self.dir_entradas = os.path.join(self.directorio, 'entradas')
+        self.dir_rutas = os.path.join(self.directorio, 'rutas')
+        os.makedirs(self.dir_entradas, exist_ok=True)
+        os.makedirs(self.dir_rutas, exist_ok=True)
+
+    def hash_contenido(self, file_path):
+        """Hash del archivo, recalculado solo si cambió su tamaño o fecha de modificación"""
+        ruta = os.path.abspath(file_path)
+        stat = os.stat(ruta)
+        memo = os.path.join(self.dir_rutas, hashlib.sha1(ruta.encode('utf-8')).hexdigest() + '.json')
+        try:
+            with open(memo, encoding='utf-8') as f:
+                datos = json.load(f)
+            if datos['size'] == stat.st_size and datos['mtime_ns'] == stat.st_mtime_ns:
+                return datos['hash']
+        except (OSError, ValueError, KeyError):
+            pass
+
+        contenido = hash_archivo(ruta)
+        self._escribir_json(memo, {'ruta': ruta, 'size': stat.st_size,
+                                   'mtime_ns': stat.st_mtime_ns, 'hash': contenido})
+        return contenido
+
+    def clave(self, file_path, **parametros):
+        """Clave de la entrada: hash del contenido más los parámetros de carga"""
+        params = json.dumps({'formato': FORMATO_VERSION, **parametros}, sort_keys=True, default=str)
+        sufijo = hashlib.sha1(params.encode('utf-8')).hexdigest()[:16]
+        return f"{self.hash_contenido(file_path)}-{sufijo}"
+
+    def obtener(self, clave):
+        directorio = os.path.join(self.dir_entradas, clave)
+        try:
+            df = leer_dataframe(directorio)
+        except (OSError, ValueError, KeyError):
+            return None
+
+        # Marcar la entrada como usada recientemente (orden LRU)
+        try:
+            os.utime(os.path.join(directorio, 'meta.json'))
+        except OSError:
+            pass
+        return df
+
+    def guardar(self, clave, df):
+        destino = os.path.join(self.dir_entradas, clave)
+        if os.path.exists(destino):
+            return
+
+        # Escribir en un directorio temporal y renombrar, por si otro proceso guarda la misma entrada
+        temporal = tempfile.mkdtemp(prefix='.tmp-', dir=self.dir_entradas)
+        try:
+            guardar_dataframe(temporal, df)
+            os.rename(temporal, destino)
+        except OSError:
+            shutil.rmtree(temporal, ignore_errors=True)
+            if not os.path.exists(destino):
+                raise
+            return
+        except Exception:
+            shutil.rmtree(temporal, ignore_errors=True)
+            raise
+
+        self.desalojar()
+
+    def desalojar(self):
+        """Elimina las entradas menos usadas hasta quedar por debajo de ``max_bytes``"""
+        entradas = []
+        for nombre in os.listdir(self.dir_entradas):
+            directorio = os.path.join(self.dir_entradas, nombre)
+            try:
+                ultimo_uso = os.path.getmtime(os.path.join(directorio, 'meta.json'))
+            except OSError:
+                # Temporales abandonados por un proceso interrumpido
+                if nombre.startswith('.tmp-') and time.time() - os.path.getmtime(directorio) > 3600:
+                    shutil.rmtree(directorio, ignore_errors=True)
+                continue
+            entradas.append((ultimo_uso, _tamano_directorio(directorio), directorio))
+
+        total = sum(tamano for _, tamano, _ in entradas)
+        for _, tamano, directorio in sorted(entradas):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(directorio, ignore_errors=True)
+            total -= tamano
+            self.log(f"Cache: entrada eliminada {os.path.basename(directorio)} ({tamano / 1024 ** 2:.1f} MB)")
+
+    @staticmethod
+    def _escribir_json(path, datos):
+        temporal = f"{path}.{os.getpid()}.tmp"
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(datos, f)
+        os.replace(temporal, path)
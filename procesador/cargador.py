@@ -0,0 +1,457 @@
+"""Carga de la hoja 'principal' en streaming.
+
+``pd.read_excel`` construye el modelo de objetos completo del libro antes de armar
+el DataFrame. Este cargador recorre las filas una sola vez (con calamine, pyxlsb o
+xlrd si están instalados, con ``iterparse`` sobre el XML de la hoja o con openpyxl
+en modo solo lectura), descarta las que no pertenecen a las líneas pedidas
+mientras lee y arma las columnas tipadas al final, replicando la inferencia de
+tipos de ``read_excel`` (valores NA por defecto, enteros/decimales, columnas de
+texto y ``Codigo`` como texto).
+
+El lector se elige por la extensión del archivo: el primero disponible de
+``LECTORES_POR_FORMATO``; si falla al abrir el libro se prueba el siguiente.
+``iterar_catalogo`` entrega la hoja en bloques de filas ya tipados (para el
+procesamiento por particiones) y prefiere los lectores que no cargan la hoja
+entera en memoria.
+"""
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import closing, contextmanager
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from . import lector_xlsx, lectores
+from .perfiles import PERFIL_ESTANDAR
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+HOJA_PRINCIPAL = 'principal'
+# Fila 12 (índice 11) es el encabezado; las 11 primeras son el preámbulo del catálogo
+FILA_ENCABEZADO = 12
+COLUMNAS_TEXTO = ['Codigo']
+
+# Columnas que usa el pipeline para calcular con cualquier perfil (línea, oferta, orden y dedupe)
+COLUMNAS_CALCULO = ['Linea', 'ord', 'orden', 'condicion', 'Rubro', 'Marca', 'Codigo']
+
+POSIBLES_COLUMNAS_LINEA = ['Linea', 'linea', 'LINEA', 'Línea']
+
+# Mismos valores que pandas interpreta como NA por defecto al leer archivos
+VALORES_NA = {
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND',
+    '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+}
+
+
+def pico_rss_mb():
+    """Pico de memoria residente del proceso en MB (None si el sistema no lo informa)"""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa KB y macOS bytes
+    return pico / 1024 ** 2 if sys.platform == 'darwin' else pico / 1024
+
+
+@contextmanager
+def medir_carga(log, descripcion, medir_memoria=False):
+    """Registra en el log el tiempo y el pico de memoria de una carga.
+
+    Con ``medir_memoria`` se usa tracemalloc (pico exacto de la carga, pero varias
+    veces más lento); si no, se informa el pico de memoria residente del proceso.
+    Produce un dict cuya 'descripcion' puede completarse durante la carga.
+    """
+    iniciar_tracemalloc = medir_memoria and not tracemalloc.is_tracing()
+    if iniciar_tracemalloc:
+        tracemalloc.start()
+    elif medir_memoria:
+        tracemalloc.reset_peak()
+    carga = {'descripcion': descripcion}
+    inicio = time.perf_counter()
+    try:
+        yield carga
+    finally:
+        duracion = time.perf_counter() - inicio
+        descripcion = carga['descripcion']
+        if medir_memoria:
+            _, pico = tracemalloc.get_traced_memory()
+            if iniciar_tracemalloc:
+                tracemalloc.stop()
+            log(f"Carga ({descripcion}): {duracion:.2f} s, pico de memoria: {pico / 1024 ** 2:.1f} MB")
+        elif pico_rss_mb() is not None:
+            log(f"Carga ({descripcion}): {duracion:.2f} s, pico RSS del proceso: {pico_rss_mb():.1f} MB")
+        else:
+            log(f"Carga ({descripcion}): {duracion:.2f} s")
+
+
+def normalizar_encabezado(valores):
+    """Nombres de columna como los arma pandas: 'Unnamed: i' y sufijos '.1' en duplicados"""
+    nombres = []
+    conteos = {}
+    for i, valor in enumerate(valores):
+        nombre = f"Unnamed: {i}" if valor is None or valor == "" else valor
+        if isinstance(nombre, float) and nombre.is_integer():
+            nombre = int(nombre)
+        # pandas desduplica agregando '.1', '.2', ... sin chocar con nombres existentes
+        cuenta = conteos.get(nombre, 0)
+        while cuenta > 0:
+            conteos[nombre] = cuenta + 1
+            nombre = f"{nombre}.{cuenta}"
+            cuenta = conteos.get(nombre, 0)
+        conteos[nombre] = cuenta + 1
+        nombres.append(nombre)
+    return nombres
+
+
+def convertir_celda(valor):
+    """Normaliza el valor de una celda igual que el lector openpyxl de pandas"""
+    if valor is None:
+        return np.nan
+    if isinstance(valor, str):
+        return np.nan if valor in VALORES_NA else valor
+    if isinstance(valor, float):
+        # openpyxl devuelve enteros guardados como float (1.0); pandas los lee como int
+        if valor.is_integer():
+            return int(valor)
+        return valor
+    return valor
+
+
+def valor_linea(valor):
+    """Valor de la columna de línea comparable con las líneas seleccionadas"""
+    if isinstance(valor, str):
+        try:
+            numero = float(valor)
+        except ValueError:
+            return valor
+        return int(numero) if numero.is_integer() else numero
+    return valor
+
+
+def columna_tipada(valores, como_texto=False):
+    """Arma una Series con el tipo que inferiría read_excel para la columna"""
+    serie = pd.Series(valores, dtype=object)
+    if como_texto:
+        return serie.map(str, na_action='ignore').infer_objects()
+    if serie.isna().all():
+        return serie.astype(float)
+    if not serie.map(lambda v: isinstance(v, (bool, datetime)), na_action='ignore').any():
+        try:
+            return pd.to_numeric(serie)
+        except (ValueError, TypeError):
+            pass
+    return serie.infer_objects()
+
+
+def identificar_columna_linea(columnas):
+    for col in POSIBLES_COLUMNAS_LINEA:
+        if col in columnas:
+            return col
+    # Si no la encuentra, intenta identificarla a partir de las columnas cargadas
+    # El archivo de ejemplo tiene la columna de línea como el primer campo sin nombre después de 'orden'
+    if len(columnas) > 1 and str(columnas[1]).lower() in ['unnamed: 1', 'unnamed: 0']:
+        return columnas[1] # Esto es una suposición basada en el formato habitual sin encabezado
+    return None
+
+
+def iterar_filas_openpyxl(file_path, sheet_name, min_row=1, progreso=None):
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet_name]
+        # max_row sale de <dimension>; sin ese dato no se informa avance intermedio
+        total = ws.max_row if progreso is not None else None
+        for numero_fila, fila in enumerate(ws.iter_rows(min_row=min_row, values_only=True), start=min_row):
+            if total and numero_fila % lector_xlsx.FILAS_POR_AVANCE == 0:
+                progreso(min(numero_fila / total, 1.0))
+            yield fila
+    finally:
+        wb.close()
+
+
+LECTORES = {
+    'calamine': lectores.iterar_filas_calamine,
+    'iterparse': lector_xlsx.iterar_filas,
+    'openpyxl': iterar_filas_openpyxl,
+    'pyxlsb': lectores.iterar_filas_pyxlsb,
+    'xlrd': lectores.iterar_filas_xlrd,
+}
+
+# Lectores por extensión, del más rápido al más lento. calamine lee un .xlsx unas
+# tres veces más rápido que iterparse a cambio de tener la hoja entera en memoria.
+LECTORES_POR_FORMATO = {
+    '.xlsx': ['calamine', 'iterparse', 'openpyxl'],
+    '.xlsm': ['calamine', 'iterparse', 'openpyxl'],
+    '.xlsb': ['calamine', 'pyxlsb'],
+    '.xls': ['calamine', 'xlrd'],
+}
+# Lectores que arman la hoja entera en memoria antes de devolver la primera fila
+LECTORES_EN_MEMORIA = {'calamine', 'xlrd'}
+
+
+class LectorFallido(Exception):
+    """El lector no pudo abrir el libro o leer el encabezado de la hoja"""
+
+
+def lector_disponible(lector):
+    """Si el módulo que usa el lector está instalado"""
+    return lectores.DISPONIBLES.get(lector, lector in LECTORES)
+
+
+def elegir_lectores(file_path, lector=None):
+    """Lectores a probar para el archivo, en orden.
+
+    Con ``lector`` se usa solo ese (si está instalado); si no, los disponibles
+    para la extensión del archivo (los de .xlsx para extensiones desconocidas).
+    """
+    if lector is not None:
+        if lector not in LECTORES:
+            raise ValueError(f"Lector desconocido: {lector}")
+        if not lector_disponible(lector):
+            raise ValueError(f"El lector '{lector}' no está instalado")
+        return [lector]
+    extension = os.path.splitext(file_path)[1].lower()
+    candidatos = [nombre for nombre in LECTORES_POR_FORMATO.get(extension, LECTORES_POR_FORMATO['.xlsx'])
+                  if lector_disponible(nombre)]
+    if not candidatos:
+        modulos = " o ".join(lectores.PAQUETES[nombre] for nombre in LECTORES_POR_FORMATO[extension])
+        raise ValueError(f"No hay un lector instalado para archivos {extension} (instalar {modulos})")
+    return candidatos
+
+
+def columnas_pipeline(perfil=PERFIL_ESTANDAR):
+    """Columnas que usa el pipeline para calcular: ``COLUMNAS_CALCULO`` más las de precio del perfil"""
+    return list(dict.fromkeys(COLUMNAS_CALCULO + perfil.columnas_precio()))
+
+
+def cargar_principal_streaming(file_path, lineas=None, columnas=None, sheet_name=HOJA_PRINCIPAL,
+                               lector='iterparse', progreso=None):
+    """Carga la hoja del catálogo en streaming.
+
+    ``lineas`` filtra las filas durante la lectura (None = todas) y ``columnas``
+    limita las columnas leídas (None = todas, necesario para exportar el catálogo
+    completo; ``columnas_pipeline(perfil)`` alcanza para calcular). ``progreso``
+    recibe la fracción de la hoja ya leída.
+    """
+    with closing(iterar_principal_streaming(file_path, None, lineas=lineas, columnas=columnas,
+                                            sheet_name=sheet_name, lector=lector, progreso=progreso)) as bloques:
+        return next(bloques, pd.DataFrame())
+
+
+def _armar_bloque(nombres, indices, datos, inicio, filas):
+    bloque = pd.DataFrame(
+        {nombres[i]: columna_tipada(datos.pop(i), como_texto=nombres[i] in COLUMNAS_TEXTO) for i in indices},
+        index=pd.RangeIndex(filas),
+    )
+    bloque.index = pd.RangeIndex(inicio, inicio + filas)
+    return bloque
+
+
+def iterar_principal_streaming(file_path, filas_por_bloque=None, lineas=None, columnas=None,
+                               sheet_name=HOJA_PRINCIPAL, lector='iterparse', progreso=None):
+    """Genera la hoja del catálogo en DataFrames de hasta ``filas_por_bloque`` filas.
+
+    Con ``filas_por_bloque`` None genera un solo DataFrame con toda la hoja. Cada
+    bloque se tipa por separado y su índice es la posición de sus filas en el
+    catálogo; las columnas 'Unnamed: i' que aparecen a mitad de la hoja solo están
+    en los bloques siguientes.
+    """
+    filas = LECTORES[lector](file_path, sheet_name, min_row=FILA_ENCABEZADO, progreso=progreso)
+    try:
+        try:
+            encabezado = next(filas, None)
+        except KeyError:
+            # Hoja inexistente: todos los lectores ven las mismas hojas, probar otro no tiene sentido
+            raise
+        except Exception as e:
+            # Formato que el lector no entiende o archivo dañado: otro lector puede leerlo
+            raise LectorFallido(f"{type(e).__name__}: {e}") from e
+        if encabezado is None:
+            return
+        # Recortar celdas vacías al final del encabezado
+        ancho = len(encabezado)
+        while ancho > 0 and encabezado[ancho - 1] in (None, ""):
+            ancho -= 1
+        nombres = normalizar_encabezado(encabezado[:ancho])
+
+        columna_linea = identificar_columna_linea(nombres)
+        indice_linea = nombres.index(columna_linea) if columna_linea is not None else None
+        lineas_filtro = set(lineas) if lineas is not None and indice_linea is not None else None
+
+        if columnas is None:
+            indices = list(range(len(nombres)))
+        else:
+            pedidas = set(columnas)
+            if columna_linea is not None:
+                pedidas.add(columna_linea)
+            indices = [i for i, nombre in enumerate(nombres) if nombre in pedidas]
+        datos = {i: [] for i in indices}
+        # Posición en el catálogo de la primera fila del bloque y filas del bloque
+        inicio = 0
+        total_filas = 0
+        # pandas conserva las filas vacías intermedias (todo NaN) y descarta las finales
+        filas_vacias_pendientes = 0
+
+        for fila in filas:
+            if fila is None or all(valor is None or valor == "" for valor in fila):
+                filas_vacias_pendientes += 1
+                continue
+            if filas_vacias_pendientes and lineas_filtro is None:
+                for i in indices:
+                    datos[i].extend([np.nan] * filas_vacias_pendientes)
+                total_filas += filas_vacias_pendientes
+            filas_vacias_pendientes = 0
+            if lineas_filtro is not None:
+                linea = valor_linea(fila[indice_linea]) if indice_linea < len(fila) else None
+                if linea not in lineas_filtro:
+                    continue
+            if columnas is None and len(fila) > len(nombres):
+                # Celdas con datos fuera del encabezado: pandas las agrega como 'Unnamed: i'
+                ultimo = max((i for i, valor in enumerate(fila) if valor is not None), default=-1)
+                for i in range(len(nombres), ultimo + 1):
+                    nombres.append(f"Unnamed: {i}")
+                    indices.append(i)
+                    datos[i] = [np.nan] * total_filas
+            largo = len(fila)
+            for i in indices:
+                datos[i].append(convertir_celda(fila[i]) if i < largo else np.nan)
+            total_filas += 1
+            if filas_por_bloque is not None and total_filas >= filas_por_bloque:
+                yield _armar_bloque(nombres, indices, datos, inicio, total_filas)
+                datos = {i: [] for i in indices}
+                inicio += total_filas
+                total_filas = 0
+
+        if total_filas or inicio == 0:
+            yield _armar_bloque(nombres, indices, datos, inicio, total_filas)
+    finally:
+        filas.close()
+
+
+def listar_hojas(file_path, lector=None):
+    """Nombres de las hojas del libro, leídos con el primer lector que pueda abrirlo"""
+    candidatos = elegir_lectores(file_path, lector)
+    for numero, nombre in enumerate(candidatos, start=1):
+        try:
+            if nombre in ('iterparse', 'openpyxl'):
+                return lector_xlsx.nombres_hojas(file_path)
+            return lectores.nombres_hojas(file_path, nombre)
+        except Exception:
+            if numero == len(candidatos):
+                raise
+
+
+def cargar_principal_pandas(file_path, sheet_name=HOJA_PRINCIPAL):
+    """Carga original con pd.read_excel, conservada para comparar"""
+    columnas_a_texto = {col: str for col in COLUMNAS_TEXTO}
+    # Saltar las primeras 11 filas (1 a 11) y tomar la fila 12 (índice 11) como encabezado
+    return pd.read_excel(file_path, header=FILA_ENCABEZADO - 1, dtype=columnas_a_texto, sheet_name=sheet_name)
+
+
+CARGADORES = {
+    'streaming': cargar_principal_streaming,
+    'pandas': cargar_principal_pandas,
+}
+
+
+def cargar_catalogo(file_path, cargador='streaming', lineas=None, columnas=None, log=None, medir_memoria=False,
+                    cache=None, progreso=None, hoja=HOJA_PRINCIPAL, lector=None):
+    """Carga un catálogo con el cargador indicado, registrando tiempo y memoria.
+
+    Si se pasa un ``CacheCatalogos`` y el archivo no cambió desde la última carga
+    con los mismos parámetros, el DataFrame se lee del cache en lugar del Excel.
+    ``progreso`` (solo con el cargador streaming) recibe la fracción leída.
+    ``hoja`` es la hoja a cargar, con el mismo formato que 'principal'.
+    ``lector`` fuerza un lector de ``LECTORES`` (None = el más rápido disponible
+    para el formato del archivo).
+    """
+    log = log or (lambda message: None)
+    if cargador not in CARGADORES:
+        raise ValueError(f"Cargador desconocido: {cargador}")
+    candidatos = elegir_lectores(file_path, lector) if cargador == 'streaming' else None
+
+    if cache is not None:
+        inicio = time.perf_counter()
+        # La hoja solo entra en la clave si no es 'principal', para conservar las entradas existentes
+        otra_hoja = {'hoja': hoja} if hoja != HOJA_PRINCIPAL else {}
+        clave = cache.clave(file_path,
+                            lineas=sorted(lineas) if lineas is not None else None,
+                            columnas=list(columnas) if columnas is not None else None,
+                            **otra_hoja)
+        df = cache.obtener(clave)
+        if df is not None:
+            log(f"Carga (cache): {time.perf_counter() - inicio:.2f} s")
+            log(f"Archivo cargado: {_nombre_carga(file_path, hoja)}")
+            return df
+
+    with medir_carga(log, cargador, medir_memoria) as carga:
+        if cargador == 'pandas':
+            df = cargar_principal_pandas(file_path, sheet_name=hoja)
+            if lineas is not None:
+                columna_linea = identificar_columna_linea(list(df.columns))
+                if columna_linea is not None:
+                    df = df[df[columna_linea].isin(lineas)].reset_index(drop=True)
+            if columnas is not None:
+                df = df[[col for col in df.columns if col in columnas]]
+        else:
+            for numero, nombre in enumerate(candidatos, start=1):
+                carga['descripcion'] = f"{cargador}, {nombre}"
+                try:
+                    df = cargar_principal_streaming(file_path, lineas=lineas, columnas=columnas, sheet_name=hoja,
+                                                    lector=nombre, progreso=progreso)
+                    break
+                except LectorFallido as e:
+                    if numero == len(candidatos):
+                        raise e.__cause__
+                    log(f"ADVERTENCIA: El lector {nombre} no pudo leer "
+                        f"{os.path.basename(file_path)} ({e}); se usa {candidatos[numero]}")
+
+    if cache is not None:
+        try:
+            cache.guardar(clave, df)
+        except OSError as e:
+            log(f"ADVERTENCIA: No se pudo guardar el catálogo en cache: {e}")
+
+    log(f"Archivo cargado: {_nombre_carga(file_path, hoja)}")
+    return df
+
+
+def iterar_catalogo(file_path, filas_por_bloque, lineas=None, log=None, progreso=None, hoja=HOJA_PRINCIPAL,
+                    lector=None):
+    """Genera el catálogo en DataFrames de hasta ``filas_por_bloque`` filas, sin tenerlo entero en memoria.
+
+    Sin ``lector`` se prefieren los lectores que recorren la hoja fila por fila
+    (calamine y xlrd la leen entera antes de la primera fila); si el lector no
+    puede abrir el libro se prueba el siguiente, como en ``cargar_catalogo``.
+    """
+    log = log or (lambda message: None)
+    candidatos = elegir_lectores(file_path, lector)
+    if lector is None:
+        candidatos = [nombre for nombre in candidatos if nombre not in LECTORES_EN_MEMORIA] or candidatos
+    for numero, nombre in enumerate(candidatos, start=1):
+        bloques = iterar_principal_streaming(file_path, filas_por_bloque, lineas=lineas, sheet_name=hoja,
+                                             lector=nombre, progreso=progreso)
+        try:
+            primero = next(bloques, None)
+        except LectorFallido as e:
+            if numero == len(candidatos):
+                raise e.__cause__
+            log(f"ADVERTENCIA: El lector {nombre} no pudo leer "
+                f"{os.path.basename(file_path)} ({e}); se usa {candidatos[numero]}")
+            continue
+        with closing(bloques):
+            log(f"Lectura por bloques de {filas_por_bloque} filas ({nombre}): {_nombre_carga(file_path, hoja)}")
+            if primero is not None:
+                yield primero
+                yield from bloques
+        return
+
+
+def _nombre_carga(file_path, hoja):
+    nombre = os.path.basename(file_path)
+    return nombre if hoja == HOJA_PRINCIPAL else f"{nombre} (hoja '{hoja}')"
@@ -0,0 +1,448 @@
+"""Procesamiento por lotes desde la línea de comandos.
+
+Ejemplo::
+
+    python -m procesador catalogos/ -o salida/ --zona GBA-CABA --zona INTERIOR \\
+        --lineas 1,2 --lineas 8,31,32 -j 4
+
+Con ``--variantes`` cada catálogo se carga una sola vez y se generan todas las
+variantes zona × líneas (por defecto cada línea fija y todas juntas), escribiendo
+los libros en paralelo; al final se imprime un resumen por variante::
+
+    python -m procesador catalogo.xlsx -o salida/ --variantes -j 4
+
+``--metricas`` agrega el tiempo, las filas y la memoria de cada etapa a un archivo
+JSON lines y ``--perfil-cpu`` guarda un perfil de cProfile por catálogo.
+
+Con ``--incremental`` se guarda el estado de cada salida y en las corridas
+siguientes solo se recalculan los rubros que cambiaron; los libros sin cambios
+no se vuelven a escribir::
+
+    python -m procesador catalogo.xlsx -o salida/ --incremental estado/
+
+``--formato txt`` escribe directamente el TXT tabulado que toma InDesign (sin
+pasar por el libro si no se pide también ``--formato xlsx``)::
+
+    python -m procesador catalogo.xlsx -o salida/ --formato txt --formato xlsx
+
+Con ``--fusionar`` las hojas de todos los archivos se cargan en paralelo y se
+procesan como un solo catálogo; un código repetido entre hojas se toma de la hoja
+indicada por ``--precedencia``::
+
+    python -m procesador proveedor/*.xlsx -o salida/ --fusionar proveedor --hojas '*' --precedencia reciente
+
+``--perfil`` aplica a todos los catálogos un perfil de proceso JSON/TOML (columnas
+de precio por zona, columnas eliminadas, columnas numéricas y líneas fijas) y
+``--guardar-perfil`` lo guarda junto con las zonas, líneas y formatos de la
+corrida, para repetirla después con solo ``--perfil``::
+
+    python -m procesador catalogos/ -o salida/ --perfil proveedor_b.toml -z INTERIOR --guardar-perfil lunes.json
+    python -m procesador catalogos/ -o salida/ --perfil lunes.json
+
+Los catálogos .xlsx, .xlsm, .xlsb y .xls se leen con el lector más rápido
+instalado para cada formato (calamine, pyxlsb, xlrd); ``--lector`` fuerza uno.
+
+Con ``--memoria-max`` los catálogos que no entran en memoria se procesan por
+particiones: se leen de a bloques, se reparten por Rubro en disco y se escriben
+rubro por rubro, reteniendo en memoria a lo sumo los MB indicados::
+
+    python -m procesador consolidado.xlsx -o salida/ --memoria-max 1024 -j 1
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import nullcontext
+
+from .cache import CacheCatalogos
+from .cargador import CARGADORES, LECTORES
+from .diseno import cargar_perfiles_diseno
+from .fusion import PRECEDENCIAS, cargar_fusion
+from .incremental import exportar_incremental
+from .metricas import Metricas, perfil_cpu
+from .particiones import procesar_por_particiones
+from .exportador import CODIFICACION_TEXTO_DEFAULT, CODIFICACIONES_TEXTO, SEPARADORES_DECIMALES
+from .motor import FORMATOS_SALIDA, MOTORES_EXCEL, ProcesadorCatalogo, nombre_salida
+from .perfiles import (CLAVES_CORRIDA, LINEAS_FIJAS, PERFIL_ESTANDAR, PerfilProceso, cargar_perfil_proceso,
+                       guardar_perfil_proceso)
+from .variantes import combinaciones_variantes, formatear_resumen, generar_variantes, grupos_lineas_default
+
+EXTENSIONES = ('.xlsx', '.xlsm', '.xlsb', '.xls')
+
+
+def buscar_catalogos(entradas):
+    """Expande archivos y directorios a la lista de catálogos a procesar"""
+    archivos = []
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            for nombre in sorted(os.listdir(entrada)):
+                # Ignorar archivos temporales de Excel (~$archivo.xlsx)
+                if nombre.lower().endswith(EXTENSIONES) and not nombre.startswith('~$'):
+                    archivos.append(os.path.join(entrada, nombre))
+        else:
+            archivos.extend(sorted(glob.glob(entrada)) or [entrada])
+    return archivos
+
+
+def parsear_lineas(texto):
+    try:
+        lineas = [int(parte) for parte in texto.split(',') if parte.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Lista de líneas inválida: {texto!r}")
+    if not lineas:
+        raise argparse.ArgumentTypeError("Debe indicar al menos una línea")
+    return lineas
+
+
+def _log_archivo(file_path):
+    nombre = os.path.basename(file_path)
+
+    def log(message):
+        print(f"[{nombre}] {message}", flush=True)
+
+    return log
+
+
+def _perfil_catalogo(file_path, directorio):
+    """cProfile de todo el procesamiento del catálogo si se pidió --perfil-cpu"""
+    if directorio is None:
+        return nullcontext()
+    os.makedirs(directorio, exist_ok=True)
+    base = os.path.splitext(os.path.basename(file_path))[0]
+    return perfil_cpu(os.path.join(directorio, f"{base}.prof"), _log_archivo(file_path))
+
+
+def procesar_catalogo_lote(file_path, combinaciones, directorio_salida, verbose=False,
+                           cargador='streaming', medir_memoria=False, cache_dir=None, cache_max_mb=None,
+                           motor_excel='rapido', perfiles=None, archivo_metricas=None, perfil_cpu_dir=None,
+                           estado_dir=None, exportacion=None, lector=None, memoria_max=None):
+    """Tarea de un worker: carga el catálogo una vez y genera todas las combinaciones.
+
+    Devuelve (salida, filas, escrito) por archivo escrito; ``escrito`` es False
+    cuando el modo incremental no encontró cambios. ``exportacion`` son los
+    formatos y opciones de texto de ``opciones_exportacion``. Con ``memoria_max``
+    (MB) el catálogo se procesa por particiones en lugar de cargarlo entero.
+    """
+    log = _log_archivo(file_path) if verbose else None
+    cache = None
+    if cache_dir is not None:
+        cache = CacheCatalogos(cache_dir, max_bytes=int(cache_max_mb * 1024 ** 2), log=log)
+    metricas = Metricas(log, archivo=archivo_metricas, medir_memoria=medir_memoria)
+    procesador = ProcesadorCatalogo(log, cargador=cargador, medir_memoria=medir_memoria, cache=cache,
+                                    motor_excel=motor_excel, metricas=metricas, lector=lector,
+                                    **(exportacion or {}))
+    inicio = time.perf_counter()
+    with _perfil_catalogo(file_path, perfil_cpu_dir):
+        if memoria_max is not None:
+            salidas = procesar_por_particiones(procesador, file_path, combinaciones, directorio_salida, perfiles,
+                                               memoria_mb=memoria_max)
+        else:
+            df = procesador.cargar_archivo(file_path, lineas=lineas_usadas(combinaciones))
+            salidas = exportar_combinaciones(procesador, df, file_path, combinaciones, directorio_salida, perfiles,
+                                             estado_dir)
+
+    return file_path, salidas, time.perf_counter() - inicio
+
+
+def lineas_usadas(combinaciones):
+    """Líneas que usa alguna combinación: al cargar solo se leen las filas de esas líneas"""
+    return sorted({linea for _, lineas in combinaciones for linea in lineas})
+
+
+def exportar_combinaciones(procesador, df, file_path, combinaciones, directorio_salida, perfiles=None,
+                           estado_dir=None):
+    """Procesa y exporta cada combinación (× diseño) de un catálogo ya cargado.
+
+    Devuelve (salida, filas, escrito) por archivo escrito; ``file_path`` solo se
+    usa para armar los nombres de salida.
+    """
+    salidas = []
+    for zona, lineas in combinaciones:
+        if estado_dir is not None:
+            for perfil in perfiles or [None]:
+                diseno = perfil.nombre if perfil is not None else None
+                salida = os.path.join(directorio_salida, nombre_salida(file_path, zona, lineas, diseno=diseno))
+                resultado = exportar_incremental(procesador, df, zona, lineas, salida, estado_dir, perfil)
+                salidas.extend((ruta, resultado['filas'], resultado['escrito']) for ruta in resultado['salidas'])
+            continue
+        if perfiles:
+            # Los pasos 1 a 6 se calculan una sola vez para todos los diseños
+            resultados = procesador.procesar_disenos(df, zona, lineas, perfiles).items()
+        else:
+            resultados = [(None, procesador.procesar(df, zona, lineas))]
+        for diseno, df_final in resultados:
+            salida = os.path.join(directorio_salida, nombre_salida(file_path, zona, lineas, diseno=diseno))
+            for ruta in procesador.exportar(df_final, salida, zona, lineas):
+                salidas.append((ruta, len(df_final), True))
+    return salidas
+
+
+def _imprimir_salidas(nombre, salidas, duracion):
+    for salida, filas, escrito in salidas:
+        estado = "" if escrito else ", sin cambios"
+        print(f"{nombre} -> {salida} ({filas} filas{estado})")
+    print(f"{nombre}: {duracion:.2f} s")
+
+
+def procesar_variantes(archivos, combinaciones, args, perfiles):
+    """Modo --variantes: una carga por catálogo y los libros escritos en paralelo"""
+    errores = 0
+    cache = None
+    if args.cache_dir is not None:
+        cache = CacheCatalogos(args.cache_dir, max_bytes=int(args.cache_max_mb * 1024 ** 2))
+    for archivo in archivos:
+        log = _log_archivo(archivo) if args.verbose else None
+        metricas = Metricas(log, archivo=args.metricas, medir_memoria=args.medir_memoria)
+        procesador = ProcesadorCatalogo(log, cargador=args.cargador, medir_memoria=args.medir_memoria,
+                                        cache=cache, motor_excel=args.motor_excel, metricas=metricas,
+                                        lector=args.lector, **opciones_exportacion(args))
+        inicio = time.perf_counter()
+        try:
+            with _perfil_catalogo(archivo, args.perfil_cpu):
+                df = procesador.cargar_archivo(archivo, lineas=lineas_usadas(combinaciones))
+                resumen = generar_variantes(procesador, df, archivo, combinaciones, args.salida,
+                                            perfiles=perfiles, workers=max(1, args.workers))
+        except Exception as e:
+            errores += 1
+            print(f"ERROR en {os.path.basename(archivo)}: {e}", file=sys.stderr)
+            continue
+        print(f"\n{os.path.basename(archivo)}: {len(resumen)} variante(s) en {time.perf_counter() - inicio:.2f} s")
+        print(formatear_resumen(resumen))
+    return errores
+
+
+def procesar_fusion(archivos, combinaciones, args, perfiles):
+    """Modo --fusionar: las hojas de todos los archivos forman un solo catálogo"""
+    nombre = args.fusionar
+    log = _log_archivo(nombre) if args.verbose else None
+    cache = None
+    if args.cache_dir is not None:
+        cache = CacheCatalogos(args.cache_dir, max_bytes=int(args.cache_max_mb * 1024 ** 2), log=log)
+    metricas = Metricas(log, archivo=args.metricas, medir_memoria=args.medir_memoria)
+    procesador = ProcesadorCatalogo(log, cargador=args.cargador, medir_memoria=args.medir_memoria,
+                                    cache=cache, motor_excel=args.motor_excel, metricas=metricas,
+                                    lector=args.lector, **opciones_exportacion(args))
+    inicio = time.perf_counter()
+    try:
+        with _perfil_catalogo(nombre, args.perfil_cpu):
+            df = cargar_fusion(procesador, archivos, hojas=args.hojas, lineas=lineas_usadas(combinaciones),
+                               precedencia=args.precedencia, workers=max(1, args.workers))
+            if args.variantes:
+                resumen = generar_variantes(procesador, df, nombre, combinaciones, args.salida,
+                                            perfiles=perfiles, workers=max(1, args.workers))
+            else:
+                salidas = exportar_combinaciones(procesador, df, nombre, combinaciones, args.salida, perfiles,
+                                                 args.incremental)
+    except Exception as e:
+        print(f"ERROR en la fusión {nombre}: {e}", file=sys.stderr)
+        return 1
+
+    if args.variantes:
+        print(f"\n{nombre}: {len(resumen)} variante(s) en {time.perf_counter() - inicio:.2f} s")
+        print(formatear_resumen(resumen))
+    else:
+        _imprimir_salidas(nombre, salidas, time.perf_counter() - inicio)
+    return 0
+
+
+def opciones_exportacion(args):
+    """Formatos de salida, opciones del texto y perfil de proceso para ``ProcesadorCatalogo``"""
+    return {'formatos': args.formatos, 'codificacion_texto': args.codificacion_texto,
+            'decimal_texto': args.decimal_texto, 'perfil_proceso': args.perfil_proceso}
+
+
+# Argumento de la línea de comandos de cada clave de la corrida guardada en el perfil
+ARGUMENTOS_CORRIDA = {'zonas': 'zonas', 'lineas': 'conjuntos_lineas', 'formatos': 'formatos'}
+
+
+def aplicar_corrida(args, perfil):
+    """Completa las zonas, líneas y formatos no indicados con los de la corrida del perfil"""
+    for clave in CLAVES_CORRIDA:
+        if getattr(args, ARGUMENTOS_CORRIDA[clave]) is None and clave in perfil.corrida:
+            setattr(args, ARGUMENTOS_CORRIDA[clave], perfil.corrida[clave])
+
+
+def perfil_con_corrida(args, perfil):
+    """Copia del perfil con las zonas, líneas y formatos de esta corrida"""
+    corrida = {clave: getattr(args, ARGUMENTOS_CORRIDA[clave]) for clave in CLAVES_CORRIDA
+               if getattr(args, ARGUMENTOS_CORRIDA[clave]) is not None}
+    return PerfilProceso.desde_dict(dict(perfil.a_dict(), corrida=corrida))
+
+
+def parsear_hojas(texto):
+    hojas = [parte.strip() for parte in texto.split(',') if parte.strip()]
+    if not hojas:
+        raise argparse.ArgumentTypeError("Debe indicar al menos una hoja")
+    return hojas
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(
+        prog="procesador",
+        description="Procesa catálogos Excel en lote para todas las combinaciones zona × líneas.")
+    parser.add_argument("entradas", nargs="+",
+                        help="Archivos, patrones glob o directorios con catálogos .xlsx/.xlsm/.xlsb/.xls")
+    parser.add_argument("-o", "--salida", default=".",
+                        help="Directorio donde se escriben los archivos procesados (default: actual)")
+    parser.add_argument("-z", "--zona", action="append", dest="zonas",
+                        help="Zona a generar; puede repetirse (default: todas las del perfil de proceso)")
+    parser.add_argument("-l", "--lineas", action="append", type=parsear_lineas, dest="conjuntos_lineas",
+                        help="Conjunto de líneas separadas por coma, p. ej. 1,2,8; puede repetirse "
+                             f"(default: las líneas fijas del perfil, {','.join(map(str, LINEAS_FIJAS))})")
+    parser.add_argument("--perfil", metavar="ARCHIVO",
+                        help="Perfil de proceso JSON o TOML: columnas de precio por zona, columnas eliminadas, "
+                             "columnas numéricas, líneas fijas y (opcional) la corrida guardada")
+    parser.add_argument("--guardar-perfil", metavar="ARCHIVO",
+                        help="Guarda en JSON el perfil de proceso con las zonas, líneas y formatos de esta corrida")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1,
+                        help="Cantidad de procesos en paralelo (default: núcleos disponibles)")
+    parser.add_argument("--cargador", choices=sorted(CARGADORES), default="streaming",
+                        help="Cargador de la hoja 'principal' (default: streaming)")
+    parser.add_argument("--lector", choices=sorted(LECTORES),
+                        help="Lector de hojas del cargador streaming (default: el más rápido instalado "
+                             "para el formato de cada archivo)")
+    parser.add_argument("--medir-memoria", action="store_true",
+                        help="Mide el pico de memoria de cada etapa con tracemalloc (más lento)")
+    parser.add_argument("-d", "--diseno", action="append", dest="disenos",
+                        help="Archivo JSON con uno o más perfiles de diseño de página; puede repetirse "
+                             "(default: múltiplo de 8)")
+    parser.add_argument("--motor-excel", choices=MOTORES_EXCEL, default="rapido",
+                        help="Escritura del Excel: 'rapido' (streaming) u 'openpyxl' (estilos celda por celda)")
+    parser.add_argument("-f", "--formato", action="append", choices=FORMATOS_SALIDA, dest="formatos",
+                        help="Formato de salida; puede repetirse (default: xlsx). 'txt' (tabulado) y 'csv' "
+                             "escriben directamente el texto para InDesign; sin 'xlsx' no se genera el libro")
+    parser.add_argument("--codificacion-texto", choices=CODIFICACIONES_TEXTO, default=CODIFICACION_TEXTO_DEFAULT,
+                        help=f"Codificación de los archivos txt/csv (default: {CODIFICACION_TEXTO_DEFAULT})")
+    parser.add_argument("--decimal-texto", choices=SEPARADORES_DECIMALES, default=".",
+                        help="Separador decimal de los archivos txt/csv (default: '.')")
+    parser.add_argument("--cache-dir",
+                        help="Directorio del cache de catálogos parseados (sin este argumento no se usa cache)")
+    parser.add_argument("--cache-max-mb", type=float, default=2048,
+                        help="Tamaño máximo del cache en MB (default: 2048)")
+    parser.add_argument("--memoria-max", type=float, metavar="MB",
+                        help="Procesa cada catálogo por particiones en disco sin cargarlo entero, reteniendo "
+                             "en memoria a lo sumo MB megabytes de filas (para catálogos que no entran en memoria)")
+    parser.add_argument("--variantes", action="store_true",
+                        help="Carga cada catálogo una vez, genera todas las variantes zona × líneas "
+                             "(por defecto cada línea fija y todas juntas) y escribe los libros en paralelo")
+    parser.add_argument("--metricas", metavar="ARCHIVO",
+                        help="Agrega las métricas de cada etapa (tiempo, filas, memoria) a un archivo JSON lines")
+    parser.add_argument("--perfil-cpu", metavar="DIRECTORIO",
+                        help="Guarda un perfil de cProfile por catálogo (<catalogo>.prof) en el directorio")
+    parser.add_argument("--incremental", metavar="DIRECTORIO",
+                        help="Guarda el estado de cada salida en el directorio y en las corridas siguientes "
+                             "recalcula solo los rubros que cambiaron (no reescribe los libros sin cambios)")
+    parser.add_argument("--fusionar", metavar="NOMBRE",
+                        help="Fusiona las hojas de todos los archivos en un solo catálogo; NOMBRE se usa "
+                             "para los archivos de salida")
+    parser.add_argument("--hojas", type=parsear_hojas,
+                        help="Con --fusionar: hojas a leer de cada archivo separadas por coma, o '*' para "
+                             "todas (default: principal)")
+    parser.add_argument("--precedencia", choices=PRECEDENCIAS, default="primero",
+                        help="Con --fusionar: qué hoja conserva un Codigo repetido entre hojas: la primera, "
+                             "la última o la del archivo más reciente (default: primero)")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                        help="Muestra el log detallado de cada catálogo")
+    return parser
+
+
+def main(argv=None):
+    parser = crear_parser()
+    args = parser.parse_args(argv)
+    if args.variantes and args.incremental:
+        parser.error("--incremental no se puede combinar con --variantes")
+    if args.hojas and not args.fusionar:
+        parser.error("--hojas requiere --fusionar")
+    if args.memoria_max is not None:
+        if args.memoria_max <= 0:
+            parser.error("--memoria-max debe ser mayor a 0")
+        incompatibles = [opcion for opcion, usada in [("--variantes", args.variantes),
+                                                       ("--incremental", args.incremental),
+                                                       ("--fusionar", args.fusionar),
+                                                       ("--cache-dir", args.cache_dir),
+                                                       ("--cargador pandas", args.cargador == 'pandas'),
+                                                       ("--motor-excel openpyxl", args.motor_excel == 'openpyxl')]
+                         if usada]
+        if incompatibles:
+            parser.error(f"--memoria-max no se puede combinar con {', '.join(incompatibles)}")
+
+    perfil = PERFIL_ESTANDAR
+    if args.perfil:
+        try:
+            perfil = cargar_perfil_proceso(args.perfil)
+        except (OSError, ValueError, TypeError) as e:
+            print(f"ERROR: No se pudo cargar el perfil de proceso: {e}", file=sys.stderr)
+            return 1
+    aplicar_corrida(args, perfil)
+    args.perfil_proceso = perfil
+    desconocidas = [zona for zona in args.zonas or [] if zona not in perfil.zonas]
+    if desconocidas:
+        parser.error(f"Zona(s) desconocida(s) para el perfil '{perfil.nombre}': {', '.join(desconocidas)} "
+                     f"(disponibles: {', '.join(perfil.zonas)})")
+    if args.guardar_perfil:
+        try:
+            guardar_perfil_proceso(args.guardar_perfil, perfil_con_corrida(args, perfil))
+        except OSError as e:
+            print(f"ERROR: No se pudo guardar el perfil de proceso: {e}", file=sys.stderr)
+            return 1
+        print(f"Perfil de proceso guardado en {args.guardar_perfil}")
+
+    zonas = args.zonas or list(perfil.zonas)
+    if args.variantes:
+        combinaciones = combinaciones_variantes(zonas, args.conjuntos_lineas
+                                                or grupos_lineas_default(perfil.lineas_fijas))
+    else:
+        conjuntos_lineas = args.conjuntos_lineas or [perfil.lineas_fijas]
+        combinaciones = [(zona, lineas) for zona in zonas for lineas in conjuntos_lineas]
+
+    perfiles = None
+    if args.disenos:
+        try:
+            perfiles = [perfil for path in args.disenos for perfil in cargar_perfiles_diseno(path)]
+        except (OSError, ValueError, TypeError) as e:
+            print(f"ERROR: No se pudieron cargar los perfiles de diseño: {e}", file=sys.stderr)
+            return 1
+
+    archivos = buscar_catalogos(args.entradas)
+    if not archivos:
+        print("ERROR: No se encontraron catálogos para procesar", file=sys.stderr)
+        return 1
+
+    os.makedirs(args.salida, exist_ok=True)
+    if args.fusionar:
+        print(f"Fusionando {len(archivos)} archivo(s) × {len(combinaciones)} combinación(es) "
+              f"con {args.workers} proceso(s)")
+        return procesar_fusion(archivos, combinaciones, args, perfiles)
+
+    print(f"Procesando {len(archivos)} catálogo(s) × {len(combinaciones)} combinación(es) "
+          f"con {args.workers} proceso(s)")
+
+    if args.variantes:
+        return 1 if procesar_variantes(archivos, combinaciones, args, perfiles) else 0
+
+    errores = 0
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as executor:
+        futuros = {
+            executor.submit(procesar_catalogo_lote, archivo, combinaciones, args.salida, args.verbose,
+                            args.cargador, args.medir_memoria, args.cache_dir, args.cache_max_mb,
+                            args.motor_excel, perfiles, args.metricas, args.perfil_cpu, args.incremental,
+                            opciones_exportacion(args), args.lector, args.memoria_max): archivo
+            for archivo in archivos
+        }
+        for futuro in as_completed(futuros):
+            archivo = futuros[futuro]
+            try:
+                _, salidas, duracion = futuro.result()
+            except Exception as e:
+                errores += 1
+                print(f"ERROR en {os.path.basename(archivo)}: {e}", file=sys.stderr)
+                continue
+            _imprimir_salidas(os.path.basename(archivo), salidas, duracion)
+
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
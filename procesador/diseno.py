@@ -0,0 +1,166 @@
+"""Perfiles de diseño de página para el relleno de rubros.
+
+Un perfil indica cuántos productos entran en una página (``bloque``), con
+excepciones por rubro o por línea, qué rubros deben empezar en un pliego nuevo y
+con qué valores se completan las filas de relleno. El perfil por defecto
+reproduce la regla del múltiplo de 8 y las filas "Vacio.eps" de siempre.
+
+Los perfiles se pueden cargar desde JSON (un objeto o una lista de objetos)::
+
+    {
+        "nombre": "plantilla_12",
+        "bloque": 12,
+        "bloque_por_rubro": {"10": 9, "33 Limpieza": 6},
+        "bloque_por_linea": {"31": 6},
+        "rubros_inicio_pliego": ["1", "20"],
+        "paginas_por_pliego": 2,
+        "plantilla_relleno": {"ord": "Vacio.eps", "0.05": 0.0}
+    }
+
+Las claves de rubro pueden ser el texto completo del rubro o su número inicial.
+"""
+import json
+import re
+
+import numpy as np
+
+BLOQUE_DEFAULT = 8
+
+# Valores de las filas vacías por columna; el resto de las columnas queda en VALOR_RELLENO_DEFAULT
+PLANTILLA_RELLENO_DEFAULT = {
+    'ord': "Vacio.eps",
+    'condicion': "",
+    'Marca': "",
+    'Codigo': "",
+    'Descripcion': "",
+    'peso': "",
+    '0.05': 0.00,
+    '0.07': 0.00,
+    '9/especial': 0.00,
+    '0.11': 0.00,
+    'precio_seleccionado': np.nan,  # Usar NaN para que quede vacío o 0 en Excel
+}
+VALOR_RELLENO_DEFAULT = ""
+
+
+def _numero_rubro(rubro):
+    match = re.match(r'^(\d+)', str(rubro))
+    return match.group(1) if match else None
+
+
+def _normalizar_claves(mapa):
+    return {str(clave): valor for clave, valor in (mapa or {}).items()}
+
+
+class PerfilDiseno:
+    """Reglas declarativas de paginado y relleno de un catálogo"""
+
+    def __init__(self, nombre='multiplo_8', bloque=BLOQUE_DEFAULT, bloque_por_rubro=None, bloque_por_linea=None,
+                 rubros_inicio_pliego=None, paginas_por_pliego=2, plantilla_relleno=None,
+                 valor_relleno=VALOR_RELLENO_DEFAULT):
+        self.nombre = nombre
+        self.bloque = int(bloque)
+        self.bloque_por_rubro = {clave: int(valor) for clave, valor in _normalizar_claves(bloque_por_rubro).items()}
+        self.bloque_por_linea = {clave: int(valor) for clave, valor in _normalizar_claves(bloque_por_linea).items()}
+        self.rubros_inicio_pliego = {str(rubro) for rubro in (rubros_inicio_pliego or [])}
+        self.paginas_por_pliego = int(paginas_por_pliego)
+        self.plantilla_relleno = dict(PLANTILLA_RELLENO_DEFAULT if plantilla_relleno is None else plantilla_relleno)
+        self.valor_relleno = valor_relleno
+
+        bloques = [self.bloque, *self.bloque_por_rubro.values(), *self.bloque_por_linea.values()]
+        if min(bloques) < 1:
+            raise ValueError(f"El tamaño de bloque debe ser mayor a 0 (perfil '{self.nombre}')")
+        if self.paginas_por_pliego < 1:
+            raise ValueError(f"paginas_por_pliego debe ser mayor a 0 (perfil '{self.nombre}')")
+
+    @classmethod
+    def desde_dict(cls, datos):
+        return cls(**datos)
+
+    def a_dict(self):
+        return {
+            'nombre': self.nombre,
+            'bloque': self.bloque,
+            'bloque_por_rubro': dict(self.bloque_por_rubro),
+            'bloque_por_linea': dict(self.bloque_por_linea),
+            'rubros_inicio_pliego': sorted(self.rubros_inicio_pliego),
+            'paginas_por_pliego': self.paginas_por_pliego,
+            'plantilla_relleno': dict(self.plantilla_relleno),
+            'valor_relleno': self.valor_relleno,
+        }
+
+    def _buscar(self, mapa_o_conjunto, rubro):
+        """Busca el rubro por su texto completo o por su número inicial"""
+        clave = str(rubro)
+        if clave in mapa_o_conjunto:
+            return clave
+        numero = _numero_rubro(rubro)
+        if numero is not None and numero in mapa_o_conjunto:
+            return numero
+        return None
+
+    def bloque_de(self, rubro, linea=None):
+        """Tamaño de página del rubro: regla del rubro, luego de la línea, luego el general"""
+        clave = self._buscar(self.bloque_por_rubro, rubro)
+        if clave is not None:
+            return self.bloque_por_rubro[clave]
+        if linea is not None and self.bloque_por_linea:
+            clave_linea = str(int(linea)) if isinstance(linea, float) and linea.is_integer() else str(linea)
+            if clave_linea in self.bloque_por_linea:
+                return self.bloque_por_linea[clave_linea]
+        return self.bloque
+
+    def inicia_pliego(self, rubro):
+        return self._buscar(self.rubros_inicio_pliego, rubro) is not None
+
+    def calcular_relleno(self, rubros, filas_rubro, lineas_rubro=None):
+        """Filas de relleno por rubro (en el orden recibido) y el bloque de cada uno.
+
+        Cada rubro se completa hasta un múltiplo de su bloque. Si un rubro debe
+        empezar en un pliego nuevo y la página actual no es la primera de un pliego,
+        se agregan páginas vacías al final del rubro anterior.
+        """
+        filas_rubro = np.asarray(filas_rubro, dtype=np.int64)
+        if lineas_rubro is None:
+            lineas_rubro = [None] * len(filas_rubro)
+        bloques = np.array([self.bloque_de(rubro, linea) for rubro, linea in zip(rubros, lineas_rubro)],
+                           dtype=np.int64)
+        faltantes = -filas_rubro % bloques if len(bloques) else np.zeros(0, dtype=np.int64)
+
+        if self.rubros_inicio_pliego and self.paginas_por_pliego > 1:
+            paginas = 0
+            for i, rubro in enumerate(rubros):
+                desfase = paginas % self.paginas_por_pliego
+                if i > 0 and desfase and self.inicia_pliego(rubro):
+                    extra = self.paginas_por_pliego - desfase
+                    faltantes[i - 1] += extra * bloques[i - 1]
+                    paginas += extra
+                paginas += (filas_rubro[i] + faltantes[i]) // bloques[i]
+
+        return faltantes, bloques
+
+    def valores_relleno(self, columnas, rubros, inicio_orden):
+        """Columnas de las filas de relleno (una fila por elemento de ``rubros``)"""
+        cantidad = len(rubros)
+        filas_vacias = {'orden': [inicio_orden + i for i in range(cantidad)]}
+        # Asegurarse de rellenar todas las columnas existentes con vacío o valor por defecto
+        for col in columnas:
+            if col == 'orden':
+                continue
+            elif col == 'Rubro':
+                filas_vacias[col] = list(rubros)
+            else:
+                filas_vacias[col] = [self.plantilla_relleno.get(col, self.valor_relleno)] * cantidad
+        return filas_vacias
+
+
+PERFIL_MULTIPLO_8 = PerfilDiseno()
+
+
+def cargar_perfiles_diseno(path):
+    """Lee uno o varios perfiles de diseño desde un archivo JSON"""
+    with open(path, encoding='utf-8') as f:
+        datos = json.load(f)
+    if isinstance(datos, dict):
+        datos = [datos]
+    return [PerfilDiseno.desde_dict(perfil) for perfil in datos]
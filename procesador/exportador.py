@@ -0,0 +1,271 @@
+"""Escritura rápida del Excel procesado con openpyxl en modo ``write_only``.
+
+Produce el mismo libro que ``exportar_excel_con_formato`` + ``aplicar_estilos_excel``
+(encabezados informativos en las filas 1 a 5, encabezado de datos en la fila 6 y
+datos desde la fila 7 con bordes y 2 decimales), pero en una sola pasada: cada
+celda recibe uno de pocos estilos con nombre compartidos en lugar de asignar
+``Border`` y ``number_format`` celda por celda, y los anchos de columna se calculan
+sobre el DataFrame antes de escribir en vez de recorrer la hoja.
+
+``escribir_texto`` escribe el mismo contenido como texto delimitado (el TXT
+tabulado que toma la combinación de datos de InDesign), sin pasar por el libro.
+Las variantes ``_bloques`` reciben los datos en bloques de filas, para escribir
+catálogos que no entran en memoria (``particiones.py``).
+"""
+import csv
+import os
+from copy import copy
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
+from openpyxl.styles.fonts import DEFAULT_FONT
+from openpyxl.utils import get_column_letter
+
+TITULO_HOJA = "Catálogo Procesado"
+FORMATO_NUMERO = '0.00'
+
+ESTILO_ENCABEZADO = 'catalogo_encabezado'
+ESTILO_DATO = 'catalogo_dato'
+ESTILO_NUMERO = 'catalogo_numero'
+
+# Cada cuántas filas escritas se informa el avance
+FILAS_POR_AVANCE = 500
+
+# Ancho de str(None): las celdas vacías de las filas 1 a 5 cuentan en el autoajuste original
+LARGO_CELDA_VACIA = len(str(None))
+
+
+def _borde():
+    return Border(left=Side(style='thin'), right=Side(style='thin'),
+                  top=Side(style='thin'), bottom=Side(style='thin'))
+
+
+def registrar_estilos(wb):
+    """Estilos con nombre que comparten todas las celdas de la hoja"""
+    wb.add_named_style(NamedStyle(
+        name=ESTILO_ENCABEZADO,
+        font=Font(bold=True, color="FFFFFF"),
+        fill=PatternFill(start_color="366092", end_color="366092", fill_type="solid"),
+        border=_borde(),
+        alignment=Alignment(horizontal='center'),
+    ))
+    # Los datos conservan la fuente por defecto del libro, como en la exportación original
+    wb.add_named_style(NamedStyle(name=ESTILO_DATO, font=copy(DEFAULT_FONT), border=_borde()))
+    wb.add_named_style(NamedStyle(name=ESTILO_NUMERO, font=copy(DEFAULT_FONT), border=_borde(),
+                                  number_format=FORMATO_NUMERO))
+
+
+def largo_maximo(serie):
+    """Largo máximo de ``str(valor)`` en la columna, sin recorrer celda por celda"""
+    if len(serie) == 0:
+        return 0
+    if serie.dtype.kind in 'biuf':
+        # numpy convierte igual que str(): 'nan', '1.5', 'True'
+        return int(np.char.str_len(serie.to_numpy().astype(str)).max())
+
+    largos = serie.str.len() if serie.dtype == object or pd.api.types.is_string_dtype(serie) else None
+    if largos is None:
+        return int(serie.map(str).str.len().max())
+    faltantes = largos.isna()
+    if faltantes.any():
+        # Valores que no son texto (NaN, números en columnas mixtas): str() uno por uno
+        largos = largos.copy()
+        largos[faltantes] = serie[faltantes].map(str).str.len()
+    return int(largos.max())
+
+
+def anchos_columnas(df, encabezados_info):
+    """Ancho de cada columna como el autoajuste original: largo máximo + 2"""
+    anchos = []
+    for i, col in enumerate(df.columns):
+        if i == 0:
+            largo_info = max((len(str(texto)) for texto in encabezados_info), default=0)
+        else:
+            largo_info = LARGO_CELDA_VACIA if encabezados_info else 0
+        largo = max(largo_info, len(str(col)), largo_maximo(df.iloc[:, i]))
+        anchos.append(largo + 2)
+    return anchos
+
+
+def escribir_excel(df_export, file_path, encabezados_info, columnas_numericas, progreso=None):
+    """Escribe el libro en modo streaming con los estilos y anchos ya calculados.
+
+    ``progreso`` recibe la fracción de filas escritas. Se escribe en un temporal y
+    se renombra al final, así que si ``progreso`` lanza una excepción (por ejemplo
+    al cancelar) el archivo de destino no se toca.
+    """
+    escribir_excel_bloques([df_export], df_export.columns, anchos_columnas(df_export, encabezados_info),
+                           len(df_export), file_path, encabezados_info, columnas_numericas, progreso)
+
+
+def escribir_excel_bloques(bloques, columnas, anchos, total, file_path, encabezados_info, columnas_numericas,
+                           progreso=None):
+    """Como ``escribir_excel``, con los datos en bloques consecutivos de filas.
+
+    Los bloques tienen todos las columnas ``columnas``; ``anchos`` (el máximo de
+    ``anchos_columnas`` de los bloques) y ``total`` (filas de todos los bloques)
+    se necesitan antes de escribir la primera fila.
+    """
+    wb = Workbook(write_only=True)
+    registrar_estilos(wb)
+    ws = wb.create_sheet(TITULO_HOJA)
+    temporal = f"{file_path}.{os.getpid()}.tmp"
+    try:
+        _escribir_hoja(ws, bloques, columnas, anchos, total, encabezados_info, columnas_numericas, progreso)
+    except BaseException:
+        # Guardar cierra la hoja write_only y borra el XML temporal de openpyxl; un error acá no
+        # debe tapar la excepción original (por ejemplo la cancelación)
+        try:
+            wb.save(temporal)
+        except Exception:
+            pass
+        _borrar(temporal)
+        raise
+
+    try:
+        wb.save(temporal)
+        os.replace(temporal, file_path)
+    except BaseException:
+        _borrar(temporal)
+        raise
+
+
+def _borrar(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _escribir_hoja(ws, bloques, columnas, anchos, total, encabezados_info, columnas_numericas, progreso):
+    # Los anchos deben definirse antes de escribir la primera fila
+    for i, ancho in enumerate(anchos, start=1):
+        ws.column_dimensions[get_column_letter(i)].width = ancho
+
+    # Encabezados informativos (Filas 1 a 5)
+    for texto in encabezados_info:
+        ws.append([texto])
+
+    # Encabezado de datos (Fila 6)
+    fila = []
+    for col in columnas:
+        cell = WriteOnlyCell(ws, value=col)
+        cell.style = ESTILO_ENCABEZADO
+        fila.append(cell)
+    ws.append(fila)
+
+    # Datos (Fila 7 en adelante)
+    estilos = [ESTILO_NUMERO if col in columnas_numericas else ESTILO_DATO for col in columnas]
+    numero = 0
+    for bloque in bloques:
+        for valores in bloque.itertuples(index=False, name=None):
+            numero += 1
+            if progreso is not None and numero % FILAS_POR_AVANCE == 0:
+                progreso(numero / total)
+            fila = []
+            for valor, estilo in zip(valores, estilos):
+                # Estilo antes que el valor: así las fechas conservan su formato de fecha
+                cell = WriteOnlyCell(ws)
+                cell.style = estilo
+                cell.value = valor
+                fila.append(cell)
+            ws.append(fila)
+
+
+# Separador por extensión del archivo de texto
+SEPARADORES_TEXTO = {'.txt': '\t', '.csv': ','}
+# 'utf-16' es lo que escribe Excel como "Texto Unicode": InDesign lo lee con tildes y eñes
+CODIFICACIONES_TEXTO = ['utf-16', 'utf-8-sig', 'cp1252']
+CODIFICACION_TEXTO_DEFAULT = 'utf-16'
+SEPARADORES_DECIMALES = ['.', ',']
+
+# Filas por llamada a to_csv: el texto se arma y se escribe de a bloques
+FILAS_POR_BLOQUE_TEXTO = 20000
+
+
+def _texto_general(valor, decimal='.'):
+    """Número como lo muestra Excel con formato General (1.0 -> '1'), con ``decimal`` como separador"""
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return str(valor).replace('.', decimal) if decimal != '.' else str(valor)
+
+
+def _decimal_en_objeto(valor, decimal):
+    """Decimales sueltos de una columna mixta, escritos como los de una columna decimal"""
+    if isinstance(valor, float):
+        return _texto_general(valor, decimal)
+    return valor
+
+
+def _dos_decimales(serie, decimal):
+    """Textos con 2 decimales (None en los vacíos); más rápido que ``float_format`` de to_csv"""
+    valores = serie.to_numpy(dtype=np.float64, na_value=np.nan)
+    if decimal == '.':
+        textos = [f"{valor:.2f}" for valor in valores.tolist()]
+    else:
+        textos = [f"{valor:.2f}".replace('.', decimal) for valor in valores.tolist()]
+    textos = np.array(textos, dtype=object)
+    textos[np.isnan(valores)] = None
+    return textos
+
+
+def columnas_para_texto(df_export, columnas_numericas, decimal='.'):
+    """Copia superficial con las columnas numéricas y decimales ya convertidas a texto.
+
+    Las columnas de ``columnas_numericas`` salen con 2 decimales (como el formato
+    '0.00' del libro); en el resto, los decimales enteros se escriben sin '.0',
+    también los sueltos de una columna mixta. Todos los decimales, de cualquier
+    columna, usan ``decimal`` como separador.
+    """
+    df_texto = df_export.copy(deep=False)
+    for col in df_texto.columns:
+        serie = df_texto[col]
+        if col in columnas_numericas and serie.dtype.kind in 'biuf':
+            df_texto[col] = _dos_decimales(serie, decimal)
+        elif serie.dtype.kind == 'f':
+            df_texto[col] = serie.astype(object).map(lambda valor: _texto_general(valor, decimal),
+                                                     na_action='ignore')
+        elif serie.dtype == object:
+            df_texto[col] = serie.map(lambda valor: _decimal_en_objeto(valor, decimal), na_action='ignore')
+    return df_texto
+
+
+def escribir_texto(df_export, file_path, columnas_numericas, separador='\t', codificacion=CODIFICACION_TEXTO_DEFAULT,
+                   decimal='.', progreso=None):
+    """Escribe los datos como texto delimitado, con el encabezado en la primera línea.
+
+    Los números de ``columnas_numericas`` van con 2 decimales y ``decimal`` como
+    separador; los valores vacíos quedan vacíos. Los campos con el separador,
+    comillas o saltos de línea van entre comillas, como en la exportación de
+    Excel. Se escribe en un temporal y se renombra al final, así que si
+    ``progreso`` lanza una excepción el archivo de destino no se toca.
+    """
+    total = len(df_export)
+    bloques = (df_export.iloc[inicio:inicio + FILAS_POR_BLOQUE_TEXTO]
+               for inicio in range(0, total, FILAS_POR_BLOQUE_TEXTO))
+    escribir_texto_bloques(bloques, df_export.columns, total, file_path, columnas_numericas, separador,
+                           codificacion, decimal, progreso)
+
+
+def escribir_texto_bloques(bloques, columnas, total, file_path, columnas_numericas, separador='\t',
+                           codificacion=CODIFICACION_TEXTO_DEFAULT, decimal='.', progreso=None):
+    """Como ``escribir_texto``, con los datos en bloques consecutivos de filas (``total`` en todos)"""
+    opciones = {'sep': separador, 'index': False, 'na_rep': '', 'lineterminator': '\r\n',
+                'quoting': csv.QUOTE_MINIMAL}
+    temporal = f"{file_path}.{os.getpid()}.tmp"
+    try:
+        with open(temporal, 'w', encoding=codificacion, errors='replace', newline='') as f:
+            pd.DataFrame(columns=columnas).to_csv(f, header=True, **opciones)
+            escritas = 0
+            for bloque in bloques:
+                columnas_para_texto(bloque, columnas_numericas, decimal).to_csv(f, header=False, **opciones)
+                escritas += len(bloque)
+                if progreso is not None:
+                    progreso(escritas / total)
+        os.replace(temporal, file_path)
+    except BaseException:
+        _borrar(temporal)
+        raise
@@ -0,0 +1,213 @@
+"""Fusión de catálogos repartidos en varios archivos u hojas.
+
+Algunos proveedores mandan el catálogo partido en varios libros o en varias hojas
+además de 'principal'. Cada hoja (con el mismo formato: preámbulo y encabezado en
+la fila 12) se carga en un pool de procesos, sus encabezados se unifican y las
+partes se concatenan en el orden de las fuentes.
+
+Si un mismo 'Codigo' aparece en más de una hoja se conservan solo las filas de la
+hoja con precedencia: la primera de la lista (``'primero'``), la última
+(``'ultimo'``) o la del archivo modificado más recientemente (``'reciente'``).
+Los duplicados dentro de una misma hoja no se tocan: los resuelve el paso 6 del
+pipeline, igual que con un solo archivo.
+"""
+import os
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from .cache import CacheCatalogos
+from .cargador import HOJA_PRINCIPAL, cargar_catalogo, columnas_pipeline, identificar_columna_linea, listar_hojas
+from .diseno import PLANTILLA_RELLENO_DEFAULT
+from .motor import ETAPA_CARGA
+from .perfiles import PERFIL_ESTANDAR
+
+PRECEDENCIAS = ['primero', 'ultimo', 'reciente']
+TODAS_LAS_HOJAS = '*'
+
+# Perfiles distintos cuyas columnas conocidas se recuerdan (una corrida usa uno solo)
+MAX_CANONICAS = 16
+
+
+def columnas_conocidas(perfil=PERFIL_ESTANDAR):
+    """Nombres a los que se llevan los encabezados escritos con otras mayúsculas, tildes o espacios"""
+    return list(dict.fromkeys(
+        columnas_pipeline(perfil) + list(PLANTILLA_RELLENO_DEFAULT)
+        + [col for col in perfil.columnas_numericas if col != 'precio_seleccionado']))
+
+
+def clave_encabezado(nombre):
+    """Encabezado sin tildes, en minúsculas y con los espacios colapsados"""
+    texto = unicodedata.normalize('NFKD', str(nombre)).encode('ascii', 'ignore').decode('ascii')
+    return " ".join(texto.lower().split())
+
+
+@lru_cache(maxsize=MAX_CANONICAS)
+def _canonicas(conocidas):
+    # Depende solo de las columnas conocidas del perfil: perfiles con las mismas columnas comparten la entrada
+    return {clave_encabezado(col): col for col in conocidas}
+
+
+def normalizar_columnas(columnas, perfil=PERFIL_ESTANDAR):
+    """Nombres unificados para las columnas de una hoja.
+
+    La columna de líneas se reconoce igual que al cargar (``identificar_columna_linea``)
+    y pasa a llamarse 'Linea'; el resto se compara con ``columnas_conocidas(perfil)``
+    sin distinguir mayúsculas, tildes ni espacios. Un nombre que ya existe en la
+    hoja no se repite: esa columna conserva su encabezado original.
+    """
+    canonicas = _canonicas(tuple(columnas_conocidas(perfil)))
+    columna_linea = identificar_columna_linea(list(columnas))
+    usados = set(columnas)
+    nombres = []
+    for col in columnas:
+        nuevo = 'Linea' if col == columna_linea else canonicas.get(clave_encabezado(col), col)
+        if nuevo != col and nuevo in usados:
+            nuevo = col
+        usados.add(nuevo)
+        nombres.append(nuevo)
+    return nombres
+
+
+def _codigo_como_texto(valor):
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return str(valor)
+
+
+def normalizar_hoja(df, perfil=PERFIL_ESTANDAR):
+    """Renombra las columnas de una hoja cargada y deja 'Codigo' como texto"""
+    nombres = normalizar_columnas(list(df.columns), perfil)
+    origen_codigo = next((col for col, nombre in zip(df.columns, nombres) if nombre == 'Codigo'), None)
+    df = df.set_axis(nombres, axis=1)
+    # Un 'CODIGO' o 'Código' no se leyó como texto: sin esto no coincidiría con el de las otras hojas
+    if origen_codigo not in (None, 'Codigo'):
+        df['Codigo'] = df['Codigo'].astype(object).map(_codigo_como_texto, na_action='ignore').infer_objects()
+    return df
+
+
+def fuentes_catalogo(archivos, hojas=None, log=None, lector=None):
+    """Lista de (archivo, hoja) a fusionar.
+
+    ``hojas`` son los nombres a buscar en cada archivo (None = solo 'principal',
+    ``['*']`` = todas las hojas); los archivos que no tienen una hoja pedida se
+    informan en el log y se saltean.
+    """
+    log = log or (lambda message: None)
+    hojas = hojas or [HOJA_PRINCIPAL]
+    fuentes = []
+    for archivo in archivos:
+        disponibles = listar_hojas(archivo, lector)
+        if TODAS_LAS_HOJAS in hojas:
+            elegidas = disponibles
+        else:
+            elegidas = [hoja for hoja in hojas if hoja in disponibles]
+            for hoja in hojas:
+                if hoja not in disponibles:
+                    log(f"ADVERTENCIA: {os.path.basename(archivo)} no tiene la hoja '{hoja}'")
+        fuentes.extend((archivo, hoja) for hoja in elegidas)
+    return fuentes
+
+
+def prioridades_fuentes(fuentes, precedencia='primero'):
+    """Prioridad de cada fuente (menor = gana los códigos repetidos)"""
+    if precedencia not in PRECEDENCIAS:
+        raise ValueError(f"Precedencia desconocida: {precedencia}")
+    posiciones = np.arange(len(fuentes))
+    if precedencia == 'primero':
+        return posiciones
+    if precedencia == 'ultimo':
+        return posiciones[::-1].copy()
+    # 'reciente': el archivo modificado último gana; entre hojas del mismo archivo, la primera
+    fechas = np.array([os.path.getmtime(archivo) for archivo, _ in fuentes])
+    orden = np.lexsort((posiciones, -fechas))
+    prioridades = np.empty(len(fuentes), dtype=np.intp)
+    prioridades[orden] = posiciones
+    return prioridades
+
+
+def combinar_hojas(partes, prioridades):
+    """Concatena las hojas y descarta los códigos que tienen precedencia en otra hoja.
+
+    Devuelve el catálogo combinado y la cantidad de filas descartadas.
+    """
+    df = pd.concat(partes, ignore_index=True, sort=False) if partes else pd.DataFrame()
+    if 'Codigo' not in df.columns or len(partes) < 2:
+        return df, 0
+    prioridad = np.repeat(np.asarray(prioridades), [len(parte) for parte in partes])
+    numeros, unicos = pd.factorize(df['Codigo'])
+    con_codigo = numeros >= 0
+    # Mejor prioridad de cada código entre todas las hojas donde aparece
+    mejor = np.full(len(unicos), np.iinfo(np.intp).max, dtype=np.intp)
+    np.minimum.at(mejor, numeros[con_codigo], prioridad[con_codigo])
+    conservar = ~con_codigo
+    conservar[con_codigo] = prioridad[con_codigo] == mejor[numeros[con_codigo]]
+    descartadas = int(len(df) - conservar.sum())
+    if descartadas:
+        df = df[conservar].reset_index(drop=True)
+    return df, descartadas
+
+
+def cargar_hoja(file_path, hoja, cargador='streaming', lineas=None, cache_dir=None, cache_max_bytes=None,
+                lector=None, perfil=PERFIL_ESTANDAR):
+    """Tarea de un worker: carga una hoja y unifica sus encabezados según el perfil de proceso"""
+    inicio = time.perf_counter()
+    cache = CacheCatalogos(cache_dir, max_bytes=cache_max_bytes) if cache_dir is not None else None
+    df = cargar_catalogo(file_path, cargador=cargador, lineas=lineas, cache=cache, hoja=hoja, lector=lector)
+    return normalizar_hoja(df, perfil), time.perf_counter() - inicio
+
+
+def cargar_fusion(procesador, archivos, hojas=None, lineas=None, precedencia='primero', workers=None):
+    """Carga, fusiona e indexa las hojas de varios archivos como un solo catálogo.
+
+    Las hojas se leen en paralelo con ``workers`` procesos (por defecto, uno por
+    núcleo) y sus encabezados se unifican con las columnas del perfil de proceso
+    de ``procesador``; el resultado queda listo para ``procesador.preparar`` como
+    si se hubiera cargado con ``cargar_archivo``.
+    """
+    fuentes = fuentes_catalogo(archivos, hojas, procesador.log, procesador.lector)
+    if not fuentes:
+        raise ValueError("No se encontraron hojas para fusionar")
+    prioridades = prioridades_fuentes(fuentes, precedencia)
+    workers = min(workers or os.cpu_count() or 1, len(fuentes))
+    cache = procesador.cache
+    argumentos = [(archivo, hoja, procesador.cargador, lineas,
+                   cache.directorio if cache is not None else None, cache.max_bytes if cache is not None else None,
+                   procesador.lector, procesador.perfil_proceso)
+                  for archivo, hoja in fuentes]
+
+    procesador.avanzar(ETAPA_CARGA, 0.0)
+    procesador.metricas.contexto = {'catalogo': ", ".join(os.path.basename(archivo) for archivo in archivos)}
+    partes = [None] * len(fuentes)
+    with procesador.metricas.etapa('carga') as registro:
+        executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            if executor is None:
+                resultados = ((i, cargar_hoja(*args)) for i, args in enumerate(argumentos))
+            else:
+                futuros = {executor.submit(cargar_hoja, *args): i for i, args in enumerate(argumentos)}
+                resultados = ((futuros[futuro], futuro.result()) for futuro in as_completed(futuros))
+            for listas, (i, (parte, segundos)) in enumerate(resultados, start=1):
+                archivo, hoja = fuentes[i]
+                partes[i] = parte
+                procesador.log(f"Hoja '{hoja}' de {os.path.basename(archivo)}: {len(parte)} filas en {segundos:.2f} s")
+                procesador.avanzar(ETAPA_CARGA, listas / len(fuentes))
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+        filas_cargadas = registro['filas_salida'] = sum(len(parte) for parte in partes)
+
+    with procesador.metricas.etapa('fusion', filas_entrada=filas_cargadas) as registro:
+        df, descartadas = combinar_hojas(partes, prioridades)
+        registro['filas_salida'] = len(df)
+    procesador.log(f"Fusión de {len(fuentes)} hoja(s): {len(df)} filas; {descartadas} fila(s) descartadas "
+                   f"por códigos con precedencia en otra hoja ({precedencia})")
+    procesador.log(f"Columnas: {list(df.columns)}")
+
+    df = procesador.medir_etapa('indexado', procesador.indexar_catalogo, df)
+    procesador.avanzar(ETAPA_CARGA, 1.0)
+    return df
@@ -0,0 +1,244 @@
+"""Reprocesamiento incremental contra la corrida anterior.
+
+Por cada archivo de salida se guarda el estado de la última corrida: las filas ya
+preparadas (pasos 1 a 6, antes del relleno), una firma por Rubro y una firma por
+Codigo calculadas sobre las filas del catálogo. Al reprocesar se comparan las
+firmas y solo se recalculan los rubros con cambios (filas modificadas, agregadas,
+eliminadas o reordenadas) y los rubros donde aparece algún código modificado,
+porque la eliminación de duplicados por 'Codigo' cruza rubros. Los demás rubros se
+toman tal como quedaron en la corrida anterior y el relleno se recalcula sobre el
+resultado completo.
+
+Si ningún rubro cambió y los archivos de salida siguen siendo los que se
+escribieron, no se vuelven a escribir. El libro es un .xlsx (un zip), así que
+cuando algo cambió se reescribe entero, igual que el texto.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from .cache import _nombre_a_json, guardar_dataframe, leer_dataframe
+from .diseno import PERFIL_MULTIPLO_8
+from .motor import COLUMNAS_AUXILIARES, ETAPA_PROCESO
+
+FORMATO_VERSION = 2
+
+# Mezcla la posición de cada fila dentro de su código para que la firma dependa del orden
+_MEZCLA_POSICION = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _clave_bloque(valor):
+    return None if pd.isna(valor) else str(valor)
+
+
+def bloques_de(df):
+    """Rubro de cada fila como texto (NaN para las filas sin Rubro)"""
+    if 'Rubro' not in df.columns:
+        return pd.Series(np.nan, index=df.index, dtype=object)
+    rubro = df['Rubro']
+    return rubro.astype(str).where(rubro.notna())
+
+
+def en_bloques(bloques, conjunto):
+    """Máscara de las filas cuyo Rubro está en ``conjunto`` (None representa las filas sin Rubro)"""
+    mascara = bloques.isin([bloque for bloque in conjunto if bloque is not None])
+    if None in conjunto:
+        mascara |= bloques.isna()
+    return mascara.to_numpy(dtype=bool)
+
+
+def hashes_filas(df):
+    """Hash de cada fila sobre sus valores (sin las columnas auxiliares calculadas al indexar)"""
+    return pd.util.hash_pandas_object(df.drop(columns=COLUMNAS_AUXILIARES, errors='ignore'),
+                                      index=False).to_numpy()
+
+
+def firmas_bloques(hashes, bloques):
+    """Firma de cada Rubro: sus filas en el orden del catálogo"""
+    firmas = {}
+    for bloque, posiciones in bloques.groupby(bloques, dropna=False, sort=False).indices.items():
+        firmas[_clave_bloque(bloque)] = hashlib.sha1(hashes[posiciones].tobytes()).hexdigest()
+    return firmas
+
+
+def firmas_codigos(hashes, codigos, bloques):
+    """Una fila por (Codigo, Rubro) con la firma de todas las filas del código"""
+    numeros, _ = pd.factorize(codigos, use_na_sentinel=False)
+    orden = np.argsort(numeros, kind='stable')
+    ordenados = numeros[orden]
+    inicios = np.flatnonzero(np.r_[True, ordenados[1:] != ordenados[:-1]]) if len(orden) else np.zeros(0, np.intp)
+    posicion = np.arange(len(orden)) - np.repeat(inicios, np.diff(np.r_[inicios, len(orden)]))
+    mezclados = pd.util.hash_array(hashes[orden] ^ (posicion.astype(np.uint64) * _MEZCLA_POSICION))
+    # Suma módulo 2**64 de las filas de cada código
+    firma_codigo = np.add.reduceat(mezclados, inicios) if len(inicios) else np.zeros(0, np.uint64)
+    firma = np.empty(len(firma_codigo), dtype=np.uint64)
+    firma[ordenados[inicios]] = firma_codigo
+    tabla = pd.DataFrame({'Codigo': codigos.to_numpy(dtype=object), 'bloque': bloques.to_numpy(dtype=object),
+                          'firma': firma[numeros]})
+    return tabla.drop_duplicates(subset=['Codigo', 'bloque'], ignore_index=True)
+
+
+def bloques_afectados(firmas, codigos, previo):
+    """Rubros a recalcular y cantidad de códigos modificados respecto del estado anterior"""
+    firmas_previas = dict((clave, firma) for clave, firma in previo['bloques'])
+    afectados = {bloque for bloque, firma in firmas.items() if firmas_previas.get(bloque) != firma}
+
+    # Códigos con filas distintas (o que aparecen o desaparecen): todos sus rubros, antes y ahora
+    anteriores = previo['codigos']
+    previas = anteriores.drop_duplicates('Codigo')[['Codigo', 'firma']]
+    actuales = codigos.drop_duplicates('Codigo')[['Codigo', 'firma']]
+    ambos = previas.merge(actuales, on='Codigo', suffixes=('_previa', ''))
+    modificados = pd.concat([
+        ambos.loc[ambos['firma_previa'] != ambos['firma'], 'Codigo'],
+        previas.loc[~previas['Codigo'].isin(actuales['Codigo']), 'Codigo'],
+        actuales.loc[~actuales['Codigo'].isin(previas['Codigo']), 'Codigo'],
+    ])
+    for tabla in (anteriores, codigos):
+        afectados.update(_clave_bloque(b) for b in tabla.loc[tabla['Codigo'].isin(modificados), 'bloque'].unique())
+    return afectados, len(modificados)
+
+
+def _json(datos):
+    return json.dumps(datos, sort_keys=True, default=str)
+
+
+def _directorio_estado(directorio, salida):
+    ruta = os.path.abspath(salida)
+    return os.path.join(directorio, f"{os.path.basename(ruta)}-{hashlib.sha1(ruta.encode('utf-8')).hexdigest()[:12]}")
+
+
+def _stat_salida(salida):
+    try:
+        stat = os.stat(salida)
+    except OSError:
+        return None
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _stat_salidas(rutas):
+    return {ruta: _stat_salida(ruta) for ruta in rutas}
+
+
+def leer_estado(directorio):
+    """Estado guardado de la corrida anterior, o None si no hay uno legible"""
+    try:
+        with open(os.path.join(directorio, 'estado.json'), encoding='utf-8') as f:
+            estado = json.load(f)
+        if estado.get('formato') != FORMATO_VERSION:
+            return None
+        codigos = leer_dataframe(os.path.join(directorio, 'codigos'))
+    except (OSError, ValueError, KeyError):
+        return None
+    codigos['firma'] = codigos['firma'].astype(np.uint64)
+    estado['codigos'] = codigos
+    return estado
+
+
+def guardar_estado(directorio, estado, preparado, codigos):
+    """Reemplaza el estado guardado escribiendo primero en un directorio temporal"""
+    padre = os.path.dirname(directorio)
+    os.makedirs(padre, exist_ok=True)
+    temporal = tempfile.mkdtemp(prefix='.tmp-', dir=padre)
+    try:
+        for nombre, df in (('preparado', preparado), ('codigos', codigos)):
+            os.mkdir(os.path.join(temporal, nombre))
+            guardar_dataframe(os.path.join(temporal, nombre), df)
+        with open(os.path.join(temporal, 'estado.json'), 'w', encoding='utf-8') as f:
+            json.dump(estado, f, ensure_ascii=False)
+        shutil.rmtree(directorio, ignore_errors=True)
+        os.rename(temporal, directorio)
+    except BaseException:
+        shutil.rmtree(temporal, ignore_errors=True)
+        raise
+
+
+def exportar_incremental(procesador, df, zona, lineas, salida, directorio_estado, perfil=None):
+    """Procesa y exporta una combinación recalculando solo los rubros que cambiaron.
+
+    ``df`` es el catálogo cargado e indexado; el estado de cada salida se guarda
+    en ``directorio_estado``. Devuelve un resumen con los archivos de salida (uno
+    por formato del procesador), las filas, los rubros recalculados y si los
+    archivos se escribieron.
+    """
+    directorio = _directorio_estado(directorio_estado, salida)
+    rutas = procesador.rutas_salida(salida)
+    columna_linea = procesador.identificar_columna_linea(df)
+    if columna_linea is not None:
+        filas = np.flatnonzero(df[columna_linea].isin(lineas).to_numpy())
+    else:
+        filas = np.arange(len(df))
+
+    with procesador.metricas.etapa('diferencias', filas_entrada=len(filas)) as registro:
+        df_lineas = df.take(filas)
+        bloques = bloques_de(df_lineas)
+        hashes = hashes_filas(df_lineas)
+        firmas = firmas_bloques(hashes, bloques)
+        codigos = firmas_codigos(hashes, df_lineas['Codigo'] if 'Codigo' in df_lineas.columns
+                                 else pd.Series(np.arange(len(df_lineas)), dtype=object), bloques)
+
+        parametros = {'zona': zona, 'lineas': list(lineas), 'perfil': (perfil or PERFIL_MULTIPLO_8).a_dict(),
+                      'proceso': procesador.perfil_proceso.reglas(),
+                      'columnas': [_nombre_a_json(col) for col in df_lineas.columns]}
+        previo = leer_estado(directorio)
+        # Comparación sobre el JSON: la plantilla de relleno puede tener NaN
+        if previo is not None and _json(previo['parametros']) != _json(parametros):
+            procesador.log("Incremental: cambiaron las columnas o los parámetros, se reprocesa todo")
+            previo = None
+
+        if previo is None:
+            afectados, modificados = set(firmas), len(codigos.drop_duplicates('Codigo'))
+        else:
+            afectados, modificados = bloques_afectados(firmas, codigos, previo)
+        en_afectados = en_bloques(bloques, afectados)
+        registro['filas_salida'] = int(en_afectados.sum())
+
+    procesador.log(f"Incremental: {len(afectados)} de {len(firmas)} rubro(s) con cambios "
+                   f"({modificados} código(s) modificado(s))")
+
+    if previo is not None and not afectados and previo.get('salidas') == _stat_salidas(rutas):
+        procesador.log(f"Sin cambios respecto de la corrida anterior: no se reescribe {', '.join(rutas)}")
+        procesador.avanzar(ETAPA_PROCESO, 1.0)
+        return {'salidas': rutas, 'filas': previo['filas'], 'rubros': len(firmas), 'recalculados': 0,
+                'escrito': False}
+
+    # Pasos 1 a 6 solo sobre las filas de los rubros afectados
+    filas_afectadas = filas[en_afectados]
+    if columna_linea is not None:
+        nuevas = procesador.preparar(df, zona, lineas, filas=filas_afectadas)
+    else:
+        nuevas = procesador.preparar(df.take(filas_afectadas), zona, lineas)
+
+    if previo is not None:
+        anteriores = leer_dataframe(os.path.join(directorio, 'preparado'))
+        reutilizadas = anteriores[~en_bloques(bloques_de(anteriores), afectados)]
+        if 'Codigo' in nuevas.columns and len(reutilizadas):
+            # Un código sin cambios que ya quedó en un rubro reutilizado ganó la eliminación de duplicados
+            nuevas = nuevas.take(np.flatnonzero(~nuevas['Codigo'].isin(reutilizadas['Codigo']).to_numpy()))
+        preparado = pd.concat([reutilizadas, nuevas.materializar()], ignore_index=True)
+    else:
+        preparado = nuevas.materializar()
+
+    # Paso 7 sobre el resultado completo: el relleno de un rubro puede depender de los anteriores
+    if perfil is None:
+        df_final = procesador.aplicar_multiplo_8(preparado)
+    else:
+        df_final = procesador.aplicar_diseno(preparado, perfil)
+    procesador.avanzar(ETAPA_PROCESO, 1.0)
+
+    procesador.exportar(df_final, salida, zona, lineas)
+
+    estado = {
+        'formato': FORMATO_VERSION,
+        'parametros': parametros,
+        'bloques': [[clave, firma] for clave, firma in firmas.items()],
+        'filas': len(df_final),
+        'salidas': _stat_salidas(rutas),
+    }
+    guardar_estado(directorio, estado, preparado, codigos)
+    return {'salidas': rutas, 'filas': len(df_final), 'rubros': len(firmas), 'recalculados': len(afectados),
+            'escrito': True}
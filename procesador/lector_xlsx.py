@@ -0,0 +1,207 @@
+"""Lector mínimo de hojas .xlsx con ``iterparse`` sobre el XML de la hoja.
+
+Devuelve los mismos valores que ``ws.iter_rows(values_only=True)`` de openpyxl en
+modo solo lectura (textos compartidos, números, booleanos, fechas y errores), pero
+sin crear objetos de celda ni estilos por cada valor, que es donde openpyxl gasta
+la mayor parte del tiempo en catálogos grandes.
+"""
+import posixpath
+import zipfile
+from xml.etree.ElementTree import iterparse
+
+from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format, is_timedelta_format
+from openpyxl.utils import column_index_from_string
+from openpyxl.utils.datetime import CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900, from_excel, from_ISO8601
+
+NS_MAIN = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+NS_REL = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+NS_PKG_REL = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+TAG_SHEET_DATA = NS_MAIN + 'sheetData'
+TAG_ROW = NS_MAIN + 'row'
+TAG_C = NS_MAIN + 'c'
+TAG_V = NS_MAIN + 'v'
+TAG_T = NS_MAIN + 't'
+TAG_IS = NS_MAIN + 'is'
+TAG_R = NS_MAIN + 'r'
+TAG_SI = NS_MAIN + 'si'
+
+# Cada cuántas filas se informa el avance de la lectura
+FILAS_POR_AVANCE = 1000
+
+
+def _ruta_hoja(zf, sheet_name):
+    """Ruta dentro del zip del XML de la hoja ``sheet_name``"""
+    with zf.open('xl/workbook.xml') as f:
+        rid = None
+        date1904 = False
+        for _, elem in iterparse(f):
+            if elem.tag == NS_MAIN + 'workbookPr':
+                date1904 = elem.get('date1904') in ('1', 'true')
+            elif elem.tag == NS_MAIN + 'sheet' and elem.get('name') == sheet_name:
+                rid = elem.get(NS_REL + 'id')
+    if rid is None:
+        raise KeyError(f"Worksheet {sheet_name} does not exist.")
+
+    with zf.open('xl/_rels/workbook.xml.rels') as f:
+        for _, elem in iterparse(f):
+            if elem.tag == NS_PKG_REL + 'Relationship' and elem.get('Id') == rid:
+                destino = elem.get('Target')
+                break
+        else:
+            raise KeyError(f"Worksheet {sheet_name} does not exist.")
+
+    if destino.startswith('/'):
+        ruta = destino.lstrip('/')
+    else:
+        ruta = posixpath.normpath(posixpath.join('xl', destino))
+    return ruta, (CALENDAR_MAC_1904 if date1904 else CALENDAR_WINDOWS_1900)
+
+
+def nombres_hojas(file_path):
+    """Nombres de las hojas del libro, en el orden en que aparecen"""
+    with zipfile.ZipFile(file_path) as zf, zf.open('xl/workbook.xml') as f:
+        return [elem.get('name') for _, elem in iterparse(f) if elem.tag == NS_MAIN + 'sheet']
+
+
+def _textos_compartidos(zf):
+    if 'xl/sharedStrings.xml' not in zf.namelist():
+        return []
+    textos = []
+    with zf.open('xl/sharedStrings.xml') as f:
+        for _, elem in iterparse(f):
+            if elem.tag == TAG_SI:
+                textos.append(_texto(elem))
+                elem.clear()
+    return textos
+
+
+def _texto(elem):
+    """Texto de un <si>/<is>: un <t> directo o la concatenación de las corridas <r><t>"""
+    t = elem.find(TAG_T)
+    if t is not None:
+        return t.text or ""
+    return "".join(r.findtext(TAG_T, "") for r in elem.iter(TAG_R))
+
+
+def _estilos_fecha(zf):
+    """Índices de estilo de celda con formato de fecha y de duración"""
+    if 'xl/styles.xml' not in zf.namelist():
+        return set(), set()
+    formatos = dict(BUILTIN_FORMATS)
+    xfs = []
+    with zf.open('xl/styles.xml') as f:
+        dentro_cell_xfs = False
+        for evento, elem in iterparse(f, events=('start', 'end')):
+            if elem.tag == NS_MAIN + 'numFmt' and evento == 'end':
+                formatos[int(elem.get('numFmtId'))] = elem.get('formatCode')
+            elif elem.tag == NS_MAIN + 'cellXfs':
+                dentro_cell_xfs = evento == 'start'
+            elif elem.tag == NS_MAIN + 'xf' and dentro_cell_xfs and evento == 'end':
+                xfs.append(int(elem.get('numFmtId', 0)))
+
+    fechas = set()
+    duraciones = set()
+    for i, num_fmt in enumerate(xfs):
+        codigo = formatos.get(num_fmt)
+        if codigo and is_date_format(codigo):
+            fechas.add(i)
+            if is_timedelta_format(codigo):
+                duraciones.add(i)
+    return fechas, duraciones
+
+
+def _numero(texto):
+    if "." in texto or "E" in texto or "e" in texto:
+        return float(texto)
+    return int(texto)
+
+
+class _ArchivoContado:
+    """Envoltorio que cuenta los bytes leídos del XML de la hoja"""
+
+    def __init__(self, f):
+        self.f = f
+        self.leidos = 0
+
+    def read(self, n=-1):
+        datos = self.f.read(n)
+        self.leidos += len(datos)
+        return datos
+
+
+def iterar_filas(file_path, sheet_name, min_row=1, progreso=None):
+    """Genera las filas de la hoja desde ``min_row`` como tuplas de valores.
+
+    Las filas ausentes en el XML se devuelven como tuplas vacías para conservar
+    la numeración; las celdas faltantes dentro de una fila quedan en None.
+    ``progreso`` recibe la fracción del XML de la hoja ya leída.
+    """
+    with zipfile.ZipFile(file_path) as zf:
+        ruta, epoch = _ruta_hoja(zf, sheet_name)
+        textos = _textos_compartidos(zf)
+        fechas, duraciones = _estilos_fecha(zf)
+        columnas = {}
+        fila_esperada = min_row
+
+        tamano = zf.getinfo(ruta).file_size
+        with zf.open(ruta) as f:
+            xml = _ArchivoContado(f)
+            numero_fila = 0
+            sheet_data = None
+            for evento, elem in iterparse(xml, events=('start', 'end')):
+                if evento == 'start':
+                    if elem.tag == TAG_SHEET_DATA:
+                        sheet_data = elem
+                    continue
+                if elem.tag != TAG_ROW:
+                    continue
+                r = elem.get('r')
+                numero_fila = int(r) if r else numero_fila + 1
+                if progreso is not None and numero_fila % FILAS_POR_AVANCE == 0 and tamano:
+                    progreso(min(xml.leidos / tamano, 1.0))
+                if numero_fila < min_row:
+                    sheet_data.clear()
+                    continue
+                while fila_esperada < numero_fila:
+                    yield ()
+                    fila_esperada += 1
+
+                valores = []
+                for c in elem.iter(TAG_C):
+                    ref = c.get('r')
+                    if ref:
+                        letras = ref.rstrip('0123456789')
+                        indice = columnas.get(letras)
+                        if indice is None:
+                            indice = columnas[letras] = column_index_from_string(letras) - 1
+                        if indice > len(valores):
+                            valores.extend([None] * (indice - len(valores)))
+
+                    tipo = c.get('t', 'n')
+                    if tipo == 'inlineStr':
+                        elem_is = c.find(TAG_IS)
+                        valor = _texto(elem_is) if elem_is is not None else None
+                    else:
+                        valor = c.findtext(TAG_V) or None
+                        if valor is not None:
+                            if tipo == 'n':
+                                valor = _numero(valor)
+                                estilo = int(c.get('s', 0))
+                                if estilo in fechas:
+                                    try:
+                                        valor = from_excel(valor, epoch, timedelta=estilo in duraciones)
+                                    except (OverflowError, ValueError):
+                                        valor = "#VALUE!"
+                            elif tipo == 's':
+                                valor = textos[int(valor)]
+                            elif tipo == 'b':
+                                valor = bool(int(valor))
+                            elif tipo == 'd':
+                                valor = from_ISO8601(valor)
+                    valores.append(valor)
+
+                # Liberar las filas ya leídas para que la memoria no crezca con la hoja
+                sheet_data.clear()
+                fila_esperada = numero_fila + 1
+                yield tuple(valores)
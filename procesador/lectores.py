@@ -0,0 +1,166 @@
+"""Lectores de hojas con motores opcionales: calamine, pyxlsb y xlrd.
+
+Cada lector genera las filas de la hoja desde ``min_row`` como tuplas de valores,
+igual que ``lector_xlsx.iterar_filas`` y openpyxl, para que
+``cargar_principal_streaming`` filtre y tipe las columnas de la misma forma con
+cualquier motor. Las filas vacías intermedias se devuelven como tuplas vacías y
+las celdas vacías al final de cada fila se recortan (calamine y xlrd las
+devuelven como '' hasta el ancho de la hoja).
+
+- calamine (``python-calamine``, en Rust) lee .xlsx, .xlsm, .xlsb, .xls y .ods y
+  es el más rápido en todos los formatos.
+- pyxlsb lee .xlsb; no interpreta los formatos de fecha (las fechas llegan como
+  el número de serie de Excel).
+- xlrd lee solo .xls (BIFF).
+
+Los motores son dependencias opcionales: si un módulo no está instalado, su
+lector figura como no disponible y la carga usa el siguiente del formato.
+"""
+from datetime import date, datetime, time
+
+try:
+    import python_calamine
+except ImportError:
+    python_calamine = None
+
+try:
+    import pyxlsb
+except ImportError:
+    pyxlsb = None
+
+try:
+    import xlrd
+except ImportError:
+    xlrd = None
+
+from .lector_xlsx import FILAS_POR_AVANCE
+
+# Paquete de pip de cada lector, para los mensajes de error
+PAQUETES = {'calamine': 'python-calamine', 'pyxlsb': 'pyxlsb', 'xlrd': 'xlrd'}
+
+DISPONIBLES = {
+    'calamine': python_calamine is not None,
+    'pyxlsb': pyxlsb is not None,
+    'xlrd': xlrd is not None,
+}
+
+
+def _hoja_inexistente(sheet_name):
+    return KeyError(f"Worksheet {sheet_name} does not exist.")
+
+
+def _recortar(fila):
+    """Quita las celdas vacías ('') del final de la fila"""
+    fin = len(fila)
+    while fin and fila[fin - 1] == '':
+        fin -= 1
+    return fila[:fin]
+
+
+def _valor_calamine(valor):
+    # openpyxl devuelve datetime también para las celdas con formato de fecha sin hora
+    if type(valor) is date:
+        return datetime.combine(valor, time())
+    return valor
+
+
+def iterar_filas_calamine(file_path, sheet_name, min_row=1, progreso=None):
+    """Filas de la hoja leídas con calamine"""
+    libro = python_calamine.CalamineWorkbook.from_path(file_path)
+    try:
+        try:
+            hoja = libro.get_sheet_by_name(sheet_name)
+        except python_calamine.WorksheetNotFound:
+            raise _hoja_inexistente(sheet_name) from None
+        # Sin saltear el área vacía las filas y columnas quedan numeradas desde A1
+        filas = hoja.to_python(skip_empty_area=False)
+    finally:
+        libro.close()
+
+    total = len(filas)
+    for numero_fila in range(min_row, total + 1):
+        if progreso is not None and numero_fila % FILAS_POR_AVANCE == 0:
+            progreso(numero_fila / total)
+        fila = _recortar(filas[numero_fila - 1])
+        filas[numero_fila - 1] = None
+        yield tuple(map(_valor_calamine, fila))
+
+
+def iterar_filas_pyxlsb(file_path, sheet_name, min_row=1, progreso=None):
+    """Filas de la hoja leídas con pyxlsb (las fechas quedan como números)"""
+    with pyxlsb.open_workbook(file_path) as libro:
+        if sheet_name not in libro.sheets:
+            raise _hoja_inexistente(sheet_name)
+        with libro.get_sheet(sheet_name) as hoja:
+            total = hoja.dimension.r + hoja.dimension.h if hoja.dimension is not None else 0
+            fila_esperada = min_row
+            for celdas in hoja.rows(sparse=True):
+                numero_fila = celdas[0].r + 1 if celdas else fila_esperada
+                if numero_fila < min_row:
+                    continue
+                if progreso is not None and total and numero_fila % FILAS_POR_AVANCE == 0:
+                    progreso(min(numero_fila / total, 1.0))
+                while fila_esperada < numero_fila:
+                    yield ()
+                    fila_esperada += 1
+                valores = [celda.v for celda in celdas]
+                while valores and valores[-1] is None:
+                    valores.pop()
+                fila_esperada = numero_fila + 1
+                yield tuple(valores)
+
+
+def _valor_xlrd(tipo, valor, datemode):
+    if tipo == xlrd.XL_CELL_DATE:
+        try:
+            return xlrd.xldate.xldate_as_datetime(valor, datemode)
+        except (ValueError, OverflowError, xlrd.xldate.XLDateError):
+            return valor
+    if tipo == xlrd.XL_CELL_BOOLEAN:
+        return bool(valor)
+    if tipo == xlrd.XL_CELL_ERROR:
+        return xlrd.error_text_from_code.get(valor, "#VALUE!")
+    return valor
+
+
+def iterar_filas_xlrd(file_path, sheet_name, min_row=1, progreso=None):
+    """Filas de la hoja de un .xls leídas con xlrd"""
+    libro = xlrd.open_workbook(file_path, on_demand=True)
+    try:
+        try:
+            hoja = libro.sheet_by_name(sheet_name)
+        except xlrd.XLRDError:
+            raise _hoja_inexistente(sheet_name) from None
+        especiales = {xlrd.XL_CELL_DATE, xlrd.XL_CELL_BOOLEAN, xlrd.XL_CELL_ERROR}
+        total = hoja.nrows
+        for indice in range(min_row - 1, total):
+            if progreso is not None and (indice + 1) % FILAS_POR_AVANCE == 0:
+                progreso((indice + 1) / total)
+            valores = _recortar(hoja.row_values(indice))
+            tipos = hoja.row_types(indice)
+            # Solo las fechas, los booleanos y los errores necesitan conversión
+            if especiales.intersection(tipos):
+                valores = [_valor_xlrd(tipo, valor, libro.datemode) for tipo, valor in zip(tipos, valores)]
+            yield tuple(valores)
+    finally:
+        libro.release_resources()
+
+
+def nombres_hojas(file_path, lector):
+    """Nombres de las hojas del libro según el motor ``lector``"""
+    if lector == 'calamine':
+        libro = python_calamine.CalamineWorkbook.from_path(file_path)
+        try:
+            return list(libro.sheet_names)
+        finally:
+            libro.close()
+    if lector == 'pyxlsb':
+        with pyxlsb.open_workbook(file_path) as libro:
+            return list(libro.sheets)
+    if lector == 'xlrd':
+        libro = xlrd.open_workbook(file_path, on_demand=True)
+        try:
+            return libro.sheet_names()
+        finally:
+            libro.release_resources()
+    raise ValueError(f"Lector desconocido: {lector}")
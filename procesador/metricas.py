@@ -0,0 +1,108 @@
+"""Métricas por etapa del pipeline.
+
+Cada etapa (carga, filtro, reglas de precio, orden, duplicados, relleno, formato
+y escritura del Excel) registra su duración, las filas de entrada y de salida y
+el pico de memoria. Los registros se escriben en el log y, opcionalmente, en un
+archivo JSON lines (un objeto por etapa) para seguir la evolución entre corridas::
+
+    {"ejecucion": "20250101T101500-4242", "etapa": "reglas_precio", "segundos": 0.0312,
+     "filas_entrada": 5915, "filas_salida": 5915, "pico_memoria_mb": 41.2, ...}
+
+Con ``medir_memoria`` el pico es el de tracemalloc dentro de la etapa (exacto pero
+más lento); si no, es el pico de memoria residente del proceso hasta ese momento.
+"""
+import cProfile
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+from .cargador import pico_rss_mb
+
+
+def _log_nulo(message):
+    pass
+
+
+class Metricas:
+    """Registro de tiempos, filas y memoria por etapa"""
+
+    def __init__(self, log=None, archivo=None, medir_memoria=False):
+        self.log = log or _log_nulo
+        # Archivo JSON lines donde se agregan los registros (None = solo log)
+        self.archivo = archivo
+        self.medir_memoria = medir_memoria
+        self.ejecucion = f"{datetime.now():%Y%m%dT%H%M%S}-{os.getpid()}"
+        # Datos que se agregan a cada registro (catálogo, zona, líneas)
+        self.contexto = {}
+        self.registros = []
+
+    def copia_para_worker(self):
+        """Copia serializable para otro proceso: mismo archivo, ejecución y contexto, sin log"""
+        copia = Metricas(archivo=self.archivo, medir_memoria=self.medir_memoria)
+        copia.ejecucion = self.ejecucion
+        copia.contexto = dict(self.contexto)
+        return copia
+
+    @contextmanager
+    def etapa(self, nombre, filas_entrada=None):
+        """Mide el bloque; quien lo usa completa ``registro['filas_salida']``"""
+        registro = {'etapa': nombre, 'filas_entrada': filas_entrada, 'filas_salida': None}
+        iniciar_tracemalloc = self.medir_memoria and not tracemalloc.is_tracing()
+        if iniciar_tracemalloc:
+            tracemalloc.start()
+        elif self.medir_memoria:
+            tracemalloc.reset_peak()
+        inicio = time.perf_counter()
+        try:
+            yield registro
+        finally:
+            registro['segundos'] = time.perf_counter() - inicio
+            if self.medir_memoria:
+                _, pico = tracemalloc.get_traced_memory()
+                if iniciar_tracemalloc:
+                    tracemalloc.stop()
+                registro['pico_memoria_mb'] = pico / 1024 ** 2
+                registro['memoria'] = 'tracemalloc'
+            else:
+                registro['pico_memoria_mb'] = pico_rss_mb()
+                registro['memoria'] = 'rss'
+        self.registrar(registro)
+
+    def registrar(self, registro):
+        registro = {'ejecucion': self.ejecucion, 'fecha': datetime.now().isoformat(timespec='seconds'),
+                    **self.contexto, **registro}
+        self.registros.append(registro)
+        self.log(self.formatear(registro))
+        if self.archivo is not None:
+            # Una sola escritura por línea: varios procesos pueden agregar al mismo archivo
+            with open(self.archivo, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(registro, ensure_ascii=False, default=str) + "\n")
+
+    @staticmethod
+    def formatear(registro):
+        texto = f"Etapa {registro['etapa']}: {registro['segundos']:.3f} s"
+        if registro['filas_entrada'] is not None and registro['filas_salida'] is not None:
+            texto += f", filas {registro['filas_entrada']} -> {registro['filas_salida']}"
+        elif registro['filas_salida'] is not None:
+            texto += f", filas: {registro['filas_salida']}"
+        if registro['pico_memoria_mb'] is not None:
+            descripcion = "pico de memoria" if registro['memoria'] == 'tracemalloc' else "pico RSS del proceso"
+            texto += f", {descripcion}: {registro['pico_memoria_mb']:.1f} MB"
+        return texto
+
+
+@contextmanager
+def perfil_cpu(path, log=None):
+    """Perfila el bloque con cProfile y guarda las estadísticas en ``path``"""
+    log = log or _log_nulo
+    perfil = cProfile.Profile()
+    perfil.enable()
+    try:
+        yield perfil
+    finally:
+        perfil.disable()
+        perfil.dump_stats(path)
+        log(f"Perfil de CPU guardado en {path} (ver con: python -m pstats {path})")
@@ -0,0 +1,630 @@
+import os
+import re
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.utils.dataframe import dataframe_to_rows
+from openpyxl.utils import get_column_letter
+
+from . import cargador, exportador
+from .cargador import LECTORES
+from .diseno import PERFIL_MULTIPLO_8
+from .metricas import Metricas
+# COLUMNAS_NUMERICAS, LINEAS_FIJAS y ZONAS (las del perfil estándar) se siguen importando desde motor
+from .perfiles import COLUMNAS_NUMERICAS, LINEAS_FIJAS, PERFIL_ESTANDAR, ZONAS  # noqa: F401
+from .seleccion import Seleccion, como_dataframe
+
+MOTORES_EXCEL = ['rapido', 'openpyxl']
+# 'xlsx' es el libro con formato; 'txt' (tabulado) y 'csv' son el texto que toma InDesign
+FORMATOS_SALIDA = ['xlsx', 'txt', 'csv']
+
+# Etapas informadas a la función ``progreso``
+ETAPA_CARGA = "Carga"
+ETAPA_PROCESO = "Procesamiento"
+ETAPA_EXPORTACION = "Exportación"
+
+# Claves de orden precalculadas al cargar el catálogo; se eliminan después de ordenar
+COLUMNA_RUBRO_NUMERO = '__rubro_numero'
+COLUMNA_MARCA_ORDEN = '__marca_orden'
+COLUMNAS_CLAVES_ORDEN = [COLUMNA_RUBRO_NUMERO, COLUMNA_MARCA_ORDEN]
+# Marca de oferta calculada una vez por catálogo cargado
+COLUMNA_OFERTA = '__oferta'
+COLUMNAS_AUXILIARES = COLUMNAS_CLAVES_ORDEN + [COLUMNA_OFERTA]
+
+# Oferta: imagen aNN.eps en 'ord' y 'oferta' (sin distinguir mayúsculas) en la condición
+PATRON_IMAGEN_OFERTA = re.compile(r'a\d{2}\.eps')
+PATRON_CONDICION_OFERTA = re.compile('oferta', re.IGNORECASE)
+
+
+def _log_nulo(message):
+    pass
+
+
+def _progreso_nulo(etapa, fraccion):
+    pass
+
+
+class ProcesoCancelado(Exception):
+    """El procesamiento se interrumpió a pedido del usuario"""
+
+
+class ProcesadorCatalogo:
+    """Motor de procesamiento del catálogo, sin dependencias de la interfaz gráfica.
+
+    Todos los mensajes se emiten a través de la función ``log`` recibida, de modo que
+    la misma lógica sirve para la aplicación Tk y para la línea de comandos. El avance
+    se informa con ``progreso(etapa, fraccion)`` y, si se pasa un ``threading.Event``
+    en ``cancelacion``, activarlo interrumpe el proceso con ``ProcesoCancelado``.
+    El tiempo, las filas y la memoria de cada etapa se registran en ``metricas``.
+    Las columnas de precio por zona, las columnas eliminadas, las columnas
+    numéricas y las líneas fijas salen de ``perfil_proceso`` (``PerfilProceso``).
+    """
+
+    def __init__(self, log=None, cargador='streaming', medir_memoria=False, cache=None, motor_excel='rapido',
+                 progreso=None, cancelacion=None, metricas=None, formatos=None,
+                 codificacion_texto=exportador.CODIFICACION_TEXTO_DEFAULT, decimal_texto='.', lector=None,
+                 perfil_proceso=None):
+        self.log = log or _log_nulo
+        self.progreso = progreso or _progreso_nulo
+        self.cancelacion = cancelacion
+        self.perfil_proceso = perfil_proceso or PERFIL_ESTANDAR
+        self.lineas_fijas = list(self.perfil_proceso.lineas_fijas)
+        self.cargador = cargador
+        # Lector de hojas del cargador streaming; None elige el más rápido instalado para cada formato
+        if lector is not None and lector not in LECTORES:
+            raise ValueError(f"Lector desconocido: {lector}")
+        self.lector = lector
+        self.medir_memoria = medir_memoria
+        # CacheCatalogos opcional para no volver a parsear catálogos sin cambios
+        self.cache = cache
+        # 'rapido' escribe en streaming (exportador.py); 'openpyxl' aplica estilos celda por celda
+        if motor_excel not in MOTORES_EXCEL:
+            raise ValueError(f"Motor de Excel desconocido: {motor_excel}")
+        self.motor_excel = motor_excel
+        # Formatos que escribe ``exportar``; sin 'xlsx' no se genera el libro
+        self.formatos = list(formatos or ['xlsx'])
+        for formato in self.formatos:
+            if formato not in FORMATOS_SALIDA:
+                raise ValueError(f"Formato de salida desconocido: {formato}")
+        if codificacion_texto not in exportador.CODIFICACIONES_TEXTO:
+            raise ValueError(f"Codificación de texto desconocida: {codificacion_texto}")
+        if decimal_texto not in exportador.SEPARADORES_DECIMALES:
+            raise ValueError(f"Separador decimal desconocido: {decimal_texto}")
+        self.codificacion_texto = codificacion_texto
+        self.decimal_texto = decimal_texto
+        self.metricas = metricas or Metricas(self.log, medir_memoria=medir_memoria)
+
+    def avanzar(self, etapa, fraccion):
+        """Informa el avance de la etapa y corta el proceso si se pidió cancelar"""
+        if self.cancelacion is not None and self.cancelacion.is_set():
+            raise ProcesoCancelado(f"Proceso cancelado por el usuario ({etapa.lower()})")
+        self.progreso(etapa, fraccion)
+
+    def medir_etapa(self, nombre, funcion, df, *args):
+        """Ejecuta ``funcion(df, *args)`` registrando la etapa con las filas de entrada y salida"""
+        with self.metricas.etapa(nombre, filas_entrada=len(df)) as registro:
+            resultado = funcion(df, *args)
+            registro['filas_salida'] = len(resultado)
+        return resultado
+
+    def columnas_pipeline(self):
+        """Columnas que alcanzan para calcular con el perfil de proceso (sin exportar el catálogo completo)"""
+        return cargador.columnas_pipeline(self.perfil_proceso)
+
+    def cargar_archivo(self, file_path, lineas=None, columnas=None):
+        """Carga la hoja 'principal' tomando la fila 12 como encabezado.
+
+        Con ``lineas`` se descartan durante la lectura las filas de otras líneas y
+        con ``columnas`` (por ejemplo ``columnas_pipeline()``) se leen solo esas.
+        """
+        self.avanzar(ETAPA_CARGA, 0.0)
+        self.metricas.contexto = {'catalogo': os.path.basename(file_path)}
+        with self.metricas.etapa('carga') as registro:
+            df = cargador.cargar_catalogo(file_path, cargador=self.cargador, lineas=lineas, columnas=columnas,
+                                          log=self.log, medir_memoria=self.medir_memoria, cache=self.cache,
+                                          lector=self.lector,
+                                          progreso=lambda fraccion: self.avanzar(ETAPA_CARGA, fraccion))
+            registro['filas_salida'] = len(df)
+
+        self.log(f"Filas cargadas (después de saltar el inicio): {len(df)}")
+        self.log(f"Columnas (tomadas de la fila 12 original): {list(df.columns)}")
+
+        df = self.medir_etapa('indexado', self.indexar_catalogo, df)
+        self.avanzar(ETAPA_CARGA, 1.0)
+        return df
+
+    def indexar_catalogo(self, df):
+        """Prepara un catálogo recién cargado para procesarlo muchas veces.
+
+        Convierte Rubro, Marca y la columna de líneas a categóricas, las columnas de
+        precio a números y agrega las claves de orden del paso 4 y la marca de
+        oferta del paso 3, de modo que cada procesamiento trabaja sobre arreglos ya
+        tipados en lugar de recalcularlos fila por fila.
+        """
+        columna_linea = self.identificar_columna_linea(df)
+        for col in ['Rubro', 'Marca', columna_linea]:
+            if col is not None and col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype('category')
+        for col in self.perfil_proceso.resolver(df.columns).numericas:
+            if df[col].dtype.kind not in 'biuf':
+                df[col] = pd.to_numeric(df[col], errors='coerce')
+        if 'condicion' in df.columns:
+            df[COLUMNA_OFERTA] = self.mascara_ofertas(df)
+        return self.agregar_claves_orden(df)
+
+    def agregar_claves_orden(self, df):
+        """Agrega las columnas auxiliares con el número de rubro y el orden alfabético de la marca"""
+        if 'Rubro' not in df.columns or 'Marca' not in df.columns:
+            return df
+        rubro = df['Rubro'].astype('category')
+        marca = df['Marca'].astype('category')
+
+        # El número de rubro se extrae una sola vez por categoría (999 si no empieza con un número)
+        categorias = rubro.cat.categories.to_series().astype(str)
+        numeros = pd.to_numeric(categorias.str.extract(r'^(\d+)', expand=False), errors='coerce')
+        numeros = numeros.fillna(999).astype(np.int64).to_numpy()
+        # El código -1 (Rubro vacío) toma el 999 agregado al final, aunque no haya ninguna categoría
+        df[COLUMNA_RUBRO_NUMERO] = np.append(numeros, 999)[rubro.cat.codes.to_numpy()]
+
+        # Las categorías quedan ordenadas alfabéticamente; las marcas vacías van al final
+        codigos_marca = marca.cat.codes.to_numpy()
+        df[COLUMNA_MARCA_ORDEN] = np.where(codigos_marca >= 0, codigos_marca, len(marca.cat.categories))
+        return df
+
+    def procesar(self, df, zona, lineas_seleccionadas, perfil=None):
+        """Ejecuta los pasos 1 a 7 del pipeline y devuelve el DataFrame final"""
+        df_preparado = self.preparar(df, zona, lineas_seleccionadas)
+
+        # Paso 7: Aplicar regla del múltiplo de 8 (o el diseño de página indicado)
+        if perfil is None:
+            df_final = self.aplicar_multiplo_8(df_preparado)
+        else:
+            df_final = self.aplicar_diseno(df_preparado, perfil)
+        self.avanzar(ETAPA_PROCESO, 1.0)
+        return df_final
+
+    def procesar_disenos(self, df, zona, lineas_seleccionadas, perfiles):
+        """Genera un DataFrame por perfil de diseño reutilizando los pasos 1 a 6"""
+        df_preparado = self.preparar(df, zona, lineas_seleccionadas)
+        return {perfil.nombre: self.aplicar_diseno(df_preparado, perfil) for perfil in perfiles}
+
+    def preparar(self, df, zona, lineas_seleccionadas, filas=None):
+        """Pasos 1 a 6: filtrar, reglas de columnas y precios, ordenar y deduplicar.
+
+        Devuelve una ``Seleccion`` sobre ``df``: filtrar, ordenar y deduplicar solo
+        cambian posiciones de filas, sin copiar el catálogo; el DataFrame se arma
+        en el paso 7 (o con ``materializar``). ``filas`` son las posiciones
+        (ordenadas) de las filas de las líneas seleccionadas, si ya se calcularon
+        con ``variantes.indice_lineas``.
+        """
+        if zona not in self.perfil_proceso.zonas:
+            raise ValueError(f"Zona desconocida: {zona}")
+
+        self.log(f"Procesando líneas: {lineas_seleccionadas} - Zona: {zona}")
+        self.avanzar(ETAPA_PROCESO, 0.0)
+        self.metricas.contexto.update(zona=zona, lineas=list(lineas_seleccionadas))
+
+        # Paso 1: Filtrar por líneas seleccionadas
+        with self.metricas.etapa('filtro_lineas', filas_entrada=len(df)) as registro:
+            columna_linea = self.identificar_columna_linea(df)
+            if columna_linea:
+                if filas is None:
+                    filas = np.flatnonzero(df[columna_linea].isin(lineas_seleccionadas).to_numpy())
+                df_filtrado = Seleccion(df, filas)
+                self.log(f"Filas después de filtrar por líneas: {len(df_filtrado)}")
+            else:
+                self.log("ADVERTENCIA: No se encontró columna de líneas, procesando todo el archivo")
+                df_filtrado = Seleccion(df)
+            registro['filas_salida'] = len(df_filtrado)
+
+        self.avanzar(ETAPA_PROCESO, 1 / 7)
+
+        # Paso 2: Aplicar reglas de columnas según la zona
+        df_filtrado = self.medir_etapa('reglas_columnas', self.aplicar_reglas_columnas, df_filtrado, zona)
+
+        self.avanzar(ETAPA_PROCESO, 2 / 7)
+
+        # Paso 3: Aplicar reglas de selección de precios
+        df_filtrado = self.medir_etapa('reglas_precio', self.aplicar_reglas_precio, df_filtrado, zona)
+
+        self.avanzar(ETAPA_PROCESO, 3 / 7)
+
+        # Paso 4: Ordenar por Rubro (numérico) y Marca (alfabético)
+        with self.metricas.etapa('orden', filas_entrada=len(df_filtrado)) as registro:
+            if 'Rubro' in df_filtrado.columns and 'Marca' in df_filtrado.columns:
+                # Las claves vienen precalculadas desde la carga (indexar_catalogo); si no, se calculan acá
+                if COLUMNA_RUBRO_NUMERO not in df_filtrado.columns:
+                    df_filtrado = self.agregar_claves_orden(df_filtrado)
+                # Ordenamiento estable solo por Rubro (numérico) y luego por Marca (alfabético)
+                orden = np.lexsort((df_filtrado[COLUMNA_MARCA_ORDEN].to_numpy(),
+                                    df_filtrado[COLUMNA_RUBRO_NUMERO].to_numpy()))
+                df_filtrado = df_filtrado.take(orden)
+                self.log("Datos ordenados por Rubro (numérico) y Marca (alfabético)")
+            df_filtrado = df_filtrado.drop(columns=COLUMNAS_AUXILIARES, errors='ignore')
+            registro['filas_salida'] = len(df_filtrado)
+
+        self.avanzar(ETAPA_PROCESO, 4 / 7)
+
+        # Paso 5: Renumerar orden desde 1 (SIN importar la fila de inicio del catálogo)
+        df_filtrado['orden'] = range(1, len(df_filtrado) + 1)
+        self.log(f"Orden renumerado del 1 al {len(df_filtrado)}")
+
+        self.avanzar(ETAPA_PROCESO, 5 / 7)
+
+        # Paso 6: ELIMINAR DUPLICADOS por 'Codigo' (mantener el primer registro)
+        if 'Codigo' in df_filtrado.columns:
+            with self.metricas.etapa('duplicados', filas_entrada=len(df_filtrado)) as registro:
+                filas_originales = len(df_filtrado)
+                duplicadas = df_filtrado['Codigo'].duplicated(keep='first').to_numpy()
+                df_filtrado = df_filtrado.take(np.flatnonzero(~duplicadas))
+                filas_eliminadas = filas_originales - len(df_filtrado)
+                registro['filas_salida'] = len(df_filtrado)
+            self.log(f"Duplicados eliminados: {filas_eliminadas} filas (basado en 'Codigo')")
+        self.avanzar(ETAPA_PROCESO, 6 / 7)
+
+        return df_filtrado
+
+    def identificar_columna_linea(self, df):
+        return cargador.identificar_columna_linea(list(df.columns))
+
+    def aplicar_reglas_columnas(self, df, zona):
+        self.log(f"Aplicando reglas de columnas para zona: {zona}")
+
+        # Rango de columnas del perfil (para INTERIOR, de 'lista1' a 'ad 3'), resuelto una vez por encabezado
+        columnas_a_eliminar = self.perfil_proceso.resolver(df.columns).eliminar[zona]
+        if columnas_a_eliminar:
+            df = df.drop(columns=columnas_a_eliminar)
+            self.log(f"Columnas eliminadas para {zona}: {columnas_a_eliminar}")
+
+        return df
+
+    def aplicar_reglas_precio(self, df, zona):
+        self.log("Aplicando reglas de precios...")
+
+        # Columnas de precio de la zona según el perfil; si no están, las alternativas
+        resolucion = self.perfil_proceso.resolver(df.columns)
+        precios = resolucion.precios[zona]
+        if precios is None or zona in resolucion.alternativos:
+            reglas = self.perfil_proceso.zonas[zona]
+            self.log(f"ADVERTENCIA: No se encontraron columnas de precio específicas para {zona} "
+                     f"({reglas['precio_default']}, {reglas['precio_oferta']})")
+            if precios is None:
+                self.log("ERROR: No se encontraron columnas de precio adecuadas")
+                return df
+            self.log(f"Usando columnas alternativas: {precios[0]}, {precios[1]}")
+        col_default, col_oferta = precios
+
+        # Las columnas de precio ya son numéricas si el catálogo pasó por indexar_catalogo
+        for col in (col_default, col_oferta):
+            if df[col].dtype.kind not in 'biuf':
+                df[col] = pd.to_numeric(df[col], errors='coerce')
+
+        mascara_oferta = self.mascara_ofertas(df).to_numpy(dtype=bool)
+        if mascara_oferta.any():
+            df['precio_seleccionado'] = np.where(mascara_oferta, df[col_oferta].to_numpy(),
+                                                 df[col_default].to_numpy())
+        else:
+            df['precio_seleccionado'] = df[col_default]
+
+        self.log(f"Reglas de precios aplicadas. Ofertas encontradas: {mascara_oferta.sum()}")
+
+        return df
+
+    def mascara_ofertas(self, df):
+        """Filas en oferta: imagen aNN.eps en 'ord' y 'oferta' en la condición"""
+        if COLUMNA_OFERTA in df.columns:
+            return df[COLUMNA_OFERTA]
+
+        # La lógica de oferta usa las columnas 'orden' (que debe ser 'ord' según el archivo de ejemplo) y 'condicion'
+        # Ajusto 'orden' por 'ord' si está disponible
+        col_ord = 'ord' if 'ord' in df.columns else 'orden'
+
+        mascara = np.array(df[col_ord].astype(str).str.contains(PATRON_IMAGEN_OFERTA, na=False), dtype=bool)
+        # La condición solo se revisa en las filas con imagen de oferta
+        posiciones = np.flatnonzero(mascara)
+        condicion = df['condicion'].iloc[posiciones].astype(str)
+        mascara[posiciones] = condicion.str.contains(PATRON_CONDICION_OFERTA, na=False).to_numpy(dtype=bool)
+        return pd.Series(mascara, index=df.index)
+
+    def aplicar_multiplo_8(self, df):
+        self.log("Aplicando regla del múltiplo de 8...")
+        return self.medir_etapa('relleno', self.rellenar_rubros, df, PERFIL_MULTIPLO_8)
+
+    def aplicar_diseno(self, df, perfil):
+        self.log(f"Aplicando diseño de página '{perfil.nombre}' (bloque de {perfil.bloque})...")
+        return self.medir_etapa('relleno', self.rellenar_rubros, df, perfil)
+
+    def rellenar_rubros(self, df, perfil):
+        """Completa cada Rubro con filas vacías según el perfil y arma el DataFrame final.
+
+        ``df`` puede ser un DataFrame o la ``Seleccion`` de ``preparar``: cada columna
+        del resultado se arma una sola vez, con las filas de producto y las de
+        relleno ya en su orden final.
+        """
+        if 'Rubro' not in df.columns:
+            self.log("ADVERTENCIA: No hay columna 'Rubro', no se aplicará múltiplo de 8")
+            return como_dataframe(df)
+        seleccion = df if isinstance(df, Seleccion) else Seleccion(df)
+
+        # El contador de orden debe continuar a partir del último 'orden' existente
+        contador_orden = seleccion['orden'].max() + 1 if 'orden' in seleccion.columns and len(seleccion) else 1
+
+        # Mismos grupos y en el mismo orden que df.groupby('Rubro') (ordenados, sin Rubro vacío)
+        rubro = seleccion['Rubro']
+        grupos = rubro.groupby(rubro, observed=True)
+        tamanos = grupos.size()
+        numero_grupo = grupos.ngroup().to_numpy()
+        filas_rubro = tamanos.to_numpy()
+
+        # La línea de cada Rubro (la de su primera fila) solo hace falta para reglas por línea
+        lineas_rubro = None
+        columna_linea = self.identificar_columna_linea(seleccion)
+        if perfil.bloque_por_linea and columna_linea is not None:
+            lineas_rubro = seleccion[columna_linea].groupby(rubro, observed=True).first().to_numpy()
+
+        filas_faltantes, _ = perfil.calcular_relleno(tamanos.index, filas_rubro, lineas_rubro)
+
+        for rubro_actual, filas, faltantes in zip(tamanos.index, filas_rubro, filas_faltantes):
+            self.log(f"Rubro {rubro_actual}: {filas} filas, necesarias: {filas + faltantes}, faltantes: {faltantes}")
+
+        validas = numero_grupo >= 0
+        posiciones_validas = np.flatnonzero(validas)
+        clave_grupo = numero_grupo[validas]
+
+        total_faltantes = int(filas_faltantes.sum())
+        if total_faltantes > 0:
+            rubros_vacios = np.repeat(tamanos.index.to_numpy(), filas_faltantes)
+            filas_vacias = self.crear_filas_vacias(rubros_vacios, seleccion.columns, contador_orden, perfil)
+            clave_grupo = np.concatenate([clave_grupo, np.repeat(np.arange(len(tamanos)), filas_faltantes)])
+
+        # Orden estable por grupo: cada Rubro con sus filas originales y luego sus filas vacías
+        orden_final = np.argsort(clave_grupo, kind='stable')
+        if total_faltantes > 0:
+            productos = seleccion.take(posiciones_validas)
+            indice = pd.RangeIndex(len(orden_final))
+            df_final = pd.DataFrame({
+                col: pd.concat([productos[col], filas_vacias[col]], ignore_index=True).take(orden_final).set_axis(indice)
+                for col in seleccion.columns
+            })
+        else:
+            df_final = seleccion.take(posiciones_validas[orden_final]).materializar()
+
+        # Renumerar el 'orden' final después de las filas vacías
+        df_final['orden'] = range(1, len(df_final) + 1)
+        self.log(f"Total filas después de aplicar '{perfil.nombre}': {len(df_final)}")
+
+        return df_final
+
+    def crear_filas_vacias(self, rubros, columnas, inicio_orden, perfil=PERFIL_MULTIPLO_8):
+        """Arma de una sola vez las filas de relleno (una por elemento de ``rubros``)"""
+        if len(rubros) == 0:
+            return pd.DataFrame()
+        filas_vacias = pd.DataFrame(perfil.valores_relleno(columnas, rubros, inicio_orden))
+        # Las columnas numéricas quedan numéricas (vacío -> NaN, como al exportar) para no volverlas objeto
+        for col in self.perfil_proceso.resolver(filas_vacias.columns).numericas:
+            filas_vacias[col] = pd.to_numeric(filas_vacias[col], errors='coerce')
+        return filas_vacias
+
+    def aplicar_formato_numeros_excel(self, df):
+        """Aplica formato de números para Excel (limpieza de datos)"""
+        # Copia superficial: solo se reemplazan las columnas numéricas, el resto se comparte con ``df``
+        df_formateado = df.copy(deep=False)
+
+        for col in self.perfil_proceso.resolver(df_formateado.columns).numericas:
+            serie = df_formateado[col]
+            # 1. Convertir a numérico forzando errores a NaN (si no lo es desde la carga)
+            if serie.dtype.kind not in 'biuf':
+                serie = pd.to_numeric(serie, errors='coerce')
+
+            # 2. **Redondear a 2 decimales en el DataFrame**
+            df_formateado[col] = serie.round(2)
+
+        return df_formateado
+
+    def columnas_numericas(self, df):
+        """Columnas numéricas del perfil presentes en ``df``"""
+        return set(self.perfil_proceso.resolver(df.columns).numericas)
+
+    def opciones_exportacion(self):
+        """Parámetros de exportación, para armar un procesador equivalente en otro proceso"""
+        return {'motor_excel': self.motor_excel, 'formatos': list(self.formatos),
+                'codificacion_texto': self.codificacion_texto, 'decimal_texto': self.decimal_texto,
+                'perfil_proceso': self.perfil_proceso}
+
+    def rutas_salida(self, file_path):
+        """Archivo de cada formato configurado: el nombre de ``file_path`` con la extensión del formato"""
+        base = os.path.splitext(file_path)[0]
+        return [f"{base}.{formato}" for formato in self.formatos]
+
+    def exportar(self, df, file_path, zona, lineas_seleccionadas):
+        """Exporta el DataFrame final en cada formato configurado y devuelve las rutas escritas"""
+        rutas = self.rutas_salida(file_path)
+        for formato, ruta in zip(self.formatos, rutas):
+            if formato == 'xlsx':
+                self.exportar_excel_con_formato(df, ruta, zona, lineas_seleccionadas)
+            else:
+                self.exportar_texto(df, ruta)
+        return rutas
+
+    def exportar_texto(self, df, file_path):
+        """Exporta el texto delimitado para InDesign (tabulado, o con comas si es .csv)"""
+        self.avanzar(ETAPA_EXPORTACION, 0.0)
+
+        # Mismo formato de números que el libro: 2 decimales
+        df_export = self.medir_etapa('formato_numeros', self.aplicar_formato_numeros_excel, df)
+        separador = exportador.SEPARADORES_TEXTO.get(os.path.splitext(file_path)[1].lower(), '\t')
+
+        with self.metricas.etapa('escritura_texto', filas_entrada=len(df_export)) as registro:
+            exportador.escribir_texto(df_export, file_path, self.columnas_numericas(df_export),
+                                      separador=separador, codificacion=self.codificacion_texto, decimal=self.decimal_texto,
+                                      progreso=lambda fraccion: self.avanzar(ETAPA_EXPORTACION, fraccion))
+            registro['filas_salida'] = len(df_export)
+
+        self.avanzar(ETAPA_EXPORTACION, 1.0)
+        self.log(f"Archivo de texto exportado: {file_path} ({self.codificacion_texto})")
+        self.log(f"Total de productos: {len(df)}")
+
+        return df_export
+
+    def exportar_excel_con_formato(self, df, file_path, zona, lineas_seleccionadas):
+        """Exporta a Excel con formato profesional y devuelve el DataFrame exportado"""
+        self.avanzar(ETAPA_EXPORTACION, 0.0)
+
+        # Aplicar formato de números (limpieza de datos)
+        df_export = self.medir_etapa('formato_numeros', self.aplicar_formato_numeros_excel, df)
+
+        # Encabezados informativos (Filas 1 a 5)
+        encabezados_info = self.encabezados_informativos(zona, lineas_seleccionadas, len(df))
+
+        with self.metricas.etapa('escritura_excel', filas_entrada=len(df_export)) as registro:
+            self.escribir_libro(df_export, file_path, encabezados_info)
+            registro['filas_salida'] = len(df_export)
+
+        self.avanzar(ETAPA_EXPORTACION, 1.0)
+        self.log(f"Archivo Excel exportado: {file_path}")
+        self.log(f"Total de productos: {len(df)}")
+        self.log("Formato Excel aplicado: números con 2 decimales, estilos profesionales")
+
+        return df_export
+
+    def escribir_libro(self, df_export, file_path, encabezados_info):
+        """Escribe el libro con el motor configurado"""
+        if self.motor_excel == 'rapido':
+            exportador.escribir_excel(df_export, file_path, encabezados_info, self.columnas_numericas(df_export),
+                                      progreso=lambda fraccion: self.avanzar(ETAPA_EXPORTACION, fraccion))
+        else:
+            # Crear libro de Excel
+            wb = Workbook()
+            ws = wb.active
+            ws.title = exportador.TITULO_HOJA
+
+            for fila, texto in enumerate(encabezados_info, start=1):
+                ws[f'A{fila}'] = texto
+
+            # Agregar datos (Empieza en Fila 6, Header en Fila 6, Datos en Fila 7)
+            for r_idx, r in enumerate(dataframe_to_rows(df_export, index=False, header=True)):
+                ws.append(r)
+            self.avanzar(ETAPA_EXPORTACION, 0.3)
+
+            # Aplicar formato a las celdas (El encabezado de datos está en la Fila 6)
+            self.aplicar_estilos_excel(ws, len(df_export), start_row_data=7, header_row=6)
+            self.avanzar(ETAPA_EXPORTACION, 0.8)
+
+            # Guardar archivo
+            wb.save(file_path)
+
+    def encabezados_informativos(self, zona, lineas_seleccionadas, total_productos):
+        return [
+            "CATÁLOGO MADRE - EXPORTACIÓN",
+            f"Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+            f"Zona: {zona}",
+            f"Líneas procesadas: {list(lineas_seleccionadas)}",
+            f"Total productos: {total_productos}",
+        ]
+
+    def aplicar_estilos_excel(self, ws, total_filas, start_row_data, header_row):
+        """Aplica estilos profesionales al Excel, incluyendo formato de 2 decimales robusto."""
+        # Estilos
+        header_font = Font(bold=True, color="FFFFFF")
+        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+        border = Border(left=Side(style='thin'), right=Side(style='thin'),
+                        top=Side(style='thin'), bottom=Side(style='thin'))
+
+        # Identificar las columnas de precios por el nombre del header
+        header_cell_values = [cell.value for cell in ws[header_row]]
+        numericas = set(self.perfil_proceso.resolver(header_cell_values).numericas)
+        precio_cols = {}
+
+        for idx, col_name in enumerate(header_cell_values):
+            col_letter = get_column_letter(idx + 1)
+            if col_name in numericas:
+                precio_cols[col_letter] = col_name
+
+        # Aplicar formato a encabezados
+        for cell in ws[header_row]:
+            cell.font = header_font
+            cell.fill = header_fill
+            cell.border = border
+            cell.alignment = Alignment(horizontal='center')
+
+        # Aplicar formato a datos numéricos (Fila 7 en adelante)
+        for row in range(start_row_data, total_filas + start_row_data):
+            for cell in ws[row]:
+                cell.border = border
+
+                # Aplicar formato numérico: Separador de miles y dos decimales
+                if cell.column_letter in precio_cols:
+                    # Usar el formato de Excel para miles y dos decimales: 0.00
+                    cell.number_format = '0.00'
+
+        # Autoajustar columnas
+        for column in ws.columns:
+            max_length = 0
+            column_letter = column[0].column_letter
+            for cell in column:
+                try:
+                    if len(str(cell.value)) > max_length:
+                        max_length = len(str(cell.value))
+                except:
+                    pass
+            adjusted_width = (max_length + 2)
+            ws.column_dimensions[column_letter].width = adjusted_width
+
+    def mostrar_preview_excel(self, df):
+        """Muestra un preview de los datos que se exportarán a Excel"""
+        self.log("\n--- PREVIEW PARA EXCEL ---")
+        self.log(f"Primeras 3 filas con formato:")
+
+        columnas_preview = ['orden', 'Rubro', 'Marca', 'precio_seleccionado']
+        columnas_disponibles = [col for col in columnas_preview if col in df.columns]
+
+        if columnas_disponibles:
+            preview_df = df[columnas_disponibles].head(3).copy()
+
+            # Formatear números para preview (solo para el log de texto)
+            if 'precio_seleccionado' in preview_df.columns:
+                preview_df['precio_seleccionado'] = preview_df['precio_seleccionado'].apply(
+                    lambda x: f"{x:,.2f}" if pd.notna(x) and x != "" else ""
+                )
+
+            self.log(preview_df.to_string(index=False))
+        else:
+            self.log(df.head(3).to_string(index=False))
+
+        self.log("--- FIN PREVIEW ---\n")
+        self.log("✅ Archivo listo para exportar a Excel")
+        self.log("💡 Consejo: Para InDesign puede guardar directamente el TXT tabulado (.txt)")
+
+
+def nombre_salida(file_path, zona, lineas_seleccionadas, extension=".xlsx", diseno=None):
+    """Nombre de archivo de salida para una combinación zona × líneas (× diseño)"""
+    base = os.path.splitext(os.path.basename(file_path))[0]
+    sufijo_lineas = "-".join(str(linea) for linea in lineas_seleccionadas)
+    sufijo_diseno = f"_{diseno}" if diseno else ""
+    return f"{base}_{zona}_L{sufijo_lineas}{sufijo_diseno}{extension}"
+
+
+def procesar_archivo(file_path, zona, lineas_seleccionadas, salida=None, log=None, cargador='streaming',
+                     formatos=None, motor_excel='rapido', lector=None, **opciones):
+    """Carga, procesa y (opcionalmente) exporta un catálogo sin interfaz gráfica.
+
+    Si ``salida`` es None solo devuelve el DataFrame final; si es un directorio
+    el nombre del archivo se arma con ``nombre_salida``. Se escribe un archivo por
+    formato de ``formatos`` (por defecto el xlsx), igual que en la línea de
+    comandos; ``opciones`` son los demás parámetros de ``ProcesadorCatalogo``
+    (codificación y decimal del texto, perfil de proceso).
+    """
+    procesador = ProcesadorCatalogo(log, cargador=cargador, formatos=formatos, motor_excel=motor_excel,
+                                    lector=lector, **opciones)
+    df = procesador.cargar_archivo(file_path, lineas=lineas_seleccionadas)
+    df_final = procesador.procesar(df, zona, lineas_seleccionadas)
+
+    if salida is not None:
+        if os.path.isdir(salida):
+            salida = os.path.join(salida, nombre_salida(file_path, zona, lineas_seleccionadas))
+        procesador.exportar(df_final, salida, zona, lineas_seleccionadas)
+
+    return df_final
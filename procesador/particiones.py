@@ -0,0 +1,488 @@
+"""Procesamiento por particiones para catálogos que no entran en memoria.
+
+El catálogo se lee de a bloques (``cargador.iterar_catalogo``) y cada bloque se
+reparte por número de Rubro, la primera clave de orden del paso 4. Las filas de
+cada partición quedan en memoria hasta una parte del presupuesto y después se
+vuelcan a disco con el formato del cache (``cache.guardar_dataframe``).
+
+Cada combinación zona × líneas recorre las particiones de menor a mayor número de
+Rubro. En cada una filtra las líneas, aplica las reglas de columnas y de precios,
+ordena por Marca y elimina los códigos ya vistos (pasos 1 a 6). Las filas de cada
+Rubro se guardan por separado. El relleno del paso 7 solo necesita la cantidad de
+filas de cada Rubro, así que al final los rubros se escriben uno tras otro, con
+sus filas vacías, al libro y al texto en streaming::
+
+    python -m procesador consolidado.xlsx -o salida/ --memoria-max 1024
+
+El resultado es el mismo que el de ``procesar`` + ``exportar``, salvo que los
+tipos de cada columna se infieren por bloque. Una columna con valores que no se
+pueden ordenar juntos (números y textos mezclados en Rubro o Marca) puede quedar
+en otro orden. El presupuesto cubre las filas que el proceso retiene; los códigos
+ya vistos se recuerdan aparte por su hash de 64 bits (8 bytes por código).
+"""
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from . import cargador, exportador
+from .cache import _tamano_directorio, guardar_dataframe, leer_dataframe
+from .diseno import PERFIL_MULTIPLO_8
+from .motor import (COLUMNA_MARCA_ORDEN, COLUMNA_OFERTA, COLUMNA_RUBRO_NUMERO, ETAPA_CARGA, ETAPA_EXPORTACION,
+                    ETAPA_PROCESO, nombre_salida)
+
+MEMORIA_MB_DEFAULT = 512
+
+# Parte del presupuesto para cada grupo de filas retenidas: las particiones del
+# catálogo, las filas preparadas por Rubro y los bloques de salida. El resto queda
+# para la partición que se está ordenando.
+FRACCION_RETENIDA = 0.2
+# Tamaño estimado de una fila mientras se lee (valores de Python en listas) o se
+# escribe, para las filas por bloque de la lectura y de la salida
+BYTES_POR_FILA_BLOQUE = 4096
+FILAS_POR_BLOQUE_MIN = 1000
+
+
+def _log_nulo(message):
+    pass
+
+
+def tamano_dataframe(df):
+    return int(df.memory_usage(deep=True).sum())
+
+
+def filas_por_bloque(memoria_mb):
+    return max(FILAS_POR_BLOQUE_MIN, int(memoria_mb * 1024 ** 2 * FRACCION_RETENIDA / BYTES_POR_FILA_BLOQUE))
+
+
+def _tipo_comun(a, b):
+    """Tipo que queda al concatenar columnas de tipos ``a`` y ``b``, como en ``pd.concat``"""
+    if a == b:
+        return a
+    if a.kind in 'iuf' and b.kind in 'iuf':
+        return np.result_type(a, b)
+    return np.dtype(object)
+
+
+def _agregar_tipos(tipos, df, faltante=None):
+    """Combina los tipos de las columnas de ``df`` con ``tipos``.
+
+    ``faltante`` es el tipo de las columnas que no estaban en ``tipos`` y que
+    se completan con NaN en las filas anteriores.
+    """
+    for col, tipo in df.dtypes.items():
+        if col in tipos:
+            tipos[col] = _tipo_comun(tipos[col], tipo)
+        else:
+            tipos[col] = tipo if faltante is None else _tipo_comun(faltante, tipo)
+
+
+def _con_tipos(df, tipos, leidas=False):
+    """Convierte las columnas de ``df`` a ``tipos``.
+
+    Con ``leidas`` (columnas tal como se leyeron) los decimales enteros de las
+    columnas que pasan a objeto vuelven a ser int, como quedan al tipar la
+    columna entera (``cargador.convertir_celda``).
+    """
+    for col, tipo in tipos.items():
+        if col in df.columns and df[col].dtype != tipo:
+            if leidas and tipo == object and df[col].dtype.kind == 'f':
+                # Series.map volvería a inferir float con los enteros y NaN
+                df[col] = pd.Series([cargador.convertir_celda(valor) for valor in df[col].tolist()],
+                                    index=df.index, dtype=object)
+            else:
+                df[col] = df[col].astype(tipo)
+    return df
+
+
+def _concatenar(dfs, leidas=False):
+    """Concatena las piezas de una partición; con ``leidas`` unifica antes los tipos como ``_con_tipos``"""
+    if len(dfs) == 1:
+        return dfs[0].reset_index(drop=True)
+    if leidas:
+        tipos = {}
+        for df in dfs:
+            _agregar_tipos(tipos, df)
+        dfs = [_con_tipos(df, tipos, leidas=True) for df in dfs]
+    return pd.concat(dfs, ignore_index=True)
+
+
+class Particiones:
+    """DataFrames agrupados por clave: en memoria hasta ``max_bytes`` y en disco el resto.
+
+    Cada volcado guarda las filas acumuladas de cada clave como una pieza;
+    ``leer`` devuelve las filas de una clave en el orden en que se agregaron.
+    ``leidas`` indica que las piezas son bloques tal como se leyeron del catálogo.
+    """
+
+    def __init__(self, directorio, max_bytes, leidas=False):
+        self.directorio = tempfile.mkdtemp(prefix='particiones-', dir=directorio)
+        self.max_bytes = max_bytes
+        self.leidas = leidas
+        self.memoria = {}
+        self.piezas = {}
+        self.bytes_memoria = 0
+        self.volcados = 0
+        self._siguiente = 0
+
+    def agregar(self, clave, df, nbytes=None):
+        self.memoria.setdefault(clave, []).append(df)
+        self.bytes_memoria += tamano_dataframe(df) if nbytes is None else nbytes
+        if self.bytes_memoria > self.max_bytes:
+            self.volcar()
+
+    def volcar(self):
+        """Guarda en disco todas las filas en memoria"""
+        for clave, dfs in self.memoria.items():
+            destino = os.path.join(self.directorio, str(self._siguiente))
+            self._siguiente += 1
+            os.mkdir(destino)
+            guardar_dataframe(destino, _concatenar(dfs, self.leidas))
+            self.piezas.setdefault(clave, []).append(destino)
+        self.memoria.clear()
+        self.bytes_memoria = 0
+        self.volcados += 1
+
+    def claves(self):
+        return list(dict.fromkeys([*self.piezas, *self.memoria]))
+
+    def leer(self, clave):
+        dfs = [leer_dataframe(pieza) for pieza in self.piezas.get(clave, [])] + self.memoria.get(clave, [])
+        return _concatenar(dfs, self.leidas)
+
+    def bytes_disco(self):
+        return _tamano_directorio(self.directorio)
+
+    def cerrar(self):
+        self.memoria.clear()
+        self.piezas.clear()
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+
+class CatalogoParticionado:
+    """Catálogo leído una vez y repartido por número de Rubro.
+
+    ``columnas`` y ``tipos`` son las columnas y los tipos del catálogo completo y
+    ``rubros`` los valores de Rubro en el orden en que aparecen.
+    """
+
+    def __init__(self, particiones, columnas, tipos, rubros, filas):
+        self.particiones = particiones
+        self.columnas = columnas
+        self.tipos = tipos
+        self.rubros = rubros
+        self.filas = filas
+
+    def leer(self, numero):
+        """Filas de la partición con las columnas y los tipos del catálogo completo"""
+        df = self.particiones.leer(numero).reindex(columns=self.columnas)
+        return _con_tipos(df, self.tipos, leidas=True)
+
+
+class RubrosPreparados:
+    """Resultado de los pasos 1 a 6 guardado por Rubro, en el orden del paso 7"""
+
+    def __init__(self, particiones, rubros, filas, lineas, columnas, tipos):
+        self.particiones = particiones
+        self.rubros = rubros
+        self.filas = filas
+        self.lineas = lineas
+        self.columnas = columnas
+        self.tipos = tipos
+
+
+def particionar_catalogo(procesador, file_path, directorio, lineas=None, memoria_mb=MEMORIA_MB_DEFAULT):
+    """Lee el catálogo de a bloques y lo reparte por número de Rubro.
+
+    Convierte las columnas numéricas del perfil y calcula la marca de oferta en
+    cada bloque, como ``indexar_catalogo``. Con ``lineas`` se descartan durante
+    la lectura las filas de otras líneas.
+    """
+    presupuesto = memoria_mb * 1024 ** 2
+    particiones = Particiones(directorio, presupuesto * FRACCION_RETENIDA, leidas=True)
+    columnas, tipos, rubros, filas = [], {}, {}, 0
+
+    procesador.avanzar(ETAPA_CARGA, 0.0)
+    procesador.metricas.contexto = {'catalogo': os.path.basename(file_path)}
+    with procesador.metricas.etapa('carga') as registro:
+        bloques = cargador.iterar_catalogo(file_path, filas_por_bloque(memoria_mb), lineas=lineas, log=procesador.log,
+                                           lector=procesador.lector,
+                                           progreso=lambda fraccion: procesador.avanzar(ETAPA_CARGA, fraccion))
+        for bloque in bloques:
+            if 'Rubro' not in bloque.columns or 'Marca' not in bloque.columns:
+                particiones.cerrar()
+                raise ValueError("El procesamiento por particiones necesita las columnas 'Rubro' y 'Marca'")
+            for col in procesador.perfil_proceso.resolver(bloque.columns).numericas:
+                if bloque[col].dtype.kind not in 'biuf':
+                    bloque[col] = pd.to_numeric(bloque[col], errors='coerce')
+            if 'condicion' in bloque.columns:
+                bloque[COLUMNA_OFERTA] = procesador.mascara_ofertas(bloque)
+            numeros = procesador.agregar_claves_orden(bloque).pop(COLUMNA_RUBRO_NUMERO).to_numpy()
+            bloque = bloque.drop(columns=COLUMNA_MARCA_ORDEN)
+
+            _agregar_tipos(tipos, bloque, faltante=np.dtype(np.float64) if filas else None)
+            columnas.extend(col for col in bloque.columns if col not in columnas)
+            rubros.update(dict.fromkeys(bloque['Rubro'].dropna().unique()))
+            nbytes = tamano_dataframe(bloque)
+            for numero, posiciones in pd.Series(numeros).groupby(numeros).indices.items():
+                particiones.agregar(int(numero), bloque.take(posiciones),
+                                    nbytes * len(posiciones) // max(len(bloque), 1))
+            filas += len(bloque)
+        registro['filas_salida'] = filas
+
+    procesador.log(f"Filas cargadas (después de saltar el inicio): {filas}")
+    procesador.log(f"Columnas (tomadas de la fila 12 original): {[c for c in columnas if c != COLUMNA_OFERTA]}")
+    procesador.log(f"Catálogo repartido en {len(particiones.claves())} partición(es) por número de Rubro "
+                   f"({particiones.volcados} volcado(s) a disco, {particiones.bytes_disco() / 1024 ** 2:.1f} MB)")
+    procesador.avanzar(ETAPA_CARGA, 1.0)
+    return CatalogoParticionado(particiones, columnas, tipos, list(rubros), filas)
+
+
+def _contiene(ordenados, valores):
+    """Máscara de los ``valores`` presentes en el arreglo ordenado ``ordenados``"""
+    if len(ordenados) == 0:
+        return np.zeros(len(valores), dtype=bool)
+    posiciones = np.minimum(np.searchsorted(ordenados, valores), len(ordenados) - 1)
+    return ordenados[posiciones] == valores
+
+
+def _sin_log(procesador, funcion, *args):
+    """Ejecuta ``funcion`` sin los mensajes de cada partición"""
+    log = procesador.log
+    procesador.log = _log_nulo
+    try:
+        return funcion(*args)
+    finally:
+        procesador.log = log
+
+
+def preparar_particiones(procesador, catalogo, zona, lineas_seleccionadas, directorio,
+                         memoria_mb=MEMORIA_MB_DEFAULT):
+    """Pasos 1 a 6 partición por partición; las filas resultantes quedan guardadas por Rubro.
+
+    Las particiones se recorren de menor a mayor número de Rubro, así que un
+    código repetido se conserva en la primera fila del orden final, como al
+    deduplicar el catálogo completo.
+    """
+    perfil_proceso = procesador.perfil_proceso
+    if zona not in perfil_proceso.zonas:
+        raise ValueError(f"Zona desconocida: {zona}")
+
+    procesador.log(f"Procesando líneas: {lineas_seleccionadas} - Zona: {zona}")
+    procesador.avanzar(ETAPA_PROCESO, 0.0)
+    procesador.metricas.contexto.update(zona=zona, lineas=list(lineas_seleccionadas))
+
+    presupuesto = memoria_mb * 1024 ** 2
+    columna_linea = cargador.identificar_columna_linea(catalogo.columnas)
+    if columna_linea is None:
+        procesador.log("ADVERTENCIA: No se encontró columna de líneas, procesando todo el archivo")
+
+    # Columnas que dejan las reglas de la zona, sobre el catálogo sin filas
+    vacio = _con_tipos(pd.DataFrame(columns=catalogo.columnas), catalogo.tipos)
+    vacio = _sin_log(procesador, procesador.aplicar_reglas_columnas, vacio, zona)
+    vacio = _sin_log(procesador, procesador.aplicar_reglas_precio, vacio, zona)
+    columnas = [col for col in vacio.columns if col != COLUMNA_OFERTA]
+    if 'orden' not in columnas:
+        columnas.append('orden')
+
+    resolucion = perfil_proceso.resolver(catalogo.columnas)
+    if resolucion.eliminar[zona]:
+        procesador.log(f"Columnas eliminadas para {zona}: {resolucion.eliminar[zona]}")
+    if resolucion.precios[zona] is None:
+        procesador.log("ERROR: No se encontraron columnas de precio adecuadas")
+    elif zona in resolucion.alternativos:
+        procesador.log(f"ADVERTENCIA: No se encontraron columnas de precio específicas para {zona}; "
+                       f"usando columnas alternativas: {', '.join(resolucion.precios[zona])}")
+
+    particiones = Particiones(directorio, presupuesto * FRACCION_RETENIDA)
+    tipos = {}
+    filas, lineas = {}, {}
+    vistos = np.zeros(0, dtype=np.uint64)
+    filtradas = ofertas = eliminadas = 0
+    numeros = sorted(catalogo.particiones.claves())
+
+    with procesador.metricas.etapa('particiones', filas_entrada=catalogo.filas) as registro:
+        for i, numero in enumerate(numeros):
+            df = catalogo.leer(numero)
+            if len(df) and tamano_dataframe(df) > presupuesto * (1 - 3 * FRACCION_RETENIDA):
+                procesador.log(f"ADVERTENCIA: La partición del rubro {numero} ocupa "
+                               f"{tamano_dataframe(df) / 1024 ** 2:.1f} MB, más de lo que deja el presupuesto "
+                               f"de memoria para ordenarla")
+
+            # Paso 1: Filtrar por líneas seleccionadas
+            if columna_linea is not None:
+                df = df.take(np.flatnonzero(df[columna_linea].isin(lineas_seleccionadas).to_numpy()))
+                df = df.reset_index(drop=True)
+            filtradas += len(df)
+
+            # Pasos 2 y 3: Reglas de columnas y de precios
+            df = _sin_log(procesador, procesador.aplicar_reglas_columnas, df, zona)
+            df = _sin_log(procesador, procesador.aplicar_reglas_precio, df, zona)
+            if COLUMNA_OFERTA in df.columns:
+                ofertas += int(df[COLUMNA_OFERTA].sum())
+
+            # Paso 4: Dentro de la partición (mismo número de Rubro) el orden estable es por Marca
+            marca = df['Marca'].astype('category')
+            codigos_marca = marca.cat.codes.to_numpy()
+            claves = np.where(codigos_marca >= 0, codigos_marca, len(marca.cat.categories))
+            df = df.take(np.argsort(claves, kind='stable')).drop(columns=COLUMNA_OFERTA, errors='ignore')
+
+            # Paso 5: Renumerar orden siguiendo las particiones anteriores
+            df['orden'] = range(filtradas - len(df) + 1, filtradas + 1)
+
+            # Paso 6: Eliminar los códigos repetidos dentro de la partición o vistos en las anteriores
+            if 'Codigo' in df.columns:
+                hashes = pd.util.hash_array(df['Codigo'].to_numpy(dtype=object))
+                duplicadas = pd.Series(hashes).duplicated(keep='first').to_numpy() | _contiene(vistos, hashes)
+                if duplicadas.any():
+                    eliminadas += int(duplicadas.sum())
+                    df = df.take(np.flatnonzero(~duplicadas))
+                # Unir dos arreglos ordenados: el ordenamiento estable los mezcla en tiempo lineal
+                vistos = np.sort(np.concatenate([vistos, np.unique(hashes[~duplicadas])]), kind='stable')
+            df = df[columnas].reset_index(drop=True)
+
+            # Las filas sin Rubro no llegan al paso 7
+            grupos = df.groupby('Rubro', sort=False).indices
+            if grupos:
+                _agregar_tipos(tipos, df)
+            for rubro, posiciones in grupos.items():
+                parte = df.take(posiciones)
+                filas[rubro] = len(parte)
+                if columna_linea is not None and columna_linea in parte.columns:
+                    presentes = parte[columna_linea].dropna()
+                    lineas[rubro] = presentes.iloc[0] if len(presentes) else np.nan
+                particiones.agregar(rubro, parte)
+            procesador.avanzar(ETAPA_PROCESO, 6 / 7 * (i + 1) / len(numeros))
+        registro['filas_salida'] = filtradas - eliminadas
+
+    procesador.log(f"Filas después de filtrar por líneas: {filtradas}")
+    procesador.log(f"Reglas de precios aplicadas. Ofertas encontradas: {ofertas}")
+    procesador.log("Datos ordenados por Rubro (numérico) y Marca (alfabético)")
+    procesador.log(f"Orden renumerado del 1 al {filtradas}")
+    procesador.log(f"Duplicados eliminados: {eliminadas} filas (basado en 'Codigo')")
+
+    # Mismo orden que groupby('Rubro') sobre el catálogo completo (categorías del catálogo)
+    rubros = [rubro for rubro in pd.Categorical(catalogo.rubros).categories if rubro in filas]
+    return RubrosPreparados(particiones, rubros, np.array([filas[rubro] for rubro in rubros], dtype=np.int64),
+                            [lineas.get(rubro) for rubro in rubros] if columna_linea is not None else None,
+                            columnas, tipos)
+
+
+def _bloques_finales(procesador, preparados, filas_faltantes, perfil, tipos, filas_bloque):
+    """DataFrames finales de unas ``filas_bloque`` filas: cada Rubro y luego sus filas vacías"""
+    pendientes, filas_pendientes, siguiente_orden = [], 0, 1
+    columnas = preparados.columnas
+    for numero, (rubro, faltantes) in enumerate(zip(preparados.rubros, filas_faltantes), start=1):
+        productos = preparados.particiones.leer(rubro)
+        if faltantes:
+            filas_vacias = procesador.crear_filas_vacias([rubro] * int(faltantes), columnas, 1, perfil)
+            productos = pd.DataFrame({col: pd.concat([productos[col], filas_vacias[col]], ignore_index=True)
+                                      for col in columnas})
+        pendientes.append(productos)
+        filas_pendientes += len(productos)
+        if filas_pendientes < filas_bloque and numero < len(preparados.rubros):
+            continue
+
+        bloque = _con_tipos(pd.concat(pendientes, ignore_index=True), tipos)
+        # Renumerar el 'orden' final después de las filas vacías
+        bloque['orden'] = range(siguiente_orden, siguiente_orden + len(bloque))
+        siguiente_orden += len(bloque)
+        pendientes, filas_pendientes = [], 0
+        yield procesador.aplicar_formato_numeros_excel(bloque)
+
+
+def exportar_particiones(procesador, preparados, file_path, zona, lineas_seleccionadas, perfil=None,
+                         memoria_mb=MEMORIA_MB_DEFAULT):
+    """Paso 7 y exportación en cada formato configurado, rubro por rubro.
+
+    Devuelve las rutas escritas y la cantidad de filas de la salida.
+    """
+    perfil = perfil or PERFIL_MULTIPLO_8
+    procesador.log(f"Aplicando diseño de página '{perfil.nombre}' (bloque de {perfil.bloque})...")
+    lineas_rubro = preparados.lineas if perfil.bloque_por_linea else None
+    filas_faltantes, _ = perfil.calcular_relleno(preparados.rubros, preparados.filas, lineas_rubro)
+    for rubro, filas, faltantes in zip(preparados.rubros, preparados.filas, filas_faltantes):
+        procesador.log(f"Rubro {rubro}: {filas} filas, necesarias: {filas + faltantes}, faltantes: {faltantes}")
+    total = int(preparados.filas.sum() + filas_faltantes.sum())
+    procesador.log(f"Total filas después de aplicar '{perfil.nombre}': {total}")
+    procesador.avanzar(ETAPA_PROCESO, 1.0)
+
+    # Tipos de la salida completa: las filas vacías cambian el tipo de las columnas que completan
+    tipos = dict(preparados.tipos)
+    if filas_faltantes.sum() and preparados.rubros:
+        _agregar_tipos(tipos, procesador.crear_filas_vacias(preparados.rubros[:1], preparados.columnas, 1, perfil))
+
+    columnas = preparados.columnas
+    encabezados_info = procesador.encabezados_informativos(zona, lineas_seleccionadas, total)
+    columnas_numericas = set(procesador.perfil_proceso.resolver(columnas).numericas)
+    anchos = exportador.anchos_columnas(pd.DataFrame(columns=columnas), encabezados_info)
+    salida = Particiones(preparados.particiones.directorio, memoria_mb * 1024 ** 2 * FRACCION_RETENIDA)
+    try:
+        with procesador.metricas.etapa('relleno', filas_entrada=int(preparados.filas.sum())) as registro:
+            bloques = 0
+            for bloque in _bloques_finales(procesador, preparados, filas_faltantes, perfil, tipos,
+                                           filas_por_bloque(memoria_mb)):
+                anchos = np.maximum(anchos, exportador.anchos_columnas(bloque, encabezados_info)).tolist()
+                salida.agregar(bloques, bloque)
+                bloques += 1
+            registro['filas_salida'] = total
+
+        rutas = procesador.rutas_salida(file_path)
+        for formato, ruta in zip(procesador.formatos, rutas):
+            procesador.avanzar(ETAPA_EXPORTACION, 0.0)
+            progreso = lambda fraccion: procesador.avanzar(ETAPA_EXPORTACION, fraccion)  # noqa: E731
+            datos = (salida.leer(numero) for numero in range(bloques))
+            if formato == 'xlsx':
+                with procesador.metricas.etapa('escritura_excel', filas_entrada=total) as registro:
+                    exportador.escribir_excel_bloques(datos, columnas, anchos, total, ruta, encabezados_info,
+                                                      columnas_numericas, progreso=progreso)
+                    registro['filas_salida'] = total
+                procesador.log(f"Archivo Excel exportado: {ruta}")
+            else:
+                separador = exportador.SEPARADORES_TEXTO.get(os.path.splitext(ruta)[1].lower(), '\t')
+                with procesador.metricas.etapa('escritura_texto', filas_entrada=total) as registro:
+                    exportador.escribir_texto_bloques(datos, columnas, total, ruta, columnas_numericas,
+                                                      separador=separador, codificacion=procesador.codificacion_texto,
+                                                      decimal=procesador.decimal_texto, progreso=progreso)
+                    registro['filas_salida'] = total
+                procesador.log(f"Archivo de texto exportado: {ruta} ({procesador.codificacion_texto})")
+            procesador.avanzar(ETAPA_EXPORTACION, 1.0)
+    finally:
+        salida.cerrar()
+
+    procesador.log(f"Total de productos: {total}")
+    return rutas, total
+
+
+def procesar_por_particiones(procesador, file_path, combinaciones, directorio_salida, perfiles=None,
+                             memoria_mb=MEMORIA_MB_DEFAULT, directorio_temporal=None):
+    """Lee el catálogo una vez y exporta cada combinación (× diseño) con memoria acotada.
+
+    ``memoria_mb`` es el presupuesto de memoria de las filas retenidas; lo que no
+    entra se guarda en ``directorio_temporal`` (por defecto el temporal del
+    sistema). Devuelve (salida, filas, escrito) por archivo escrito, como
+    ``cli.exportar_combinaciones``.
+    """
+    if procesador.motor_excel != 'rapido':
+        raise ValueError("El procesamiento por particiones escribe el libro con el motor 'rapido'")
+    lineas = sorted({linea for _, lineas_combinacion in combinaciones for linea in lineas_combinacion})
+    salidas = []
+    with tempfile.TemporaryDirectory(prefix='procesador-', dir=directorio_temporal) as directorio:
+        catalogo = particionar_catalogo(procesador, file_path, directorio, lineas=lineas, memoria_mb=memoria_mb)
+        for zona, lineas_seleccionadas in combinaciones:
+            preparados = preparar_particiones(procesador, catalogo, zona, lineas_seleccionadas, directorio,
+                                              memoria_mb=memoria_mb)
+            try:
+                for perfil in perfiles or [None]:
+                    diseno = perfil.nombre if perfil is not None else None
+                    salida = os.path.join(directorio_salida,
+                                          nombre_salida(file_path, zona, lineas_seleccionadas, diseno=diseno))
+                    rutas, filas = exportar_particiones(procesador, preparados, salida, zona, lineas_seleccionadas,
+                                                        perfil, memoria_mb=memoria_mb)
+                    salidas.extend((ruta, filas, True) for ruta in rutas)
+            finally:
+                preparados.particiones.cerrar()
+        catalogo.particiones.cerrar()
+    return salidas
@@ -0,0 +1,220 @@
+"""Perfiles de proceso: columnas de precio por zona, columnas que se eliminan,
+columnas numéricas y líneas fijas.
+
+El perfil estándar reproduce las reglas de siempre. Un perfil se carga desde JSON
+o TOML y se aplica a todos los catálogos de una corrida por lotes::
+
+    {
+        "nombre": "proveedor_b",
+        "zonas": {
+            "GBA-CABA": {"precio_default": "l1 5", "precio_oferta": "l1 9"},
+            "INTERIOR": {"precio_default": "l2 5", "precio_oferta": "l2 9",
+                         "eliminar_desde": "lista1", "eliminar_hasta": "ad 3"}
+        },
+        "precios_alternativos": {"precio_default": "l1 5", "precio_oferta": "l1 9"},
+        "columnas_numericas": ["precio_seleccionado", "l1 5", "l1 9", "l2 5", "l2 9"],
+        "lineas_fijas": [1, 2, 8, 31, 32],
+        "corrida": {"zonas": ["INTERIOR"], "lineas": [[1, 2], [8, 31, 32]], "formatos": ["txt"]}
+    }
+
+``eliminar_desde`` y ``eliminar_hasta`` eliminan el rango de columnas entre la
+primera cuyo nombre contiene el primer texto y la siguiente que contiene el
+segundo (sin distinguir mayúsculas). ``precios_alternativos`` se usan cuando el
+catálogo no tiene las columnas de precio de la zona. ``corrida`` guarda las zonas,
+los conjuntos de líneas y los formatos de una corrida por lotes, para repetirla
+con ``--perfil``; se usan cuando no se indican en la línea de comandos.
+
+Qué columnas del catálogo cumple cada regla se calcula una vez por encabezado
+(``resolver``) y queda en cache: todos los catálogos con las mismas columnas
+reutilizan la misma resolución.
+"""
+import json
+import os
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+LINEAS_FIJAS = [1, 2, 8, 31, 32]
+
+# Columnas de precio (deben coincidir con el encabezado de la fila 12) y columnas eliminadas por zona
+REGLAS_ZONAS = {
+    'GBA-CABA': {'precio_default': 'l1 5', 'precio_oferta': 'l1 9'},
+    'INTERIOR': {'precio_default': 'l2 5', 'precio_oferta': 'l2 9',
+                 'eliminar_desde': 'lista1', 'eliminar_hasta': 'ad 3'},
+}
+ZONAS = list(REGLAS_ZONAS)
+PRECIOS_ALTERNATIVOS = {'precio_default': 'l1 5', 'precio_oferta': 'l1 9'}
+
+# Columnas que deben ser numéricas para el cálculo y openpyxl
+COLUMNAS_NUMERICAS = ['precio_seleccionado', 'lista1', 'lista 2', 'lista 3', 'lista 4', 'lista 5',
+                      'l1 5', 'l1 7',  'l1 9', 'l1 11',
+                      'l2 5', 'l2 7', 'l2 9',  'l2 11',
+                      'l3 5', 'l3 7', 'l3 9',  'l3 11',
+                      'l4 5', 'l4 7', 'l4 9',  'l4 11',
+                      'l2 5.1', 'l2 7.1', 'l2 9.1', 'l2 11.1',
+                      '0.05', '0.07', '9/especial', '0.11']
+
+CLAVES_CORRIDA = ['zonas', 'lineas', 'formatos']
+
+# Encabezados distintos que se recuerdan por perfil (cada catálogo usa unos pocos)
+MAX_RESOLUCIONES = 256
+
+
+class ResolucionColumnas:
+    """Columnas de un encabezado que cumplen cada regla del perfil.
+
+    ``eliminar`` son las columnas que se eliminan por zona, ``precios`` las
+    columnas (default, oferta) de cada zona, o None si no hay columnas de precio
+    adecuadas, ``alternativos`` las zonas que usan las columnas alternativas y
+    ``numericas`` las columnas numéricas presentes, en el orden del perfil.
+    """
+
+    def __init__(self, eliminar, precios, alternativos, numericas):
+        self.eliminar = eliminar
+        self.precios = precios
+        self.alternativos = alternativos
+        self.numericas = numericas
+
+
+def _rango_a_eliminar(columnas, desde, hasta):
+    # Primera columna que contiene ``desde`` y la siguiente (desde ahí) que contiene ``hasta``
+    inicio = fin = None
+    for i, col in enumerate(columnas):
+        col_str = str(col).lower()
+        if desde in col_str and inicio is None:
+            inicio = i
+        if hasta in col_str and inicio is not None:
+            fin = i
+            break
+    if inicio is None or fin is None:
+        return []
+    return list(columnas[inicio:fin + 1])
+
+
+class PerfilProceso:
+    """Reglas de columnas, precios y líneas aplicadas a cada catálogo"""
+
+    def __init__(self, nombre='estandar', zonas=None, precios_alternativos=None, columnas_numericas=None,
+                 lineas_fijas=None, corrida=None):
+        self.nombre = nombre
+        self.zonas = {zona: dict(reglas) for zona, reglas in (REGLAS_ZONAS if zonas is None else zonas).items()}
+        self.precios_alternativos = dict(PRECIOS_ALTERNATIVOS if precios_alternativos is None
+                                         else precios_alternativos)
+        self.columnas_numericas = list(COLUMNAS_NUMERICAS if columnas_numericas is None else columnas_numericas)
+        self.lineas_fijas = list(LINEAS_FIJAS if lineas_fijas is None else lineas_fijas)
+        self.corrida = dict(corrida or {})
+        self._resoluciones = {}
+
+        if not self.zonas:
+            raise ValueError(f"El perfil '{self.nombre}' no define zonas")
+        for zona, reglas in self.zonas.items():
+            if 'precio_default' not in reglas or 'precio_oferta' not in reglas:
+                raise ValueError(f"La zona '{zona}' debe indicar precio_default y precio_oferta "
+                                 f"(perfil '{self.nombre}')")
+            if ('eliminar_desde' in reglas) != ('eliminar_hasta' in reglas):
+                raise ValueError(f"La zona '{zona}' debe indicar eliminar_desde y eliminar_hasta juntos "
+                                 f"(perfil '{self.nombre}')")
+        if set(self.precios_alternativos) - {'precio_default', 'precio_oferta'}:
+            raise ValueError(f"precios_alternativos solo admite precio_default y precio_oferta "
+                             f"(perfil '{self.nombre}')")
+        desconocidas = set(self.corrida) - set(CLAVES_CORRIDA)
+        if desconocidas:
+            raise ValueError(f"Claves de corrida desconocidas: {sorted(desconocidas)} (perfil '{self.nombre}')")
+
+    @classmethod
+    def desde_dict(cls, datos):
+        return cls(**datos)
+
+    def a_dict(self):
+        datos = {
+            'nombre': self.nombre,
+            'zonas': {zona: dict(reglas) for zona, reglas in self.zonas.items()},
+            'precios_alternativos': dict(self.precios_alternativos),
+            'columnas_numericas': list(self.columnas_numericas),
+            'lineas_fijas': list(self.lineas_fijas),
+        }
+        if self.corrida:
+            datos['corrida'] = dict(self.corrida)
+        return datos
+
+    def reglas(self):
+        """Las reglas que cambian el resultado del proceso (sin el nombre ni la corrida)"""
+        datos = self.a_dict()
+        del datos['nombre']
+        datos.pop('corrida', None)
+        return datos
+
+    def columnas_precio(self):
+        """Columnas de precio de todas las zonas y las alternativas, sin repetir"""
+        columnas = []
+        for reglas in [*self.zonas.values(), self.precios_alternativos]:
+            columnas.extend(reglas[clave] for clave in ('precio_default', 'precio_oferta') if clave in reglas)
+        return list(dict.fromkeys(columnas))
+
+    def __getstate__(self):
+        # Las resoluciones se vuelven a calcular en el proceso que recibe el perfil
+        estado = dict(self.__dict__)
+        estado['_resoluciones'] = {}
+        return estado
+
+    def resolver(self, columnas):
+        """Resolución de las reglas para el encabezado ``columnas``, calculada una vez por encabezado"""
+        firma = tuple(columnas)
+        resolucion = self._resoluciones.get(firma)
+        if resolucion is None:
+            if len(self._resoluciones) >= MAX_RESOLUCIONES:
+                self._resoluciones.clear()
+            resolucion = self._resoluciones[firma] = self._compilar(firma)
+        return resolucion
+
+    def _compilar(self, columnas):
+        presentes = set(columnas)
+        eliminar, precios, alternativos = {}, {}, set()
+        for zona, reglas in self.zonas.items():
+            if 'eliminar_desde' in reglas:
+                eliminar[zona] = _rango_a_eliminar(columnas, str(reglas['eliminar_desde']).lower(),
+                                                   str(reglas['eliminar_hasta']).lower())
+            else:
+                eliminar[zona] = []
+            par = (reglas['precio_default'], reglas['precio_oferta'])
+            alternativo = (self.precios_alternativos.get('precio_default'),
+                           self.precios_alternativos.get('precio_oferta'))
+            if presentes.issuperset(par):
+                precios[zona] = par
+            elif None not in alternativo and presentes.issuperset(alternativo):
+                precios[zona] = alternativo
+                alternativos.add(zona)
+            else:
+                precios[zona] = None
+        numericas = [col for col in self.columnas_numericas if col in presentes]
+        return ResolucionColumnas(eliminar, precios, alternativos, numericas)
+
+
+PERFIL_ESTANDAR = PerfilProceso()
+
+
+def cargar_perfil_proceso(path):
+    """Lee un perfil de proceso desde un archivo JSON o TOML (según la extensión)"""
+    if os.path.splitext(path)[1].lower() == '.toml':
+        if tomllib is None:
+            raise ValueError("Para leer perfiles TOML se necesita Python 3.11 o el paquete tomli")
+        with open(path, 'rb') as f:
+            datos = tomllib.load(f)
+    else:
+        with open(path, encoding='utf-8') as f:
+            datos = json.load(f)
+    if not isinstance(datos, dict):
+        raise ValueError(f"El perfil de proceso debe ser un objeto: {path}")
+    return PerfilProceso.desde_dict(datos)
+
+
+def guardar_perfil_proceso(path, perfil):
+    """Guarda el perfil (con su corrida) en JSON para repetir la corrida con ``--perfil``"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(perfil.a_dict(), f, ensure_ascii=False, indent=2)
+        f.write("\n")
@@ -0,0 +1,82 @@
+"""Filas de un catálogo cargado expresadas como posiciones, sin copiar los datos.
+
+Filtrar por líneas, ordenar y eliminar duplicados solo cambian el arreglo de
+posiciones; el catálogo cargado no se modifica. Las columnas que calcula el
+pipeline (precio_seleccionado, orden) se guardan aparte, alineadas con esas
+posiciones. ``Seleccion`` ofrece la parte de la interfaz de DataFrame que usan
+los pasos del pipeline (``sel[col]``, ``sel[col] = valores``, ``columns``,
+``drop``, ``take``), de modo que las mismas reglas sirven para las dos cosas, y
+el DataFrame se arma una sola vez al final con ``materializar``.
+"""
+import numpy as np
+import pandas as pd
+
+
+class Seleccion:
+    """Posiciones de filas de ``catalogo`` más las columnas calculadas sobre ellas"""
+
+    def __init__(self, catalogo, filas=None, columnas=None, calculadas=None):
+        self.catalogo = catalogo
+        self.filas = np.arange(len(catalogo), dtype=np.intp) if filas is None else np.asarray(filas, dtype=np.intp)
+        self.columnas = list(catalogo.columns) if columnas is None else list(columnas)
+        # Columnas calculadas (o reemplazadas) por el pipeline, con índice 0..n-1
+        self.calculadas = dict(calculadas or {})
+
+    def __len__(self):
+        return len(self.filas)
+
+    @property
+    def columns(self):
+        return pd.Index(self.columnas, dtype=object)
+
+    @property
+    def index(self):
+        return pd.RangeIndex(len(self.filas))
+
+    def __getitem__(self, columna):
+        """Valores de la columna para las filas seleccionadas (Series con índice 0..n-1)"""
+        if columna in self.calculadas:
+            return self.calculadas[columna]
+        if columna not in self.columnas:
+            raise KeyError(columna)
+        serie = self.catalogo[columna].take(self.filas)
+        serie.index = self.index
+        return serie
+
+    def __setitem__(self, columna, valores):
+        if not isinstance(valores, pd.Series):
+            valores = pd.Series(valores)
+        if len(valores) != len(self.filas):
+            raise ValueError(f"La columna {columna!r} tiene {len(valores)} valores para {len(self.filas)} filas")
+        valores = valores.set_axis(self.index)
+        valores.name = columna
+        self.calculadas[columna] = valores
+        if columna not in self.columnas:
+            self.columnas.append(columna)
+
+    def take(self, posiciones):
+        """Nueva selección con las filas ``posiciones`` (relativas a esta selección)"""
+        posiciones = np.asarray(posiciones, dtype=np.intp)
+        calculadas = {columna: serie.take(posiciones).set_axis(pd.RangeIndex(len(posiciones)))
+                      for columna, serie in self.calculadas.items()}
+        return Seleccion(self.catalogo, self.filas[posiciones], self.columnas, calculadas)
+
+    def drop(self, columns, errors='raise'):
+        """Nueva selección sin ``columns`` (no toca los datos)"""
+        quitar = {columns} if isinstance(columns, str) else set(columns)
+        if errors == 'raise':
+            faltantes = quitar - set(self.columnas)
+            if faltantes:
+                raise KeyError(f"{sorted(map(str, faltantes))} not found in axis")
+        columnas = [columna for columna in self.columnas if columna not in quitar]
+        calculadas = {columna: serie for columna, serie in self.calculadas.items() if columna not in quitar}
+        return Seleccion(self.catalogo, self.filas, columnas, calculadas)
+
+    def materializar(self):
+        """Arma el DataFrame con las columnas seleccionadas, copiando cada columna una sola vez"""
+        return pd.DataFrame({columna: self[columna] for columna in self.columnas}, index=self.index)
+
+
+def como_dataframe(df):
+    """El DataFrame de ``df``, materializándolo si es una ``Seleccion``"""
+    return df.materializar() if isinstance(df, Seleccion) else df
@@ -0,0 +1,163 @@
+"""Generación de todas las variantes zona × líneas a partir de una sola carga.
+
+El catálogo se carga e indexa una vez; las filas de cada línea se agrupan una
+sola vez (``indice_lineas``) y cada variante toma sus filas de ese índice en
+lugar de volver a filtrar el catálogo completo. Los pasos 2 a 7 se calculan en
+el proceso principal y los libros se escriben en paralelo en un pool de
+procesos mientras se calcula la variante siguiente.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from .motor import COLUMNA_OFERTA, LINEAS_FIJAS, ZONAS, ProcesadorCatalogo, nombre_salida
+
+ETAPA_VARIANTES = "Variantes"
+
+
+def grupos_lineas_default(lineas_fijas=LINEAS_FIJAS):
+    """Cada línea por separado y todas juntas"""
+    return [[linea] for linea in lineas_fijas] + [list(lineas_fijas)]
+
+
+def combinaciones_variantes(zonas=None, grupos_lineas=None):
+    """Lista de (zona, líneas) a generar; por defecto todas las zonas y grupos"""
+    return [(zona, list(lineas)) for zona in (zonas or ZONAS)
+            for lineas in (grupos_lineas or grupos_lineas_default())]
+
+
+def indice_lineas(df, columna_linea):
+    """Posiciones de las filas de cada línea, agrupando la columna una sola vez"""
+    return {linea: np.asarray(posiciones)
+            for linea, posiciones in df.groupby(columna_linea, observed=True, sort=False).indices.items()}
+
+
+def filas_de_lineas(indice, lineas):
+    """Posiciones de las filas de ``lineas`` en el orden original del catálogo"""
+    partes = [indice[linea] for linea in lineas if linea in indice]
+    if not partes:
+        return np.zeros(0, dtype=np.intp)
+    return np.sort(np.concatenate(partes))
+
+
+def exportar_variante(df_final, salida, zona, lineas, opciones=None, metricas=None):
+    """Tarea de un worker: escribe los archivos de una variante.
+
+    ``opciones`` son las de ``ProcesadorCatalogo.opciones_exportacion`` del
+    procesador principal (motor del Excel, formatos y opciones del texto).
+    """
+    inicio = time.perf_counter()
+    procesador = ProcesadorCatalogo(metricas=metricas, **(opciones or {}))
+    rutas = procesador.exportar(df_final, salida, zona, lineas)
+    return rutas, time.perf_counter() - inicio
+
+
+def generar_variantes(procesador, df, file_path, combinaciones, directorio_salida, perfiles=None, workers=None):
+    """Genera y exporta todas las combinaciones (× diseños) de un catálogo ya cargado.
+
+    Devuelve una fila de resumen por archivo escrito con las filas de producto,
+    las ofertas, las filas de relleno y el tiempo de escritura. Al cancelar se
+    descartan los libros que todavía no empezaron a escribirse.
+    """
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(directorio_salida, exist_ok=True)
+    columna_linea = procesador.identificar_columna_linea(df)
+    indice = indice_lineas(df, columna_linea) if columna_linea else None
+    # Ofertas de cada fila del catálogo: las de la carga (indexar_catalogo) o, si no, calculadas una vez acá
+    ofertas_catalogo = None
+    if COLUMNA_OFERTA in df.columns:
+        ofertas_catalogo = df[COLUMNA_OFERTA].to_numpy(dtype=bool)
+    elif 'condicion' in df.columns:
+        ofertas_catalogo = procesador.mascara_ofertas(df).to_numpy(dtype=bool)
+
+    resumen = []
+    pendientes = {}
+    total_variantes = len(combinaciones) * len(perfiles or [None])
+    procesador.avanzar(ETAPA_VARIANTES, 0.0)
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        for zona, lineas in combinaciones:
+            filas = filas_de_lineas(indice, lineas) if indice is not None else None
+            df_preparado = procesador.preparar(df, zona, lineas, filas=filas)
+            # El relleno descarta las filas sin Rubro: los productos son los que quedan en el libro
+            productos = len(df_preparado)
+            if 'Rubro' in df_preparado.columns:
+                productos = int(df_preparado['Rubro'].notna().sum())
+            ofertas = 0
+            if ofertas_catalogo is not None:
+                ofertas = int(ofertas_catalogo[df_preparado.filas].sum())
+
+            for perfil in (perfiles or [None]):
+                if perfil is None:
+                    df_final = procesador.aplicar_multiplo_8(df_preparado)
+                    diseno = None
+                else:
+                    df_final = procesador.aplicar_diseno(df_preparado, perfil)
+                    diseno = perfil.nombre
+                salida = os.path.join(directorio_salida, nombre_salida(file_path, zona, lineas, diseno=diseno))
+                # En el resumen figura el archivo del primer formato
+                salida = procesador.rutas_salida(salida)[0]
+                fila = {
+                    'zona': zona,
+                    'lineas': list(lineas),
+                    'diseno': diseno,
+                    'productos': productos,
+                    'ofertas': ofertas,
+                    'relleno': len(df_final) - productos,
+                    'total': len(df_final),
+                    'salida': salida,
+                    'segundos': None,
+                }
+                resumen.append(fila)
+
+                if executor is None:
+                    inicio = time.perf_counter()
+                    procesador.exportar(df_final, salida, zona, lineas)
+                    fila['segundos'] = time.perf_counter() - inicio
+                    procesador.avanzar(ETAPA_VARIANTES, len(resumen) / total_variantes)
+                else:
+                    # Las métricas de la escritura van al mismo archivo, sin pasar por el log
+                    futuro = executor.submit(exportar_variante, df_final, salida, zona, lineas,
+                                             procesador.opciones_exportacion(),
+                                             procesador.metricas.copia_para_worker())
+                    pendientes[futuro] = fila
+
+        for listos, futuro in enumerate(as_completed(pendientes), start=1):
+            rutas, pendientes[futuro]['segundos'] = futuro.result()
+            for ruta in rutas:
+                procesador.log(f"Archivo exportado: {ruta}")
+            procesador.avanzar(ETAPA_VARIANTES, listos / total_variantes)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    return resumen
+
+
+def formatear_resumen(resumen):
+    """Tabla de texto con una fila por variante"""
+    encabezado = ["Zona", "Líneas", "Diseño", "Productos", "Ofertas", "Relleno", "Total", "Escritura", "Archivo"]
+    filas = [[
+        fila['zona'],
+        ",".join(str(linea) for linea in fila['lineas']),
+        fila['diseno'] or "-",
+        str(fila['productos']),
+        str(fila['ofertas']),
+        str(fila['relleno']),
+        str(fila['total']),
+        f"{fila['segundos']:.2f} s" if fila['segundos'] is not None else "-",
+        os.path.basename(fila['salida']),
+    ] for fila in resumen]
+
+    anchos = [max(len(texto) for texto in columna) for columna in zip(encabezado, *filas)]
+    # Texto a la izquierda, números a la derecha
+    alinear = [str.ljust, str.ljust, str.ljust, str.rjust, str.rjust, str.rjust, str.rjust, str.rjust, str.ljust]
+
+    def formatear(valores):
+        return "  ".join(f(valor, ancho) for f, valor, ancho in zip(alinear, valores, anchos)).rstrip()
+
+    lineas = [formatear(encabezado), "  ".join("-" * ancho for ancho in anchos)]
+    lineas.extend(formatear(valores) for valores in filas)
+    return "\n".join(lineas)
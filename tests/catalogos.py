@@ -0,0 +1,35 @@
+"""Catálogos sintéticos chicos para los tests, con el formato de ``benchmarks/generador.py``"""
+from openpyxl import Workbook
+
+from benchmarks.generador import ENCABEZADO, columnas_sinteticas, preambulo
+from procesador import ProcesadorCatalogo
+
+
+def filas_sinteticas(cantidad, semilla=0):
+    """Filas (listas de valores en el orden de ``ENCABEZADO``) de un catálogo sintético"""
+    return [list(fila) for fila in zip(*columnas_sinteticas(cantidad, semilla))]
+
+
+def escribir_catalogo(path, hojas):
+    """Escribe un libro con una hoja por elemento de ``hojas`` (nombre -> filas)"""
+    wb = Workbook(write_only=True)
+    for nombre, filas in hojas.items():
+        ws = wb.create_sheet(nombre)
+        for texto in preambulo(len(filas)):
+            ws.append([texto])
+        ws.append(ENCABEZADO)
+        for fila in filas:
+            ws.append(fila)
+    wb.save(path)
+    return path
+
+
+def columna(nombre):
+    """Posición de la columna ``nombre`` en las filas sintéticas (la primera si se repite)"""
+    return ENCABEZADO.index(nombre)
+
+
+def procesar_en_memoria(path, zona, lineas, **opciones):
+    """DataFrame final del pipeline completo en memoria, la referencia de los otros modos"""
+    procesador = ProcesadorCatalogo(**opciones)
+    return procesador.procesar(procesador.cargar_archivo(path), zona, lineas)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Los tests importan el paquete desde el repositorio, sin instalarlo
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,65 @@
+"""``cargar_fusion`` contra el pipeline completo en memoria.
+
+Dos archivos comparten parte de sus códigos con precios distintos. Según la
+precedencia, el catálogo fusionado debe procesarse igual que un solo archivo con
+las filas de cada fuente que conservan sus códigos, en el orden de las fuentes.
+"""
+import os
+
+import pandas as pd
+import pytest
+
+from catalogos import columna, escribir_catalogo, filas_sinteticas, procesar_en_memoria
+from procesador import ProcesadorCatalogo, cargar_fusion
+
+LINEAS = [1, 2, 8, 31, 32]
+
+
+def sin_codigos_de(filas, otras):
+    codigos = {fila[columna('Codigo')] for fila in otras}
+    return [fila for fila in filas if fila[columna('Codigo')] not in codigos]
+
+
+@pytest.fixture
+def fuentes(tmp_path):
+    filas = filas_sinteticas(500, semilla=3)
+    primera = filas[:300]
+    segunda = [list(fila) for fila in filas[200:]]
+    # Los códigos compartidos (filas 200 a 299) tienen otros precios en la segunda fuente
+    for fila in segunda[:100]:
+        for nombre in ('l1 5', 'l2 5'):
+            fila[columna(nombre)] = 1.5
+    archivos = [escribir_catalogo(str(tmp_path / "a.xlsx"), {'principal': primera}),
+                escribir_catalogo(str(tmp_path / "b.xlsx"), {'principal': segunda})]
+    return archivos, primera, segunda
+
+
+@pytest.mark.parametrize('precedencia', ['primero', 'ultimo', 'reciente'])
+@pytest.mark.parametrize('zona', ['GBA-CABA', 'INTERIOR'])
+def test_fusion_igual_a_un_solo_archivo(tmp_path, fuentes, precedencia, zona):
+    archivos, primera, segunda = fuentes
+    if precedencia == 'reciente':
+        # El primer archivo es el más nuevo: gana aunque la precedencia no dependa del orden
+        os.utime(archivos[1], (1_000_000_000, 1_000_000_000))
+    if precedencia == 'ultimo':
+        filas = sin_codigos_de(primera, segunda) + segunda
+    else:
+        filas = primera + sin_codigos_de(segunda, primera)
+    unico = escribir_catalogo(str(tmp_path / "unico.xlsx"), {'principal': filas})
+
+    procesador = ProcesadorCatalogo()
+    df = cargar_fusion(procesador, archivos, precedencia=precedencia, workers=1)
+
+    pd.testing.assert_frame_equal(procesador.procesar(df, zona, LINEAS), procesar_en_memoria(unico, zona, LINEAS))
+
+
+def test_fusion_de_hojas_de_un_archivo(tmp_path, fuentes):
+    _, primera, segunda = fuentes
+    libro = escribir_catalogo(str(tmp_path / "hojas.xlsx"), {'principal': primera, 'extra': segunda})
+    unico = escribir_catalogo(str(tmp_path / "unico.xlsx"), {'principal': primera + sin_codigos_de(segunda, primera)})
+
+    procesador = ProcesadorCatalogo()
+    df = cargar_fusion(procesador, [libro], hojas=['*'], workers=1)
+
+    pd.testing.assert_frame_equal(procesador.procesar(df, 'GBA-CABA', LINEAS),
+                                  procesar_en_memoria(unico, 'GBA-CABA', LINEAS))
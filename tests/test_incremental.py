@@ -0,0 +1,78 @@
+"""``exportar_incremental`` contra el pipeline completo en memoria.
+
+Después de cada cambio en el catálogo (precios, códigos, filas borradas) la
+corrida incremental reutiliza los rubros sin cambios de la corrida anterior y
+debe exportar exactamente el mismo DataFrame que ``ProcesadorCatalogo.procesar``.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from catalogos import columna, escribir_catalogo, filas_sinteticas, procesar_en_memoria
+from procesador import ProcesadorCatalogo
+from procesador.incremental import exportar_incremental
+
+COMBINACIONES = [('GBA-CABA', [1, 2, 8, 31, 32]), ('INTERIOR', [8, 31])]
+
+
+def cambiar_precios(filas, rng):
+    for i in rng.choice(len(filas), 15, replace=False):
+        for nombre in ('l1 5', 'l1 9', 'l2 5', 'l2 9'):
+            filas[i][columna(nombre)] = round(float(rng.uniform(10, 900)), 2)
+    return filas
+
+
+def cambiar_codigos(filas, rng):
+    elegidas = rng.choice(len(filas), 15, replace=False)
+    for n, i in enumerate(elegidas):
+        # La mitad pasa a un código nuevo y la otra mitad repite el de otra fila
+        otra = filas[int(rng.integers(len(filas)))][columna('Codigo')]
+        filas[i][columna('Codigo')] = f"N{n}" if n % 2 else otra
+    return filas
+
+
+def borrar_filas(filas, rng):
+    borradas = set(rng.choice(len(filas), 25, replace=False).tolist())
+    return [fila for i, fila in enumerate(filas) if i not in borradas]
+
+
+def corrida_incremental(path, zona, lineas, salida, estado):
+    procesador = ProcesadorCatalogo(formatos=['txt'])
+    exportados = []
+    exportar = procesador.exportar
+
+    def capturar(df, *args):
+        exportados.append(df)
+        return exportar(df, *args)
+
+    procesador.exportar = capturar
+    df = procesador.cargar_archivo(path)
+    resultado = exportar_incremental(procesador, df, zona, lineas, salida, estado)
+    return resultado, exportados[0] if exportados else None
+
+
+@pytest.mark.parametrize('zona, lineas', COMBINACIONES)
+def test_incremental_igual_al_completo(tmp_path, zona, lineas):
+    rng = np.random.default_rng(7)
+    filas = filas_sinteticas(600)
+    catalogo = str(tmp_path / "catalogo.xlsx")
+    salida = str(tmp_path / "salida.txt")
+    estado = str(tmp_path / "estado")
+
+    for paso, cambio in enumerate([None, cambiar_precios, None, cambiar_codigos, borrar_filas]):
+        if cambio is not None:
+            filas = cambio(filas, rng)
+        escribir_catalogo(catalogo, {'principal': filas})
+        resultado, exportado = corrida_incremental(catalogo, zona, lineas, salida, estado)
+        esperado = procesar_en_memoria(catalogo, zona, lineas)
+
+        if paso > 0 and cambio is None:
+            # Sin cambios desde la corrida anterior: no se reescribe nada
+            assert not resultado['escrito'] and exportado is None
+            assert resultado['filas'] == len(esperado)
+            continue
+        assert resultado['escrito']
+        pd.testing.assert_frame_equal(exportado, esperado)
+        if cambio is not None:
+            # Un cambio en unas pocas filas no recalcula todos los rubros
+            assert 0 < resultado['recalculados'] < resultado['rubros']
@@ -0,0 +1,63 @@
+"""``procesar_por_particiones`` contra el pipeline completo en memoria.
+
+Con un presupuesto de memoria mínimo el catálogo se lee en varios bloques y las
+particiones se vuelcan a disco; los archivos escritos deben ser los mismos que
+los de ``procesar`` + ``exportar``.
+"""
+import os
+
+import openpyxl
+import pytest
+
+from catalogos import escribir_catalogo, filas_sinteticas
+from procesador import ProcesadorCatalogo
+from procesador.cli import exportar_combinaciones
+from procesador.diseno import PERFIL_MULTIPLO_8
+from procesador.particiones import FILAS_POR_BLOQUE_MIN, Particiones, procesar_por_particiones
+
+COMBINACIONES = [('GBA-CABA', [1, 2, 8, 31, 32]), ('INTERIOR', [8, 31])]
+FORMATOS = ['xlsx', 'txt', 'csv']
+
+
+@pytest.fixture(scope='module')
+def catalogo(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('catalogo') / "catalogo.xlsx")
+    return escribir_catalogo(path, {'principal': filas_sinteticas(FILAS_POR_BLOQUE_MIN * 2 + 200, semilla=5)})
+
+
+def celdas(path):
+    filas = [[(celda.value, celda.number_format, celda.style) for celda in fila]
+             for fila in openpyxl.load_workbook(path).active.iter_rows()]
+    # La segunda fila del encabezado informativo es la fecha de exportación
+    del filas[1]
+    return filas
+
+
+def leer(path):
+    if path.endswith('.xlsx'):
+        return celdas(path)
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize('perfiles', [None, [PERFIL_MULTIPLO_8]], ids=['sin_diseno', 'multiplo_8'])
+def test_particiones_igual_a_memoria(tmp_path, monkeypatch, catalogo, perfiles):
+    en_memoria, particionado = tmp_path / "memoria", tmp_path / "particiones"
+    en_memoria.mkdir()
+    particionado.mkdir()
+
+    procesador = ProcesadorCatalogo(formatos=FORMATOS)
+    df = procesador.cargar_archivo(catalogo)
+    esperadas = exportar_combinaciones(procesador, df, catalogo, COMBINACIONES, str(en_memoria), perfiles)
+
+    volcados = []
+    volcar = Particiones.volcar
+    monkeypatch.setattr(Particiones, 'volcar', lambda self: volcados.append(1) or volcar(self))
+    salidas = procesar_por_particiones(ProcesadorCatalogo(formatos=FORMATOS), catalogo, COMBINACIONES,
+                                       str(particionado), perfiles, memoria_mb=0.25)
+
+    assert volcados
+    assert ([(os.path.basename(ruta), filas) for ruta, filas, _ in salidas]
+            == [(os.path.basename(ruta), filas) for ruta, filas, _ in esperadas])
+    for ruta, _, _ in esperadas:
+        assert leer(str(particionado / os.path.basename(ruta))) == leer(ruta), os.path.basename(ruta)
@@ -0,0 +1,134 @@
+"""El relleno vectorizado de ``aplicar_multiplo_8`` contra el relleno por grupo original.
+
+``relleno_original`` es una copia del ``aplicar_multiplo_8``/``crear_filas_vacias``
+anterior (un ``groupby`` y un ``concat`` por Rubro). Desde que los precios se
+convierten a número al cargar, las filas vacías dejan numéricas las columnas
+numéricas del perfil (NaN en lugar de ""); el resto debe coincidir exactamente,
+incluidos los dtypes y el tipo de cada valor de las columnas objeto.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from procesador import ProcesadorCatalogo
+from procesador.perfiles import PERFIL_ESTANDAR
+
+
+def filas_vacias_original(cantidad, rubro, grupo_referencia, inicio_orden):
+    if len(grupo_referencia) == 0:
+        return pd.DataFrame()
+
+    filas_vacias = []
+    for i in range(cantidad):
+        fila_vacia = {}
+        fila_vacia['orden'] = inicio_orden + i
+        for col in grupo_referencia.columns:
+            if col in ['orden']:
+                continue
+            elif col in ['ord']:
+                fila_vacia[col] = "Vacio.eps"
+            elif col in ['condicion', 'Marca', 'Codigo', 'Descripcion', 'peso']:
+                fila_vacia[col] = ""
+            elif col == 'Rubro':
+                fila_vacia[col] = rubro
+            elif col in ['0.05', '0.07', '9/especial', '0.11']:
+                fila_vacia[col] = 0.00
+            elif col == 'precio_seleccionado':
+                fila_vacia[col] = np.nan
+            else:
+                fila_vacia[col] = ""
+        filas_vacias.append(fila_vacia)
+
+    return pd.DataFrame(filas_vacias)
+
+
+def relleno_original(df):
+    dfs_por_rubro = []
+    contador_orden = df['orden'].max() + 1 if 'orden' in df.columns and not df['orden'].empty else 1
+
+    for rubro, grupo in df.groupby('Rubro'):
+        filas_rubro = len(grupo)
+        filas_faltantes = ((filas_rubro + 7) // 8) * 8 - filas_rubro
+        if filas_faltantes > 0:
+            filas_vacias = filas_vacias_original(filas_faltantes, rubro, grupo, contador_orden)
+            contador_orden += filas_faltantes
+            grupo = pd.concat([grupo, filas_vacias], ignore_index=True)
+        dfs_por_rubro.append(grupo)
+
+    df_final = pd.concat(dfs_por_rubro, ignore_index=True)
+    df_final['orden'] = range(1, len(df_final) + 1)
+    return df_final
+
+
+def catalogo_aleatorio(rng, filas):
+    """Columnas objeto, decimales y enteros, con Rubros vacíos ("" y NaN)"""
+    rubros = np.array(['1 Almacen', '10 Bebidas', '2 Limpieza', '33 Perfumeria', '', None], dtype=object)
+    rubro = rubros[rng.integers(0, len(rubros) - int(rng.integers(0, 3)), filas)]
+    condicion = np.array(['oferta', 'normal', None], dtype=object)[rng.integers(0, 3, filas)]
+    columnas = {
+        'orden': np.arange(1, filas + 1),
+        'ord': [f"p{i}.eps" for i in rng.integers(0, 500, filas)],
+        'condicion': condicion,
+        'Rubro': rubro,
+        'Marca': [f"Marca {i}" for i in rng.integers(0, 5, filas)],
+        'Codigo': [str(i) for i in rng.integers(1000, 9999, filas)],
+        'Descripcion': [f"desc {i}" for i in range(filas)],
+        'peso': rng.choice([0.5, 1.0, np.nan], filas),
+        'Linea': rng.integers(1, 40, filas),
+        'l1 5': rng.random(filas) * 100,
+        'l2 9': rng.integers(1, 100, filas),
+        '0.05': rng.random(filas),
+        'precio_seleccionado': rng.random(filas) * 100,
+        'stock': rng.integers(0, 50, filas),
+        'extra': rng.random(filas),
+        'nota': np.array(['a', 1, 2.5, None], dtype=object)[rng.integers(0, 4, filas)],
+    }
+    nombres = list(columnas)
+    if rng.random() < 0.3:
+        nombres.remove('orden')
+    rng.shuffle(nombres)
+    return pd.DataFrame({nombre: columnas[nombre] for nombre in nombres})
+
+
+def esperado(df):
+    df_final = relleno_original(df)
+    for col in PERFIL_ESTANDAR.resolver(df_final.columns).numericas:
+        df_final[col] = pd.to_numeric(df_final[col], errors='coerce')
+    return df_final
+
+
+def comparar(resultado, referencia):
+    pd.testing.assert_frame_equal(resultado, referencia)
+    for col in referencia.columns:
+        if referencia[col].dtype == object:
+            assert list(map(type, resultado[col])) == list(map(type, referencia[col])), col
+
+
+@pytest.mark.parametrize('semilla', range(60))
+def test_relleno_igual_al_original(semilla):
+    rng = np.random.default_rng(semilla)
+    df = catalogo_aleatorio(rng, int(rng.integers(1, 80)))
+    if df['Rubro'].notna().sum() == 0:
+        df.loc[0, 'Rubro'] = '1 Almacen'
+
+    resultado = ProcesadorCatalogo().aplicar_multiplo_8(df.copy())
+
+    comparar(resultado, esperado(df))
+    assert (resultado['Rubro'].value_counts() % 8 == 0).all()
+
+
+def test_relleno_sin_faltantes():
+    df = catalogo_aleatorio(np.random.default_rng(0), 16)
+    df['Rubro'] = ['1 Almacen'] * 8 + ['2 Limpieza'] * 8
+
+    comparar(ProcesadorCatalogo().aplicar_multiplo_8(df.copy()), esperado(df))
+
+
+def test_relleno_entrada_vacia():
+    # El relleno original fallaba con un catálogo vacío (concat sin grupos)
+    df = catalogo_aleatorio(np.random.default_rng(0), 5).iloc[:0]
+
+    resultado = ProcesadorCatalogo().aplicar_multiplo_8(df)
+
+    assert resultado.empty
+    assert list(resultado.columns) == list(df.columns) + ([] if 'orden' in df.columns else ['orden'])
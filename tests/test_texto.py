@@ -0,0 +1,44 @@
+"""Decimales del texto exportado (``exportador.columnas_para_texto``).
+
+Un decimal se escribe igual en una columna decimal que suelto en una columna
+mixta: sin '.0' si es entero y con el separador decimal elegido.
+"""
+import pandas as pd
+import pytest
+
+from procesador.exportador import columnas_para_texto, escribir_texto
+
+
+def catalogo():
+    return pd.DataFrame({
+        'precio': [3.0, 2.5, None],
+        'decimal': [3.0, 2.5, None],
+        'mixta': pd.Series([3.0, 2.5, 'sin dato'], dtype=object),
+        'enteros': pd.Series([7, 'x', None], dtype=object),
+        'texto': ['a', 'b.c', None],
+    })
+
+
+@pytest.mark.parametrize('decimal', ['.', ','])
+def test_decimales_iguales_en_columnas_decimales_y_mixtas(decimal):
+    df = columnas_para_texto(catalogo(), ['precio'], decimal)
+
+    assert df['precio'].tolist()[:2] == ['3.00'.replace('.', decimal), '2.50'.replace('.', decimal)]
+    assert df['decimal'].tolist()[:2] == ['3', '2.5'.replace('.', decimal)]
+    assert df['mixta'].tolist() == df['decimal'].tolist()[:2] + ['sin dato']
+    assert df['enteros'].tolist()[:2] == [7, 'x']
+    assert df['texto'].tolist()[:2] == ['a', 'b.c']
+
+
+@pytest.mark.parametrize('decimal', ['.', ','])
+def test_texto_exportado_con_columna_mixta(tmp_path, decimal):
+    path = str(tmp_path / "catalogo.csv")
+    escribir_texto(catalogo(), path, ['precio'], separador=';', codificacion='utf-8', decimal=decimal)
+
+    with open(path, encoding='utf-8', newline='') as f:
+        lineas = f.read().split('\r\n')
+
+    dos_y_medio = '2.5'.replace('.', decimal)
+    assert lineas[1] == f"{'3.00'.replace('.', decimal)};3;3;7;a"
+    assert lineas[2] == f"{'2.50'.replace('.', decimal)};{dos_y_medio};{dos_y_medio};x;b.c"
+    assert lineas[3] == ";;sin dato;;"